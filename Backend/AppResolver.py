@@ -0,0 +1,136 @@
+# Resolves "open <app>" to a launch by trying cheap local strategies first and racing the
+# slow ones (network, first drive scan) against a deadline. The strategy that worked for
+# an app is remembered and tried first next time; every strategy's latency is recorded.
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import namedtuple
+import threading
+import time
+
+ResolveDeadline = 4.0   # Seconds the slow strategies get before the best answer so far is used.
+
+# A resolved way to open an app; start() performs the launch and raises if it fails.
+Launch = namedtuple("Launch", ["strategy", "target", "start"])
+
+
+class AppResolver:
+    """Strategies are (name, resolve(app) -> Launch or None) pairs.
+
+    cheap strategies run one after another in order; slow ones run in parallel,
+    each in its own pool, and the first to answer before the deadline wins.
+    """
+
+    def __init__(self, cheap, slow, deadline=ResolveDeadline, workers=4):
+        self.cheap = list(cheap)
+        self.slow = list(slow)
+        self.deadline = deadline
+        self.winners = {}       # app key -> strategy name that opened it last time.
+        # One pool per slow strategy, so a stuck drive scan can't keep the web search from running.
+        self._pools = {name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"app-resolve-{name}")
+                       for name, _ in self.slow}
+        self._inflight = {}     # (strategy, app key) -> Future of a slow strategy still running.
+        self._lock = threading.Lock()
+        self._stats = {name: {"calls": 0, "hits": 0, "seconds": 0.0} for name, _ in self.cheap + self.slow}
+
+    @staticmethod
+    def key(app):
+        return app.lower().strip()
+
+    def _try(self, name, resolve, app, timings):
+        start = time.perf_counter()
+        try:
+            launch = resolve(app)
+        except Exception as e:
+            print(f"OpenApp strategy {name} failed for '{app}': {e}")
+            launch = None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"] += 1
+            stats["hits"] += launch is not None
+            stats["seconds"] += elapsed
+        timings.append(f"{name} {elapsed * 1000:.1f}ms {'hit' if launch else 'miss'}")
+        return launch
+
+    def _submit(self, name, resolve, app, timings):
+        # Single flight: a strategy still working on this app (a straggler from an earlier
+        # resolve) is joined rather than started again, so a blocked scan holds one worker.
+        key = (name, self.key(app))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None or future.done():
+                future = self._inflight[key] = self._pools[name].submit(self._try, name, resolve, app, timings)
+        return future
+
+    def _race(self, strategies, app, timings):
+        futures = {self._submit(name, resolve, app, timings): rank
+                   for rank, (name, resolve) in enumerate(strategies)}
+        pending = set(futures)
+        expires = time.monotonic() + self.deadline
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                timings.append(f"deadline {self.deadline:.1f}s reached")
+                break
+            # The first strategy to find something wins; rank only breaks ties within one wake-up.
+            for future in sorted(done, key=futures.get):
+                if future.result() is not None:
+                    return future.result()
+        # Nothing found in time; the stragglers finish in their own pools, unobserved.
+        return None
+
+    def resolve(self, app, skip=()):
+        """Find a Launch for app without starting it; strategies named in skip are left out."""
+        timings = []
+        try:
+            cheap = [(name, resolve) for name, resolve in self.cheap if name not in skip]
+            slow = [(name, resolve) for name, resolve in self.slow if name not in skip]
+
+            # The strategy that opened this app before goes first, even if it is a slow one.
+            remembered = self.winners.get(self.key(app))
+            for name, resolve in cheap + slow:
+                if name == remembered:
+                    launch = self._try(name, resolve, app, timings)
+                    if launch:
+                        return launch
+                    cheap = [strategy for strategy in cheap if strategy[0] != name]
+                    slow = [strategy for strategy in slow if strategy[0] != name]
+
+            for name, resolve in cheap:
+                launch = self._try(name, resolve, app, timings)
+                if launch:
+                    return launch
+            return self._race(slow, app, timings) if slow else None
+        finally:
+            print(f"[TIMING] OpenApp '{app}': {', '.join(timings) or 'no strategies'}")
+
+    def open(self, app):
+        """Resolve and start app; a launch that fails is forgotten and the next strategy tried.
+
+        Returns the Launch that started, or None if nothing could open the app.
+        """
+        failed = set()
+        while True:
+            launch = self.resolve(app, skip=failed)
+            if launch is None:
+                self.winners.pop(self.key(app), None)
+                return None
+            try:
+                launch.start()
+            except Exception as e:
+                print(f"OpenApp: {launch.strategy} could not start {launch.target}: {e}")
+                failed.add(launch.strategy)
+                continue
+            self.winners[self.key(app)] = launch.strategy
+            return launch
+
+    def stats(self):
+        """Calls, hit rate and average latency per strategy."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats["calls"],
+                    "hit_rate": stats["hits"] / stats["calls"] if stats["calls"] else 0.0,
+                    "avg_ms": stats["seconds"] / stats["calls"] * 1000 if stats["calls"] else 0.0,
+                }
+                for name, stats in self._stats.items()
+            }
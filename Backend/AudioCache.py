@@ -0,0 +1,134 @@
+# Content-addressed on-disk cache for synthesized speech.
+# Audio is stored under a hash of everything that affects the synthesis (text, voice,
+# language, model, options), so repeated phrases never hit the Speechify API twice.
+from collections import OrderedDict
+import threading
+import tempfile
+import hashlib
+import json
+import os
+
+AudioCacheDir = r"Data\AudioCache"        # Where cached audio files live.
+AudioCacheBytes = 64 * 1024 * 1024         # Evict least recently used audio above this size.
+
+
+class AudioCache:
+    """Byte-bounded LRU cache of audio files keyed by a hash of the synthesis request.
+
+    Files are written to a temporary name and renamed into place, so concurrent
+    writers (threads or processes) never expose a partially written entry.
+    """
+
+    def __init__(self, directory=AudioCacheDir, max_bytes=AudioCacheBytes, extension="mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None  # key -> size, least recently used first.
+        self._bytes = 0
+
+    @staticmethod
+    def key(**request):
+        # Stable hash of the request; sort_keys keeps it independent of argument order.
+        encoded = json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.{self.extension}")
+
+    # Scan the cache directory once, ordering entries by last use (mtime).
+    def _load(self):
+        if self._entries is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(f".{self.extension}"):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(self.extension) - 1], stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._bytes = sum(self._entries.values())
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))  # Record the use for LRU ordering across restarts.
+        except OSError:
+            # Evicted by another process in the meantime.
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._load()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+
+    def get_or_create(self, create, **request):
+        """Return cached audio for request, calling create() and storing the result on a miss."""
+        key = self.key(**request)
+        data = self.get(key)
+        if data is None:
+            data = create()
+            self.put(key, data)
+        return data
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide cache used by TextToSpeech.
+audio_cache = AudioCache()
@@ -0,0 +1,119 @@
+# Long-lived audio output service.
+# The pygame mixer is initialised once and kept warm; synthesized audio is played
+# straight from memory, queued back-to-back, and can be interrupted at any time.
+from collections import deque
+import threading
+import pygame
+import time
+import io
+
+MixerFrequency = 44100   # Output sample rate.
+MixerBuffer = 512        # Samples per mixer buffer; small buffers keep start latency low.
+
+
+class AudioPlayer:
+    """Plays in-memory audio clips in order on a dedicated mixer channel."""
+
+    def __init__(self, frequency=MixerFrequency, buffer=MixerBuffer):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.volume = 1.0
+        self._pending = deque()     # (Sound, enqueue time) waiting for the channel.
+        self._condition = threading.Condition()
+        self._channel = None
+        self._thread = None
+        self._starts = []           # Seconds from enqueue to playback start, most recent last.
+
+    # Initialise the mixer and the feeder thread on first use only.
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        pygame.mixer.pre_init(self.frequency, -16, 2, self.buffer)
+        pygame.mixer.init()
+        self._channel = pygame.mixer.Channel(0)
+        self._thread = threading.Thread(target=self._run, name="audio-player", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        clock = pygame.time.Clock()
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()  # Idle: no wakeups until something is queued.
+
+                # Hand the next clip to the channel once its queue slot is free,
+                # so it starts on the very next buffer after the current clip.
+                if self._channel.get_queue() is None:
+                    sound, queued_at = self._pending.popleft()
+                    if self._channel.get_busy():
+                        self._channel.queue(sound)
+                    else:
+                        self._channel.play(sound)
+                        self._starts.append(time.perf_counter() - queued_at)
+                        del self._starts[:-50]
+            clock.tick(100)
+
+    def enqueue(self, audio):
+        """Queue encoded audio (bytes, e.g. MP3) to play after anything already queued."""
+        with self._condition:
+            self._ensure_started()
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+            sound.set_volume(self.volume)
+            self._pending.append((sound, time.perf_counter()))
+            self._condition.notify()
+
+    def play(self, audio):
+        """Interrupt whatever is playing and play audio immediately."""
+        self.stop()
+        self.enqueue(audio)
+
+    def stop(self):
+        with self._condition:
+            self._pending.clear()
+            if self._channel is not None:
+                # Halting a channel starts its queued sound, so halt twice to clear both.
+                self._channel.stop()
+                self._channel.stop()
+
+    def set_volume(self, volume):
+        with self._condition:
+            self.volume = max(0.0, min(1.0, volume))
+            for sound, _ in self._pending:
+                sound.set_volume(self.volume)
+            if self._channel is not None:
+                for sound in (self._channel.get_sound(), self._channel.get_queue()):
+                    if sound is not None:
+                        sound.set_volume(self.volume)
+
+    def is_busy(self):
+        with self._condition:
+            if self._pending:
+                return True
+            return self._channel is not None and (self._channel.get_busy() or self._channel.get_queue() is not None)
+
+    def wait(self, func=lambda: True, interval=0.1):
+        """Block until playback finishes; stop and return False if func() returns False."""
+        while self.is_busy():
+            if func() == False:
+                self.stop()
+                return False
+            time.sleep(interval)
+        return True
+
+    def latency(self):
+        """Start-latency report: enqueue-to-play time plus the mixer's output buffer delay."""
+        with self._condition:
+            starts = list(self._starts)
+        buffer_delay = self.buffer / self.frequency
+        if not starts:
+            return {"plays": 0, "buffer": buffer_delay}
+        return {
+            "plays": len(starts),
+            "last": starts[-1] + buffer_delay,
+            "average": sum(starts) / len(starts) + buffer_delay,
+            "buffer": buffer_delay,
+        }
+
+
+# Process-wide player shared by every TTS call.
+audio_player = AudioPlayer()
@@ -1,28 +1,28 @@
 # Import required libraries
 from AppOpener import close, open as appopen  # Open or close installed applications
+try:
+    from AppOpener import give_appnames  # Installed app names (newer AppOpener releases)
+except ImportError:
+    give_appnames = None
 from pywhatkit import search, playonyt  # Google search and YouTube playback
-from dotenv import dotenv_values  # Load variables from .env file
-from bs4 import BeautifulSoup  # HTML parser for scraping search result links
 from rich import print  # Rich text formatting in terminal
-from groq import Groq  # Interface with Groq AI models
+from Backend.Services import services  # Lazy registry that owns the Groq client
+from Backend.Settings import settings  # Shared settings parsed once from .env
+from Backend.Resilience import providers, DegradedAnswer  # Bounded retries, circuit breaker and deadlines for Groq
+from Backend.Cancellation import CancelToken  # Per-turn cancellation token used for barge-in
+from Backend.ExecutableIndex import executable_index  # Persistent index of .exe files on the local drives
+from Backend.LaunchCache import launch_cache  # Validated cache of executables launched before
+from Backend.AppResolver import AppResolver, Launch  # Cheap-first, deadline-raced OpenApp strategies
+from Backend.WebSearch import web_search  # Cached, pooled Google result search
 import webbrowser  # Open URLs in browser
 import subprocess  # Run local applications
-import requests  # HTTP requests
 import keyboard  # Simulate keyboard inputs
 import asyncio  # Run asynchronous tasks
-import os  # Interact with operating system
-import json  # Handle JSON files
-
-# Load environment variables from the .env file
-env_vars = dotenv_values(".env")
-GroqAPIKey = env_vars.get("GroqAPIKey")  # Safely fetch Groq API Key
+import difflib  # Close matches against installed app names
+import functools  # Read the installed app list once
 
 # Define list of CSS classes that may appear in search result content blocks
 classes = ["zCubwf", "hgKElc", "LTKOO SY7ric", "ZOLCW", "gsrt vk_bk FzvWSb YwPhnf", "pclqee", "tw-Data-text tw-text-small tw-ta", "IZ6rdc", "05uR6d LTKOO", "vlzY6d", "webanswers-webanswers_table_webanswers-table", "dDoNo ikb4Bb gsrt", "sXLa0e", "LWkfKe", "VQF4g", "qv3Wpe", "kno-rdesc", "SPZz6b"]
-useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
-
-# Initialize Groq API client with API key
-client = Groq(api_key=GroqAPIKey)
 
 # Standard polite replies used by AI when responding
 professional_responses = [
@@ -31,76 +31,74 @@ professional_responses = [
 ]
 messages = []  # Stores ongoing conversation for context
 
-# Set up system prompt for Groq assistant's role
-SystemChatBot = [{"role": "system", "content": f"Hello, I am {os.environ['Username']}, You're a content writer. You have to write content like letters, codes, applications, essays, notes, songs, poems etc."}]
-
-# Load cached game paths from file to avoid repeated drive scans
-def load_cached_games():
-    if os.path.exists("game_paths.json"):
-        with open("game_paths.json", "r") as f:
-            return json.load(f)
-    return {}
-
-# Save discovered game paths to cache for future use
-def save_cached_games(game_paths):
-    with open("game_paths.json", "w") as f:
-        json.dump(game_paths, f, indent=4)
-
-# Scan local drives to find game .exe files based on app name
-# Uses early return if 3+ matches are found to save time
-def find_game_exe(app_name, search_paths=["C:\\", "D:\\", "E:\\"]):
-    matches = []
-    app_name = app_name.lower().replace(" ", "")
-    excluded_dirs = ["$recycle.bin", "windows", "programdata", "system volume information"]
-
-    for root_dir in search_paths:
-        for root, dirs, files in os.walk(root_dir):
-            dirs[:] = [d for d in dirs if all(x not in d.lower() for x in excluded_dirs)]
-            for file in files:
-                if file.lower().endswith(".exe") and app_name in file.lower().replace(" ", ""):
-                    full_path = os.path.join(root, file)
-                    matches.append(full_path)
-                    if len(matches) >= 3:
-                        return matches
-    return matches
+# Set up system prompt for Groq assistant's role (rebuilt whenever the settings reload)
+SystemChatBot = []
+
+def ApplySettings(config):
+    SystemChatBot[:] = [{"role": "system", "content": f"Hello, I am {config.username}, You're a content writer. You have to write content like letters, codes, applications, essays, notes, songs, poems etc."}]
+
+settings.on_change(ApplySettings)
 
 # Perform a Google search using pywhatkit
 def GoogleSearch(Topic):
     search(Topic)
     return True
 
-# Generate creative content via AI and open in notepad
-def Content(Topic):
-    def OpenNotepad(File):
-        default_text_editor = 'notepad.exe'
-        subprocess.Popen([default_text_editor, File])
+# Stream creative content from the AI, yielding each piece as it is generated
+def ContentWriterAIStream(prompt, deadline=None, cancel=None):
+    cancel = cancel or CancelToken()
+    messages.append({"role": "user", "content": f" {prompt}"})
 
-    def ContentWriterAI(prompt):
-        messages.append({"role": "user", "content": f" {prompt}"})
-        completion = client.chat.completions.create(
-            model="llama3-8b-8192",
+    def Request(deadline):
+        completion = services.get("groq").chat.completions.create(
+            model=settings.get().content_model,
             messages=SystemChatBot + messages,
             max_tokens=2048,
             temperature=0.7,
             top_p=1,
             stream=True,
-            stop=None
+            stop=None,
+            timeout=deadline.remaining()
         )
+        cancel.on_cancel(completion.close)  # Unblock a pending read as soon as the turn is cancelled
+        for chunk in cancel.iterate(completion):
+            Delta = chunk.choices[0].delta.content
+            if Delta:
+                yield Delta.replace("</s>", "")
 
-        Answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
+    Answer = ""
+    try:
+        for Delta in providers["groq"].stream(Request, deadline, cancel):
+            Answer += Delta
+            yield Delta
+    except Exception as e:
+        messages.pop()  # Keep the conversation consistent for the next request.
+        if cancel.cancelled:
+            print(f"Content writer cancelled ({cancel.reason})")
+            return
+        print(f"Content writer failed: {e}")
+        if not Answer:
+            yield DegradedAnswer
+        return
+
+    messages.append({"role": "assistant", "content": Answer})
 
-        Answer = Answer.replace("</s>", "")
-        messages.append({"role": "assistant", "content": Answer})
-        return Answer
+# Generate creative content via AI and open in notepad
+def Content(Topic, cancel=None):
+    cancel = cancel or CancelToken()
+
+    def OpenNotepad(File):
+        default_text_editor = 'notepad.exe'
+        subprocess.Popen([default_text_editor, File])
 
     Topic: str = Topic.replace("Content", "")
-    ContentByAI = ContentWriterAI(Topic)
     with open(rf"Data\{Topic.lower().replace('', '')}.txt", "w", encoding="utf-8") as file:
-        file.write(ContentByAI)
+        # Write the content to disk as it streams in
+        for Delta in ContentWriterAIStream(Topic, cancel=cancel):
+            file.write(Delta)
         file.close()
+        if cancel.cancelled:
+            return False  # Don't open a half-written file after a barge-in
         OpenNotepad(rf"Data\{Topic.lower().replace('', '')}.txt")
         return True
 
@@ -115,79 +113,99 @@ def PlayYoutube(query):
     playonyt(query)
     return True
 
-# Main method to launch apps, games, or websites
-def OpenApp(app, sess=requests.session()):
-    fallback_urls = {
-        "youtube": "https://www.youtube.com",
-        "instagram": "https://www.instagram.com",
-        "whatsapp": "https://web.whatsapp.com",
-        "facebook": "https://www.facebook.com",
-        "brave": "https://www.brave.com/",
-        "canva": "https://www.canva.com/",
-        "telegram": "https://web.telegram.org/",
-    }
-
-    def extract_links(html):
-        if html is None:
-            return []
-        soup = BeautifulSoup(html, 'html.parser')
-        links = soup.select('a[href^="/url?q="]')
-        return [link.get('href').split('&')[0].replace("/url?q=", "") for link in links if link.get('href')]
-
-    def search_google(query):
-        url = f"https://www.google.com/search?q={query}"
-        headers = {"User-Agent": useragent}
-        response = sess.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.text
+# Websites opened directly instead of searching for an app of the same name
+fallback_urls = {
+    "youtube": "https://www.youtube.com",
+    "instagram": "https://www.instagram.com",
+    "whatsapp": "https://web.whatsapp.com",
+    "facebook": "https://www.facebook.com",
+    "brave": "https://www.brave.com/",
+    "canva": "https://www.canva.com/",
+    "telegram": "https://web.telegram.org/",
+}
+
+# Start an executable and remember it for next time
+def launch_exe(app, path):
+    def start():
+        subprocess.Popen(path)
+        launch_cache.record(app, path)
+    return start
+
+# ---- OpenApp strategies: each returns a Launch (not yet started) or None ----
+def resolve_fallback_url(app):
+    url = fallback_urls.get(app.lower().strip())
+    return url and Launch("fallback_url", url, lambda: webbrowser.open(url))
+
+def resolve_launch_cache(app):
+    path = launch_cache.get(app)
+    if path is None:
         return None
 
-    app_key = app.lower().strip()
-    found_in_fallback = app_key in fallback_urls
-
-    try:
-        appopen(app, match_closest=True, output=True, throw_error=True)
-        print(f"[green]App opened using AppOpener:[/green] {app}")
-        return True
-    except:
-        print(f"[yellow]AppOpener failed for:[/yellow] {app}")
+    def start():
+        try:
+            launch_exe(app, path)()
+        except OSError:
+            launch_cache.evict(app)
+            raise
+    return Launch("launch_cache", path, start)
+
+def resolve_installed_app(app):
+    if installed_app_names() is None:
+        # This AppOpener can't list its apps: let it match and open in one step, as before.
+        return Launch("installed_app", app, lambda: appopen(app, match_closest=True, output=False, throw_error=True))
+    matches = difflib.get_close_matches(app.lower().strip(), installed_app_names(), n=1, cutoff=0.8)
+    if not matches:
+        return None
+    return Launch("installed_app", matches[0], lambda: appopen(matches[0], output=False, throw_error=True))
 
-    if found_in_fallback:
-        webbrowser.open(fallback_urls[app_key])
-        print(f"[blue]Opened fallback URL for:[/blue] {app}")
-        return True
+def resolve_indexed_exe(app):
+    # Only what is indexed already; the slow path below may wait for a scan.
+    paths = executable_index.lookup(app, limit=1)
+    return Launch("indexed_exe", paths[0], launch_exe(app, paths[0])) if paths else None
 
-    html = search_google(app)
-    links = extract_links(html)
-    if links:
-        webbrowser.open(links[0])
-        print(f"[blue]Opened search result for:[/blue] {app}")
-        return True
+def resolve_scanned_exe(app):
+    paths = executable_index.find(app, limit=1)
+    return Launch("scanned_exe", paths[0], launch_exe(app, paths[0])) if paths else None
 
-    cached_paths = load_cached_games()
-    game_key = app.lower().replace(" ", "")
+def resolve_search_result(app):
+    links = web_search.links(app)
+    return Launch("search_result", links[0], lambda: webbrowser.open(links[0])) if links else None
 
-    if game_key in cached_paths:
-        try:
-            subprocess.Popen(cached_paths[game_key])
-            print(f"[green]Launching cached game:[/green] {cached_paths[game_key]}")
-            return True
-        except:
-            print(f"[yellow]Cached path failed. Re-scanning...[/yellow]")
+# Names AppOpener knows on this machine, read once (None if this AppOpener can't list them)
+@functools.lru_cache(maxsize=1)
+def installed_app_names():
+    if give_appnames is None:
+        return None
+    try:
+        return [name.lower() for name in give_appnames()]
+    except Exception as e:
+        print(f"[yellow]Could not list installed apps: {e}[/yellow]")
+        return None
 
-    print(f"[blue]Searching for {app}.exe in local drives...[/blue]")
-    matches = find_game_exe(app)
+# Local lookups first (microseconds to milliseconds), then a deadline-bound race of the slow ones;
+# the web search is listed first so it wins ties with a first-run drive scan
+app_resolver = AppResolver(
+    cheap=[
+        ("fallback_url", resolve_fallback_url),
+        ("launch_cache", resolve_launch_cache),
+        ("installed_app", resolve_installed_app),
+        ("indexed_exe", resolve_indexed_exe),
+    ],
+    slow=[
+        ("search_result", resolve_search_result),
+        ("scanned_exe", resolve_scanned_exe),
+    ],
+)
 
-    if matches:
-        exe_path = matches[0]
-        cached_paths[game_key] = exe_path
-        save_cached_games(cached_paths)
-        subprocess.Popen(exe_path)
-        print(f"[green]Found and launched:[/green] {exe_path}")
+# Main method to launch apps, games, or websites
+def OpenApp(app):
+    launch = app_resolver.open(app)
+    if launch:
+        print(f"[green]Opened {app} via {launch.strategy}:[/green] {launch.target}")
         return True
-    else:
-        print(f"[red]Game .exe for '{app}' not found in system.[/red]")
-        return GoogleSearch(app)
+
+    print(f"[red]Nothing found to open '{app}'. Searching for it instead.[/red]")
+    return GoogleSearch(app)
 
 # Close apps using AppOpener or pass if it's Chrome
 # Ignores Chrome intentionally to prevent accidental shutdown
@@ -227,36 +245,46 @@ def System(command):
     return True
 
 # Parse and asynchronously execute multiple commands
-async def TranslateAndExecute(commands: list[str]):
+# Commands still waiting for a worker when cancel fires are skipped; running ones finish.
+async def TranslateAndExecute(commands: list[str], cancel=None):
+    cancel = cancel or CancelToken()
+
+    def Guarded(func, *args):
+        if cancel.cancelled:
+            return None
+        return func(*args)
+
     funcs = []
     for command in commands:
+        if cancel.cancelled:
+            break
         if command.startswith("open "):
             if "open it" in command or "open file" == command:
                 pass
             else:
-                fun = asyncio.to_thread(OpenApp, command.removeprefix("open "))
+                fun = asyncio.to_thread(Guarded, OpenApp, command.removeprefix("open "))
                 funcs.append(fun)
         elif command.startswith("general "):
             pass
         elif command.startswith("realtime "):
             pass
         elif command.startswith("close"):
-            fun = asyncio.to_thread(CloseApp, command.removeprefix("close "))
+            fun = asyncio.to_thread(Guarded, CloseApp, command.removeprefix("close "))
             funcs.append(fun)
         elif command.startswith("play "):
-            fun = asyncio.to_thread(PlayYoutube, command.removeprefix("play "))
+            fun = asyncio.to_thread(Guarded, PlayYoutube, command.removeprefix("play "))
             funcs.append(fun)
         elif command.startswith("content"):
-            fun = asyncio.to_thread(Content, command.removeprefix("content"))
+            fun = asyncio.to_thread(Guarded, Content, command.removeprefix("content"), cancel)
             funcs.append(fun)
         elif command.startswith("google search "):
-            fun = asyncio.to_thread(GoogleSearch, command.removeprefix("google search "))
+            fun = asyncio.to_thread(Guarded, GoogleSearch, command.removeprefix("google search "))
             funcs.append(fun)
         elif command.startswith("youtube search "):
-            fun = asyncio.to_thread(YouTubeSearch, command.removeprefix("youtube search "))
+            fun = asyncio.to_thread(Guarded, YouTubeSearch, command.removeprefix("youtube search "))
             funcs.append(fun)
         elif command.startswith("system "):
-            fun = asyncio.to_thread(System, command.removeprefix("system "))
+            fun = asyncio.to_thread(Guarded, System, command.removeprefix("system "))
             funcs.append(fun)
         else:
             print(f"No Function Found. For {command}")
@@ -269,8 +297,8 @@ async def TranslateAndExecute(commands: list[str]):
             yield result
 
 # Main function to execute command list asynchronously
-async def Automation(commands: list[str]):
-    async for result in TranslateAndExecute(commands):
+async def Automation(commands: list[str], cancel=None):
+    async for result in TranslateAndExecute(commands, cancel):
         pass
     return True
 
@@ -0,0 +1,163 @@
+# Cooperative cancellation for one assistant turn.
+# MainExecution creates a CancelToken per turn and passes it to the decision model, the
+# answer streams, automation and TTS. A barge-in (mic click or speech during playback)
+# cancels the token: streams are closed, audio stops, and the turn returns early.
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """The turn was cancelled before this step could finish."""
+
+
+class CancelToken:
+    """A one-shot cancellation flag with callbacks, shared by every step of a turn."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+        self.cancelled_at = None    # perf_counter() when cancel() was called.
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        """Cancel once and run the registered callbacks; returns False if already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason, self.cancelled_at = reason, time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback failed: {e}")
+        return True
+
+    def on_cancel(self, callback):
+        """Call callback() on cancellation (right away if the token is already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout seconds; returns True early if the token is cancelled."""
+        return self._event.wait(timeout)
+
+    def keep_going(self, result=None):
+        """The func(r=None) callback TextToSpeech polls: False once cancelled."""
+        return not self._event.is_set()
+
+    def iterate(self, iterable):
+        """Yield from iterable, raising Cancelled between items once cancelled."""
+        for item in iterable:
+            self.raise_if_cancelled()
+            yield item
+
+
+class TurnController:
+    """Owns the token of the turn in flight and measures how quickly cancellation takes effect."""
+
+    Stages = ("audio_stopped", "turn_freed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = None
+        self._latencies = {stage: [] for stage in self.Stages}
+
+    def begin(self):
+        token = CancelToken()
+        with self._lock:
+            self.current = token
+        return token
+
+    def cancel(self, reason):
+        """Cancel the turn in flight, if any; returns True if one was cancelled."""
+        with self._lock:
+            token = self.current
+        return token is not None and token.cancel(reason)
+
+    def record(self, token, stage):
+        """Record the time from token.cancel() to stage."""
+        if token.cancelled_at is None:
+            return None
+        elapsed = time.perf_counter() - token.cancelled_at
+        with self._lock:
+            self._latencies[stage].append(elapsed)
+            del self._latencies[stage][:-50]
+        return elapsed
+
+    def finish(self, token):
+        """Mark the turn done; a cancelled turn records how long it took to free the pipeline."""
+        with self._lock:
+            if self.current is token:
+                self.current = None
+        if token.cancelled:
+            return self.record(token, "turn_freed")
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                stage: {
+                    "count": len(values),
+                    "last_ms": values[-1] * 1000 if values else 0.0,
+                    "max_ms": max(values) * 1000 if values else 0.0,
+                }
+                for stage, values in self._latencies.items()
+            }
+
+
+# Process-wide controller; Main starts and finishes turns, barge-in events cancel them.
+turns = TurnController()
+
+
+# Simulated turn: a streaming answer feeding a polling speaker, cancelled part-way through.
+def MeasureCancellation(runs=10, chunk_seconds=0.05, poll_seconds=0.1):
+    import random
+
+    controller = TurnController()
+    for _ in range(runs):
+        token = controller.begin()
+
+        def answer():
+            for index in range(1000):
+                time.sleep(chunk_seconds)   # Network read between streamed chunks.
+                yield f"word{index} "
+
+        def speak(sentences):
+            for _ in sentences:
+                pass
+            while token.keep_going():       # Playback waits the way AudioPlayer.wait polls.
+                time.sleep(poll_seconds)
+
+        def turn():
+            try:
+                speak(token.iterate(answer()))
+            except Cancelled:
+                pass
+            controller.finish(token)
+
+        worker = threading.Thread(target=turn)
+        worker.start()
+        time.sleep(random.uniform(0.1, 0.5))
+        token.on_cancel(lambda: controller.record(token, "audio_stopped"))
+        controller.cancel("benchmark")
+        worker.join()
+    print(controller.stats())
+
+
+# Run `python -m Backend.Cancellation` to measure cancellation latency offline.
+if __name__ == "__main__":
+    MeasureCancellation()
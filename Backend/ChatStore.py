@@ -0,0 +1,148 @@
+# Append-only conversation store shared by ChatBot, RealtimeSearchEngine and Main.
+# Messages live in a JSONL log (one {"role", "content"} object per line) so a turn
+# costs two appends instead of rewriting the whole ChatLog.json.
+from collections import deque
+from array import array
+import threading
+import json
+import os
+
+ChatLogPath = r"Data\ChatLog.jsonl"       # Append-only message log.
+LegacyChatLogPath = r"Data\ChatLog.json"  # Old whole-file log, imported once.
+TailSize = 200                            # Messages kept in memory for recent().
+
+
+class ChatStore:
+    """Append-only chat history with a byte-offset index and an in-memory tail."""
+
+    def __init__(self, path=ChatLogPath, legacy_path=LegacyChatLogPath, tail_size=TailSize):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.tail_size = tail_size
+        self._lock = threading.RLock()
+        self._offsets = array("q")          # Byte offset of every message line.
+        self._tail = deque(maxlen=tail_size)
+        self._file = None
+
+    # Open the log on first use, importing ChatLog.json if this is the first run.
+    def _open(self):
+        if self._file is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.path):
+            self._write_all(self._read_legacy())
+
+        # Build the offset index and the tail in one pass over the log.
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    self._offsets.append(offset)
+                    self._tail.append(json.loads(line))
+                offset += len(line)
+        self._file = open(self.path, "ab")
+
+    def _read_legacy(self):
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return []
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, OSError) as e:
+            print(f"Could not import {self.legacy_path}: {e}")
+            return []
+
+    def _write_all(self, messages):
+        with open(self.path, "wb") as f:
+            for message in messages:
+                f.write(self._encode(message["role"], message["content"]))
+
+    @staticmethod
+    def _encode(role, content):
+        return (json.dumps({"role": role, "content": content}, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def append(self, role, content):
+        """Append one message; O(1) regardless of history length."""
+        with self._lock:
+            self._open()
+            self._file.seek(0, os.SEEK_END)
+            self._offsets.append(self._file.tell())
+            self._file.write(self._encode(role, content))
+            self._file.flush()
+            self._tail.append({"role": role, "content": content})
+
+    def append_exchange(self, question, answer):
+        """Append a user question and its answer as one unit, so turns answered in parallel don't interleave."""
+        with self._lock:
+            self.append("user", question)
+            self.append("assistant", answer)
+
+    def recent(self, count=TailSize):
+        """Return the last `count` messages, oldest first."""
+        with self._lock:
+            self._open()
+            if count <= 0:
+                return []
+            if count <= len(self._tail) or len(self._tail) == len(self._offsets):
+                # The tail holds the window, or the whole log while it is shorter than the tail.
+                return list(self._tail)[-count:]
+            # Older than the cached tail: seek straight to the first requested line.
+            start = max(len(self._offsets) - count, 0)
+            return self._read_from(start)
+
+    def all(self):
+        with self._lock:
+            self._open()
+            return self._read_from(0)
+
+    def _read_from(self, index):
+        if index >= len(self._offsets):
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[index])
+            return [json.loads(line) for line in f if line.strip()]
+
+    def __len__(self):
+        with self._lock:
+            self._open()
+            return len(self._offsets)
+
+    def clear(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._write_all([])
+            self._offsets = array("q")
+            self._tail.clear()
+            self._open()
+
+
+# Process-wide store used by the chat engines and Main.
+chat_log = ChatStore()
+
+
+# Benchmark: per-turn latency (read context + append user and assistant) by history size.
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ChatStore(os.path.join(directory, "ChatLog.jsonl"), legacy_path=None)
+        size = 0
+        for target in (10, 100, 1000, 10000, 100000):
+            while size < target:
+                store.append("user" if size % 2 == 0 else "assistant", f"message number {size} " * 8)
+                size += 1
+
+            turns = 200
+            start = time.perf_counter()
+            for _ in range(turns):
+                store.recent(20)
+                store.append("user", "What's the weather like?")
+                store.append("assistant", "It is sunny today.")
+            size += 2 * turns
+            elapsed = (time.perf_counter() - start) / turns
+            print(f"{target:>7} messages: {elapsed * 1e6:8.1f} us per turn")
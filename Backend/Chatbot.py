@@ -1,44 +1,35 @@
-from groq import Groq #Importing the Groq library to use its API.
-from json import load, dump #Importinf functions to read and write JSON files.
+from Backend.ChatStore import chat_log #Importing the shared append-only chat history store.
+from Backend.ContextWindow import BuildContext #Importing the token-budgeted context builder.
+from Backend.Services import services #Importing the lazy service registry that owns the Groq client.
 import datetime # Importing the datetime module for real-time date & time information.
-from dotenv import dotenv_values #Importing dotenv_values to read environment variables from a .env file.
+from Backend.Settings import settings #Importing the shared settings parsed once from .env.
+from Backend.Resilience import providers, DegradedAnswer #Importing bounded retries, the circuit breaker and deadlines for Groq.
+from Backend.Cancellation import CancelToken #Importing the per-turn cancellation token used for barge-in.
 
-#Load environment variables from the .env file.
-env_vars = dotenv_values(".env")
+# Number of previous messages sent along with each query.
+HistoryLimit = 200
 
-#Retrieve specific environment variables for username, assistance name and API key.
-Username = env_vars.get("Username")
-Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey")
+# Build the system instructions from the current settings (called again after every reload).
+def ApplySettings(config):
+    global Username, Assistantname, System, SystemChatBot
 
-#Initialize the Groq client using the provided API key.
-client = Groq(api_key=GroqAPIKey)
+    Username = config.username
+    Assistantname = config.assistant_name
 
-#Initialize an empty list to store chat messages.
-messages = []
-
-#Define a system message that provides context to the AI chatbot about its role & behaviour.
-System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
+    #Define a system message that provides context to the AI chatbot about its role & behaviour.
+    System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which also has real-time up-to-date information from the internet.
 *** Do not tell time until I ask, do not talk too much, just answer the question.***
 *** Reply in only English, even if the question is in Hindi, reply in English.***
 *** Do not provide notes in the output, just answer the question and never mention your training data. ***
 """
 
+    # A list of system instructions for the chatbot.
+    SystemChatBot = [
+        {"role" : "system","content" : System}
+    ]
+
+settings.on_change(ApplySettings)
 
-# A list of system instructions for the chatbot.
-SystemChatBot = [
-    {"role" : "system","content" : System}
-]
-
-# Attempt to load the chat log from a JSON file.
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f) # Load existing messages from the chat log.
-except FileNotFoundError:
-    # If the file doesn't exist, create an empty JSOn file to store the chat logs.
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-           
 # Function to get real-time date and time information
 def RealtimeInformation():
     current_date_time = datetime.datetime.now()  # Get the current date & time
@@ -63,54 +54,66 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines) #Join the clean lines back together.
     return modified_answer
 
-# Main chatbot function to handle user queries. 
-def ChatBot(Query):
-    """This function sends the user's query to the chatbot and returns the AI's response."""
+# Streaming chatbot function: yields the AI's response piece by piece as it is generated.
+# deadline, if given, is a Resilience.Deadline shared with the caller; cancel, a CancelToken that stops the stream.
+def ChatBotStream(Query, deadline=None, cancel=None):
+    """This function sends the user's query to the chatbot and yields the AI's response as it streams in."""
 
-    try:
-        # Load the existing chat log from the Json file
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
+    Answer = "" # Initialize an empty string to collect the streamed response.
+    cancel = cancel or CancelToken() # A token nobody cancels when the caller doesn't pass one.
 
-        # Append the user's query to the messages list.
-        messages.append({"role": "user", "content": f"{Query}"})
+    # Read the most recent turns from the chat store and add the user's query.
+    messages = chat_log.recent(HistoryLimit)
+    messages.append({"role": "user", "content": f"{Query}"})
 
+    def Request(deadline):
         # Make a rquest to the Groq API for a response.
-        completion = client.chat.completions.create(
-            model = "llama3-70b-8192", # Specify the AI model to use.
-            messages = SystemChatBot + [{"role":"system","content": RealtimeInformation()}] + messages, # Include System instructions, real-time info, and chat history.
+        completion = services.get("groq").chat.completions.create(
+            model = settings.get().chat_model, # Specify the AI model to use.
+            messages = BuildContext(SystemChatBot + [{"role":"system","content": RealtimeInformation()}], messages, max_tokens=1024, summarize=True), # Include System instructions, real-time info, and as much chat history as fits.
             max_tokens = 1024, # Limit the maximum tokens in the response.
             temperature = 0.7, # Adjust response randomness (higher means more random).
             top_p = 1, # Use nuclear sampling to control diversity
             stream = True, # Enable streaming response.
-            stop = None # Aloow the model to determine when to stop.
-
+            stop = None, # Aloow the model to determine when to stop.
+            timeout = deadline.remaining() # Never wait past the request's deadline.
         )
-        Answer = "" # Initialize an empty string to store the AI response.
+        cancel.on_cancel(completion.close) # Closing the HTTP stream unblocks a pending read at once.
+
+        # Yield each streamed chunk as soon as it arrives, stopping between chunks once cancelled.
+        for chunk in cancel.iterate(completion):
+            Delta = chunk.choices[0].delta.content
+            if Delta:  # Check if there's content in the current chunk.
+                yield Delta.replace("</s>", "")  # Clean up any unwanted tokens from the response.
 
-        # Process the streamed response chunks.
-        for chunk in completion:
-            if chunk.choices[0].delta.content:  # Check if there's content in the current chunk.
-                Answer += chunk.choices[0].delta.content # Append the content to the answer.
+    try:
+        # Failed requests are retried with backoff until the first chunk arrives.
+        for Delta in providers["groq"].stream(Request, deadline, cancel):
+            Answer += Delta
+            yield Delta
 
-        Answer = Answer.replace("</s>", "")  # Clean up any unwanted tokens from the response. 
+    except Exception as e:
+        if cancel.cancelled:
+            # Barge-in: stop quietly and keep the unfinished exchange out of the chat log.
+            print(f"Answer cancelled ({cancel.reason})")
+            return
+        # Retries are exhausted or the circuit is open: degrade instead of retrying forever.
+        print(f"Error: {e}")
+        if not Answer:
+            yield DegradedAnswer
+        return  # Part of the answer was already delivered, so don't start over.
 
-        # Append the chatbot's response to the messages list.
-        messages.append({"role":"assistant","content": Answer})
+    Answer = Answer.replace("</s>", "")
 
-        # Save the updated chat log to the JSON file  
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump (messages, f, indent = 4)
+    # Append the query and the chatbot's response to the chat log.
+    chat_log.append_exchange(f"{Query}", Answer)
 
-        # Return the formatted response.
-        return AnswerModifier(Answer=Answer)
+# Main chatbot function to handle user queries. 
+def ChatBot(Query, cancel=None):
+    """This function sends the user's query to the chatbot and returns the AI's response."""
 
-    except Exception as e:
-        # Handle errors by printing the exception and resetting the chat log.
-        print(f"Error: {e}")
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump ([], f, indent = 4)
-        return ChatBot(Query)     # Retry the query after resetting the log.
+    # Collect the whole streamed response and return it formatted.
+    return AnswerModifier(Answer="".join(ChatBotStream(Query, cancel=cancel)))
 
 # Main Program entry point.
 if __name__ == "__main__" :
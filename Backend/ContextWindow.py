@@ -0,0 +1,95 @@
+# Token-budgeted context assembly for the Groq chat completion calls.
+# Keeps the system prompt and the newest turns inside the model's context window
+# instead of sending the whole chat history with every request.
+from functools import lru_cache
+import re
+
+ContextTokens = 8192       # Context window of llama3-70b-8192.
+SafetyMargin = 256         # Head-room for the approximation error and message framing.
+MessageOverhead = 4        # Approximate tokens spent on role/separator per message.
+SummaryTokens = 200        # Budget for the summary of dropped turns.
+
+_pieces = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+# Approximate the Llama 3 BPE token count without a tokenizer download:
+# short words are one token, longer words roughly one token per 4 characters,
+# and every punctuation mark is its own token.
+@lru_cache(maxsize=8192)
+def CountTokens(text):
+    tokens = 0
+    for piece in _pieces.findall(text):
+        tokens += 1 if len(piece) <= 4 else (len(piece) + 3) // 4
+    return tokens
+
+
+def MessageTokens(message):
+    # Counts are cached per message content, so history is not re-counted every turn.
+    return CountTokens(message["content"]) + MessageOverhead
+
+
+def SummarizeTurns(turns, budget=SummaryTokens):
+    """Compress dropped turns into one short system message listing what the user asked."""
+    topics = []
+    used = 0
+    for message in reversed(turns):
+        if message["role"] != "user":
+            continue
+        words = message["content"].split()
+        topic = " ".join(words[:12]) + ("..." if len(words) > 12 else "")
+        cost = CountTokens(topic) + 1
+        if used + cost > budget:
+            break
+        topics.append(topic)
+        used += cost
+
+    if not topics:
+        return None
+    topics.reverse()
+    return {"role": "system", "content": "Earlier in this conversation the user asked about: " + "; ".join(topics)}
+
+
+def BuildContext(system_messages, history, max_tokens=1024, context_tokens=ContextTokens, summarize=False):
+    """Return system_messages plus as many of the newest history messages as fit.
+
+    The budget is the context window minus the completion's max_tokens and a
+    safety margin. System messages are always kept; older turns are dropped,
+    or condensed into a single summary message when summarize is True.
+    """
+    budget = context_tokens - max_tokens - SafetyMargin
+    budget -= sum(MessageTokens(message) for message in system_messages)
+    if summarize:
+        budget -= SummaryTokens + MessageOverhead
+
+    kept = []
+    for message in reversed(history):
+        cost = MessageTokens(message)
+        if cost > budget and kept:
+            break
+        budget -= cost
+        kept.append(message)
+    kept.reverse()
+
+    # Don't open the window with an orphaned assistant reply.
+    while len(kept) > 1 and kept[0]["role"] == "assistant":
+        kept.pop(0)
+
+    dropped = history[:len(history) - len(kept)]
+    if summarize and dropped:
+        summary = SummarizeTurns(dropped)
+        if summary:
+            return list(system_messages) + [summary] + kept
+    return list(system_messages) + kept
+
+
+if __name__ == "__main__":
+    history = []
+    for i in range(500):
+        history.append({"role": "user", "content": f"Question {i}: can you tell me something interesting about topic {i}?"})
+        history.append({"role": "assistant", "content": f"Here is an interesting fact about topic {i}. " * 10})
+
+    system = [{"role": "system", "content": "You are a helpful assistant."}]
+    context = BuildContext(system, history, summarize=True)
+    total = sum(MessageTokens(message) for message in context)
+    print(f"Kept {len(context) - 1} of {len(history)} messages, ~{total} tokens")
+    print(CountTokens.cache_info())
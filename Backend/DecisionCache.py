@@ -0,0 +1,125 @@
+# Persistent cache of FirstLayerDMM decisions.
+# Repeated commands ("open youtube", "play lofi") are answered from here instead of a
+# Cohere round trip. Entries are keyed on the normalized query and bounded by TTL and size.
+from collections import OrderedDict
+from Backend.IntentClassifier import NormalizeQuery
+import threading
+import tempfile
+import json
+import time
+import os
+
+DecisionCachePath = r"Data\DecisionCache.json"
+DecisionCacheTTL = 7 * 24 * 60 * 60     # Seconds before a cached decision is asked again.
+DecisionCacheEntries = 500              # Least recently used decisions are dropped above this.
+UncachedCategories = ("realtime", "reminder")   # Decisions that must always be made fresh.
+
+
+class DecisionCache:
+    """TTL- and size-bounded LRU map from normalized query to decision list, saved to disk."""
+
+    def __init__(self, path=DecisionCachePath, ttl=DecisionCacheTTL, max_entries=DecisionCacheEntries,
+                 uncached=UncachedCategories):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.uncached = tuple(uncached)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0    # Decision time avoided by hits.
+        self._lock = threading.Lock()
+        self._entries = None        # key -> {"decision", "created", "seconds"}, least recently used first.
+
+    @staticmethod
+    def key(query):
+        return NormalizeQuery(query)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in sorted(stored.items(), key=lambda item: item[1].get("used", 0)):
+            if now - entry.get("created", 0) < self.ttl:
+                self._entries[key] = entry
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Could not save the decision cache: {e}")
+
+    def is_cacheable(self, decision):
+        return bool(decision) and not any(task.startswith(self.uncached) for task in decision)
+
+    def get(self, query):
+        key = self.key(query)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry["created"] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            entry["used"] = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry["seconds"]
+            return list(entry["decision"])
+
+    def put(self, query, decision, seconds=0.0):
+        """Store decision (made in seconds) unless it falls in an uncached category."""
+        if not self.is_cacheable(decision):
+            return
+        now = time.time()
+        with self._lock:
+            self._load()
+            self._entries[self.key(query)] = {"decision": list(decision), "created": now, "used": now, "seconds": seconds}
+            self._entries.move_to_end(self.key(query))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def cached(self, decide):
+        """Wrap decide(query, ...) so repeated queries are answered from the cache."""
+        def cached_decide(query, *args, **kwargs):
+            decision = self.get(query)
+            if decision is None:
+                start = time.perf_counter()
+                decision = decide(query, *args, **kwargs)
+                self.put(query, decision, time.perf_counter() - start)
+            return decision
+        return cached_decide
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "entries": len(self._entries),
+            }
+
+
+# Process-wide cache used by FirstLayerDMM.
+decision_cache = DecisionCache()
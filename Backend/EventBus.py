@@ -0,0 +1,180 @@
+# In-process publish/subscribe channel shared by the GUI and the backend.
+# Replaces the Frontend/Files/*.data polling with events delivered on publish.
+from collections import namedtuple
+import threading
+import time
+import os
+
+# Typed events carried on the bus.
+StatusChanged = namedtuple("StatusChanged", ["status"])        # Assistant status text ("Listening...", etc.)
+MicToggled = namedtuple("MicToggled", ["active"])               # Microphone switched on (True) or off (False)
+ResponseAppended = namedtuple("ResponseAppended", ["text"])     # New text for the chat panel
+ImageRequested = namedtuple("ImageRequested", ["prompt"])       # Prompt handed to the image generator
+ResponseDelta = namedtuple("ResponseDelta", ["text", "done"])   # Streamed piece of a chat message; done ends it
+SettingsChanged = namedtuple("SettingsChanged", ["settings"])   # New Settings loaded from .env
+BargeIn = namedtuple("BargeIn", ["source"])                     # User interrupted the turn ("mic" click or "speech" during playback)
+
+
+class EventBus:
+    """Thread-safe publish/subscribe channel keyed by event type.
+
+    The bus remembers the latest event of every type so late subscribers
+    (e.g. widgets created after InitialExecution) and readers such as
+    GetAssistantStatus() can see the current state without touching disk.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._latest = {}
+        self._condition = threading.Condition()
+
+    def subscribe(self, event_type, callback, replay=False):
+        # Register a callback; optionally deliver the latest event straight away.
+        with self._condition:
+            self._subscribers.setdefault(event_type, []).append(callback)
+            last = self._latest.get(event_type)
+        if replay and last is not None:
+            callback(last)
+        return callback
+
+    def unsubscribe(self, event_type, callback):
+        with self._condition:
+            callbacks = self._subscribers.get(event_type, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, event):
+        # Store the event as the current state, wake waiters, then notify subscribers.
+        event_type = type(event)
+        with self._condition:
+            self._latest[event_type] = event
+            callbacks = list(self._subscribers.get(event_type, []))
+            self._condition.notify_all()
+
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"EventBus subscriber error for {event_type.__name__}: {e}")
+
+    def latest(self, event_type, default=None):
+        with self._condition:
+            return self._latest.get(event_type, default)
+
+    def wait_for(self, event_type, predicate=lambda event: True, timeout=None):
+        """Block until the latest event of event_type satisfies predicate.
+
+        Returns the matching event, or None if the timeout expires.
+        """
+        with self._condition:
+            matched = self._condition.wait_for(
+                lambda: event_type in self._latest and predicate(self._latest[event_type]),
+                timeout=timeout
+            )
+            return self._latest[event_type] if matched else None
+
+
+# Optional adapter that mirrors bus events into the legacy Frontend/Files/*.data files.
+class FileAdapter:
+    """Writes bus events to the old *.data files for out-of-process readers.
+
+    Backend/ImageGeneration.py runs as a separate process and still watches
+    ImageGeneration.data, so Main attaches this adapter for ImageRequested.
+    """
+
+    FileNames = {
+        StatusChanged: "Status.data",
+        MicToggled: "Mic.data",
+        ResponseAppended: "Responses.data",
+        ImageRequested: "ImageGeneration.data",
+        ResponseDelta: "Responses.data",
+    }
+
+    def __init__(self, event_bus, directory=None, event_types=None):
+        self.directory = directory or os.path.join(os.getcwd(), "Frontend", "Files")
+        self.event_types = event_types or list(self.FileNames)
+        self._streamed = ""
+        os.makedirs(self.directory, exist_ok=True)
+        for event_type in self.event_types:
+            event_bus.subscribe(event_type, self.write, replay=True)
+
+    def write(self, event):
+        if isinstance(event, ResponseDelta):
+            # Streamed messages are written once complete, like ShowTextToScreen did.
+            self._streamed += event.text
+            if not event.done:
+                return
+            event, self._streamed = ResponseAppended(self._streamed), ""
+
+        if isinstance(event, StatusChanged):
+            content = event.status
+        elif isinstance(event, MicToggled):
+            content = str(bool(event.active))
+        elif isinstance(event, ResponseAppended):
+            content = event.text
+        else:
+            content = f"{event.prompt},True"
+
+        path = os.path.join(self.directory, self.FileNames[type(event)])
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+
+# Process-wide bus used by Main, the GUI and the backend modules.
+bus = EventBus()
+
+
+# Benchmark: idle CPU time and wakeups of the old file polling versus the bus.
+def _measure_idle(setup, duration):
+    stop = threading.Event()
+    wakeups = [0]
+    threads = [threading.Thread(target=worker, args=(stop, wakeups), daemon=True) for worker in setup()]
+    cpu_start = time.process_time()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return time.process_time() - cpu_start, wakeups[0]
+
+
+def _polling_workers(directory):
+    for name, value in (("Mic.data", "False"), ("Status.data", "Available..."), ("Responses.data", "")):
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+            file.write(value)
+
+    def reader(names, interval):
+        def worker(stop, wakeups):
+            while not stop.is_set():
+                for name in names:
+                    with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+                        file.read()
+                wakeups[0] += 1
+                time.sleep(interval)
+        return worker
+
+    # ChatSection timer, InitialScreen timer and Main.FirstThread as they used to run.
+    return [reader(["Responses.data", "Status.data"], 0.1), reader(["Status.data"], 0.1),
+            reader(["Mic.data", "Status.data"], 0.1)]
+
+
+def _bus_workers(event_bus):
+    def waiter(stop, wakeups):
+        while not stop.is_set():
+            event_bus.wait_for(MicToggled, lambda event: event.active, timeout=0.5)
+            wakeups[0] += 1
+
+    event_bus.publish(MicToggled(False))
+    return [waiter]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    seconds = 5
+    with tempfile.TemporaryDirectory() as directory:
+        cpu, wakeups = _measure_idle(lambda: _polling_workers(directory), seconds)
+        print(f"File polling : {cpu * 1000:.1f} ms CPU, {wakeups} wakeups in {seconds}s")
+    cpu, wakeups = _measure_idle(lambda: _bus_workers(EventBus()), seconds)
+    print(f"Event bus    : {cpu * 1000:.1f} ms CPU, {wakeups} wakeups in {seconds}s")
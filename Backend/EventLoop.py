@@ -0,0 +1,208 @@
+# One long-lived asyncio event loop for the assistant, running in its own thread.
+# Replaces asyncio.run per command: coroutines are submitted from any thread (Qt, the
+# voice loop) and blocking work runs on two sized pools, one for SDK/network calls and
+# one for disk I/O. Queue depth and wait/run latency are recorded for both.
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import asyncio
+import time
+
+SdkWorkers = 16     # Blocking SDK and network calls (asyncio.to_thread on this loop lands here).
+DiskWorkers = 2     # File reads and writes.
+LagProbeSeconds = 0.5   # How often the loop checks how late it is to run a scheduled callback.
+
+
+class LatencyStats:
+    """Thread-safe counters for one kind of work: queued now, running now, wait and run times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def enqueue(self):
+        with self._lock:
+            self.queued += 1
+        return time.perf_counter()
+
+    def begin(self, submitted):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds += started - submitted
+        return started
+
+    def end(self, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            self.run_seconds += elapsed
+            self.max_run_seconds = max(self.max_run_seconds, elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "avg_wait_ms": self.wait_seconds / done * 1000,
+                "avg_run_ms": self.run_seconds / done * 1000,
+                "max_run_ms": self.max_run_seconds * 1000,
+            }
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that records how long work waits for a worker and how long it runs."""
+
+    def __init__(self, max_workers, thread_name_prefix):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.stats = LatencyStats()
+
+    def submit(self, fn, /, *args, **kwargs):
+        submitted = self.stats.enqueue()
+
+        def timed():
+            started = self.stats.begin(submitted)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.stats.end(started)
+
+        return super().submit(timed)
+
+
+class AssistantLoop:
+    """An asyncio loop on a daemon thread with a thread-safe submit API.
+
+    submit() schedules a coroutine and returns a concurrent.futures.Future;
+    run() does the same and waits for the result. Inside coroutines,
+    asyncio.to_thread uses the SDK pool and run_io() the disk pool.
+    """
+
+    def __init__(self, sdk_workers=SdkWorkers, disk_workers=DiskWorkers, name="assistant-loop"):
+        self.name = name
+        self.sdk_workers = sdk_workers
+        self.disk_workers = disk_workers
+        self.loop = None
+        self.sdk_pool = None
+        self.disk_pool = None
+        self.coroutines = LatencyStats()
+        self.max_lag = 0.0      # Worst delay seen between a callback's due time and when it ran.
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the loop thread if it is not running; safe to call from any thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.sdk_pool = InstrumentedExecutor(self.sdk_workers, "sdk")
+            self.disk_pool = InstrumentedExecutor(self.disk_workers, "disk")
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self.sdk_pool)
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.create_task(self._probe_lag())
+        self.loop.run_forever()
+
+    async def _probe_lag(self):
+        while True:
+            due = self.loop.time() + LagProbeSeconds
+            await asyncio.sleep(LagProbeSeconds)
+            self.max_lag = max(self.max_lag, self.loop.time() - due)
+
+    async def _timed(self, coroutine, submitted):
+        started = self.coroutines.begin(submitted)
+        try:
+            return await coroutine
+        finally:
+            self.coroutines.end(started)
+
+    def submit(self, coroutine):
+        """Schedule coroutine on the loop from any thread; returns a concurrent.futures.Future."""
+        self.start()
+        submitted = self.coroutines.enqueue()
+        return asyncio.run_coroutine_threadsafe(self._timed(coroutine, submitted), self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Run coroutine on the loop and wait for its result (not from the loop thread itself)."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("AssistantLoop.run() would deadlock when called on the loop thread; await instead")
+        return self.submit(coroutine).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread."""
+        self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    async def run_io(self, func, *args):
+        """Await func(*args) on the disk I/O pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.disk_pool, lambda: func(*args))
+
+    def stats(self):
+        """Queue depth and latency for submitted coroutines and both thread pools."""
+        if self._thread is None:
+            return {"running": False}
+        return {
+            "running": True,
+            "tasks": len(asyncio.all_tasks(self.loop)),
+            "max_lag_ms": self.max_lag * 1000,
+            "coroutines": self.coroutines.snapshot(),
+            "sdk_pool": self.sdk_pool.stats.snapshot(),
+            "disk_pool": self.disk_pool.stats.snapshot(),
+        }
+
+    def stop(self):
+        """Stop the loop and shut both pools down; a later submit() starts a fresh loop."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self.sdk_pool.shutdown(wait=False, cancel_futures=True)
+            self.disk_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread = None
+
+
+# Process-wide loop used by Main (the voice loop and the GUI thread) and ImageGeneration.
+assistant_loop = AssistantLoop()
+
+
+# Compares a fresh asyncio.run per command with submitting to the persistent loop.
+def Benchmark(commands=50):
+    async def command():
+        await asyncio.gather(*(asyncio.to_thread(time.sleep, 0.001) for _ in range(4)))
+
+    start = time.perf_counter()
+    for _ in range(commands):
+        asyncio.run(command())
+    per_run = (time.perf_counter() - start) / commands
+
+    assistant_loop.run(command())   # Start the loop and its pools outside the measurement.
+    start = time.perf_counter()
+    for _ in range(commands):
+        assistant_loop.run(command())
+    per_submit = (time.perf_counter() - start) / commands
+
+    print(f"asyncio.run per command:  {per_run * 1000:.2f} ms")
+    print(f"persistent loop submit:   {per_submit * 1000:.2f} ms")
+    print(f"stats: {assistant_loop.stats()}")
+
+
+# Run `python -m Backend.EventLoop` for the benchmark.
+if __name__ == "__main__":
+    Benchmark()
@@ -0,0 +1,328 @@
+# Persistent index of the .exe files on the local drives, used by OpenApp.
+# Replaces the os.walk scan of every drive (and game_paths.json): a background scanner
+# walks each root with os.scandir on its own worker, the result is saved compressed,
+# and later refreshes only re-list directories whose mtime changed.
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import threading
+import tempfile
+import difflib
+import heapq
+import gzip
+import json
+import time
+import re
+import os
+
+ExecutableIndexPath = r"Data\ExecutableIndex.json.gz"
+SearchRoots = ["C:\\", "D:\\", "E:\\"]
+
+# Directories never worth descending into (matched as substrings of the lowercased name).
+ExcludedDirs = ["$recycle.bin", "windows", "programdata", "system volume information"]
+ExcludedPattern = re.compile("|".join(re.escape(name) for name in ExcludedDirs))
+
+# Executables that ship next to the real program but never are what the user asked for.
+HelperNames = re.compile(r"unins|setup|install|crash|update|redist|helper|report")
+
+FuzzyCutoff = 0.75   # Minimum similarity for a name that is neither exact nor a substring match.
+FuzzyCandidates = 30 # Names sharing the most trigrams with the query that are compared in full.
+MissRefreshInterval = 60.0  # Minimum seconds between background refreshes triggered by lookup misses.
+
+
+def NormalizeName(name):
+    """Lowercase alphanumerics only: "Hollow Knight.exe" and "hollowknight" compare equal."""
+    if name.lower().endswith(".exe"):
+        name = name[:-4]
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def NameTokens(name):
+    if name.lower().endswith(".exe"):
+        name = name[:-4]
+    # Split "HollowKnight_v2" into hollow, knight, v2.
+    return {token.lower() for token in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", name)}
+
+
+def Trigrams(key):
+    return {key[index:index + 3] for index in range(max(1, len(key) - 2))}
+
+
+def ScanRoot(root, previous=None):
+    """Walk root and return {directory: (mtime_ns, exe names, subdirectory names)}.
+
+    Directories whose mtime matches the previous scan are not listed again;
+    their cached contents are reused.
+    """
+    previous = previous or {}
+    result = {}
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+
+        cached = previous.get(path)
+        if cached is not None and cached[0] == mtime:
+            exes, subdirs = cached[1], cached[2]
+        else:
+            exes, subdirs = [], []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not ExcludedPattern.search(name.lower()):
+                                    subdirs.append(name)
+                            elif name[-4:].lower() == ".exe":
+                                exes.append(name)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+        result[path] = (mtime, exes, subdirs)
+        stack.extend(os.path.join(path, name) for name in subdirs)
+    return result
+
+
+class ExecutableIndex:
+    """Directory snapshot of every root plus name and token maps for fast lookups."""
+
+    def __init__(self, path=ExecutableIndexPath, roots=None):
+        self.path = path
+        self.roots = list(SearchRoots if roots is None else roots)
+        self._dirs = {}         # directory -> (mtime_ns, exe names, subdirectory names)
+        self._names = {}        # normalized name -> [full paths]
+        self._tokens = {}       # name token -> set of normalized names
+        self._trigrams = {}     # three-letter slice -> set of normalized names, for fuzzy lookups
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._loaded = False
+        self._ready = threading.Event()     # Set once an index (loaded or scanned) is available.
+        self._last_miss_refresh = None      # monotonic() of the last refresh a miss scheduled.
+        self.last_scan = {}     # Statistics of the most recent scan.
+
+    # ---------------- persistence ---------------- #
+    def load(self):
+        """Load the saved index once; returns True if one was found."""
+        with self._lock:
+            if self._loaded:
+                return bool(self._dirs)
+            self._loaded = True
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if stored.get("roots") != self.roots:
+            return False
+        self._install({path: tuple(entry) for path, entry in stored["dirs"].items()})
+        return True
+
+    def _save(self, dirs):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(fd, "wb"), "wt", encoding="utf-8") as f:
+                json.dump({"roots": self.roots, "dirs": dirs}, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Could not save the executable index: {e}")
+
+    def _install(self, dirs):
+        names, tokens, trigrams = {}, {}, {}
+        for directory, (_, exes, _) in dirs.items():
+            for exe in exes:
+                key = NormalizeName(exe)
+                if key not in names:
+                    for token in NameTokens(exe):
+                        tokens.setdefault(token, set()).add(key)
+                    for gram in Trigrams(key):
+                        trigrams.setdefault(gram, set()).add(key)
+                names.setdefault(key, []).append(os.path.join(directory, exe))
+        with self._lock:
+            self._dirs, self._names, self._tokens, self._trigrams = dirs, names, tokens, trigrams
+        self._ready.set()
+
+    # ---------------- scanning ---------------- #
+    def refresh(self):
+        """Rescan every root in parallel (unchanged directories are reused) and save the result."""
+        with self._scan_lock:
+            self.load()
+            with self._lock:
+                previous = self._dirs
+            start = time.perf_counter()
+            roots = [root for root in self.roots if os.path.isdir(root)]
+            dirs = {}
+            with ThreadPoolExecutor(max_workers=max(1, len(roots)), thread_name_prefix="exe-scan") as pool:
+                for scanned in pool.map(lambda root: ScanRoot(root, previous), roots):
+                    dirs.update(scanned)
+
+            changed = sum(1 for path, entry in dirs.items() if previous.get(path) != entry)
+            removed = len(previous.keys() - dirs.keys())
+            if changed or removed or not previous:
+                self._install(dirs)
+                self._save(dirs)
+            self._ready.set()
+            self.last_scan = {
+                "seconds": time.perf_counter() - start,
+                "directories": len(dirs),
+                "changed": changed,
+                "removed": removed,
+                "executables": sum(len(entry[1]) for entry in dirs.values()),
+            }
+            return self.last_scan
+
+    def refresh_in_background(self):
+        thread = threading.Thread(target=self.refresh, name="exe-index", daemon=True)
+        thread.start()
+        return thread
+
+    # ---------------- lookups ---------------- #
+    @staticmethod
+    def _rank(query, key, path):
+        # Exact name first, then names containing the query, closest in length, outside helper tools, shallowest.
+        helper = bool(HelperNames.search(key)) and not HelperNames.search(query)
+        return (key != query, query not in key, helper, abs(len(key) - len(query)), path.count(os.sep), path)
+
+    def _fuzzy(self, query, names, trigrams):
+        shared = Counter()
+        for gram in Trigrams(query):
+            shared.update(trigrams.get(gram, ()))
+        scored = [(difflib.SequenceMatcher(None, query, key).ratio(), key) for key, _ in shared.most_common(FuzzyCandidates)]
+        return [key for ratio, key in sorted(scored, reverse=True) if ratio >= FuzzyCutoff]
+
+    def lookup(self, app_name, limit=3):
+        """Best matching executable paths for app_name from the current index."""
+        query = NormalizeName(app_name)
+        if not query:
+            return []
+        with self._lock:
+            names, tokens, trigrams = self._names, self._tokens, self._trigrams
+
+        # Exact names and names containing the query, as the old drive scan matched.
+        candidates = {key for key in names if query in key}
+        if not candidates:
+            # Names containing every word of the query in any order ("knight hollow").
+            words = [tokens.get(token, set()) for token in NameTokens(app_name)]
+            candidates = set.intersection(*words) if words else set()
+        if candidates:
+            matches = heapq.nsmallest(limit, ((key, path) for key in candidates for path in names[key]),
+                                      key=lambda match: self._rank(query, *match))
+        else:
+            # Misheard or misspelled names ("stardw valey"): closest names by trigram overlap.
+            matches = [(key, path) for key in self._fuzzy(query, names, trigrams) for path in names[key]]
+        return [path for _, path in matches[:limit]]
+
+    def find(self, app_name, limit=3, timeout=None):
+        """Look app_name up, waiting for the first scan if no index exists yet.
+
+        A miss returns [] at once and schedules a background refresh (at most one per
+        MissRefreshInterval), so a newly installed program is found on the next request
+        without walking the drives on the caller's thread.
+        """
+        if not self.load() and not self._ready.is_set():
+            self.refresh_in_background()
+        if not self._ready.wait(timeout):
+            return []
+        matches = self.lookup(app_name, limit)
+        if not matches:
+            self.refresh_after_miss()
+        return matches
+
+    def refresh_after_miss(self):
+        """Start a background refresh unless one is running or a miss started one recently."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_miss_refresh is not None and now - self._last_miss_refresh < MissRefreshInterval:
+                return None
+            if self._scan_lock.locked():
+                return None
+            self._last_miss_refresh = now
+        return self.refresh_in_background()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "directories": len(self._dirs),
+                "names": len(self._names),
+                "tokens": len(self._tokens),
+                "trigrams": len(self._trigrams),
+                "last_scan": dict(self.last_scan),
+            }
+
+
+# Process-wide index used by OpenApp; loaded and refreshed in the background during warm-up.
+executable_index = ExecutableIndex()
+
+
+# Synthetic tree for the benchmark: `files` empty files, about 2% of them .exe, `per_dir` per directory.
+def BuildSyntheticTree(root, files=1_000_000, per_dir=50, fanout=20, exe_every=50):
+    words = ["hollow", "knight", "steam", "launcher", "portal", "stardew", "valley", "minecraft",
+             "blender", "discord", "chrome", "obs", "studio", "code", "terraria", "celeste"]
+    directories = [root]
+    created = 0
+    index = 0
+    while created < files:
+        parent = directories[index // fanout] if index else root
+        directory = os.path.join(parent, f"dir{index}")
+        os.makedirs(directory, exist_ok=True)
+        directories.append(directory)
+        for number in range(min(per_dir, files - created)):
+            if (created + number) % exe_every == 0:
+                name = f"{words[index % len(words)].title()}{words[(index // len(words)) % len(words)].title()}{index}.exe"
+            else:
+                name = f"file{number}.dat"
+            open(os.path.join(directory, name), "w").close()
+        created += per_dir
+        index += 1
+    return created
+
+
+def Benchmark(root=None, files=1_000_000, lookups=200):
+    import random
+
+    root = root or os.path.join(tempfile.gettempdir(), "exe-index-benchmark")
+    if not os.path.isdir(root):
+        start = time.perf_counter()
+        BuildSyntheticTree(root, files)
+        print(f"Built a synthetic tree of {files} files in {time.perf_counter() - start:.1f}s")
+
+    # Each top-level directory is a root, so the scanner runs a worker per root as with several drives.
+    roots = sorted(os.path.join(root, name) for name in os.listdir(root))
+    path = os.path.join(root + "-index", "index.json.gz")
+    if os.path.exists(path):
+        os.remove(path)
+    index = ExecutableIndex(path=path, roots=roots)
+
+    print(f"full scan:           {index.refresh()}")
+    print(f"unchanged refresh:   {index.refresh()}")
+    touched = os.path.join(roots[0], "NewGame.exe")
+    open(touched, "w").close()
+    print(f"after one new file:  {index.refresh()}")
+    os.remove(touched)
+
+    reloaded = ExecutableIndex(path=path, roots=roots)
+    start = time.perf_counter()
+    reloaded.load()
+    print(f"load from disk:      {time.perf_counter() - start:.2f}s ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+    queries = ["hollow knight", "minecraft", "obs studio", "stardw valey", "Terraria", "nothing like this"]
+    start = time.perf_counter()
+    for _ in range(lookups):
+        reloaded.lookup(random.choice(queries))
+    print(f"lookup:              {(time.perf_counter() - start) / lookups * 1000:.2f} ms average")
+    for query in queries:
+        print(f"  {query!r}: {reloaded.lookup(query)[:1]}")
+
+
+# Run `python -m Backend.ExecutableIndex [files]` to benchmark on a synthetic tree.
+if __name__ == "__main__":
+    import sys
+    Benchmark(files=int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -4,13 +4,13 @@ import os
 from random import randint
 from PIL import Image
 import requests
-from dotenv import load_dotenv
+from Backend.Settings import settings
+from Backend.EventLoop import assistant_loop
 from io import BytesIO
 from time import sleep
 
 # Load your Hugging Face API key
-load_dotenv()
-API_KEY = os.getenv("HuggingFaceAPIKey")
+API_KEY = settings.get().huggingface_api_key
 API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
 HEADERS = {"Authorization": f"Bearer {API_KEY}"}
 
@@ -39,15 +39,19 @@ async def generate_images(prompt: str):
 
     image_bytes_list = await asyncio.gather(*tasks)
 
-    # Save valid image bytes
-    for i, image_bytes in enumerate(image_bytes_list):
-        if image_bytes:
-            try:
-                img = Image.open(BytesIO(image_bytes))
-                img.save(f"Data/{prompt.replace(' ', '_')}{i + 1}.jpg")
-                print(f"Saved: Data/{prompt.replace(' ', '_')}{i + 1}.jpg")
-            except Exception as e:
-                print(f"Image decoding failed: {e}")
+    # Save valid image bytes on the disk pool, all at once
+    saves = [assistant_loop.run_io(save_image, image_bytes, f"Data/{prompt.replace(' ', '_')}{i + 1}.jpg")
+             for i, image_bytes in enumerate(image_bytes_list) if image_bytes]
+    await asyncio.gather(*saves)
+
+# Decode and write one image
+def save_image(image_bytes: bytes, path: str):
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        img.save(path)
+        print(f"Saved: {path}")
+    except Exception as e:
+        print(f"Image decoding failed: {e}")
 
 # Open saved images
 def open_images(prompt: str):
@@ -64,7 +68,7 @@ def open_images(prompt: str):
 
 # Combined wrapper
 def GenerateImages(prompt: str):
-    asyncio.run(generate_images(prompt))
+    assistant_loop.run(generate_images(prompt))
     open_images(prompt)
 
 # Watcher loop
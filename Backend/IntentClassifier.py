@@ -0,0 +1,286 @@
+# Tiered query classifier in front of the Cohere decision model.
+# Tier 1: deterministic rules for commands ("open chrome", "volume up", "bye").
+# Tier 2: a small naive Bayes model that separates general from realtime questions.
+# Anything neither tier is confident about falls through to Cohere (FirstLayerDMM).
+from collections import Counter
+import threading
+import math
+import time
+import re
+
+LocalModelThreshold = 0.6   # Minimum posterior for the local model to answer without Cohere.
+
+# Command rules, tried in order against one normalized query part.
+# Each maps a regex to a decision template; {0} is the whole part, {1}.. the groups.
+Rules = [
+    # The only word allowed after the goodbye is the assistant's name: "quit spotify" is not an exit.
+    (re.compile(r"^(?:ok(?:ay)? )?(?:bye|goodbye|good bye|exit|quit|see you(?: later)?)(?: (?P<addressee>\w+))?$"), "exit"),
+    (re.compile(r"^(?:please )?(mute|unmute|volume up|volume down)(?: the (?:volume|sound|system))?$"), "system {1}"),
+    (re.compile(r"^(?:please )?turn (?:the )?volume (up|down)$"), "system volume {1}"),
+    # A bare "google ..." followed by a question ("google is it going to rain") is asked, not searched.
+    (re.compile(r"^(?:please )?(?:search google for|google search|search on google for|google (?!(?:is|are|was|will|what|who|how|when|where|why|do|does|can|should)\b)) ?(.+)$"), "google search {1}"),
+    (re.compile(r"^(?:please )?(?:search youtube for|youtube search|search on youtube for|search on youtube) (.+)$"), "youtube search {1}"),
+    (re.compile(r"^(?:please )?(?:generate|create|make) (?:an? )?(?:image|picture) (?:of )?(.+)$"), "generate image {1}"),
+    (re.compile(r"^(?:please )?(?:write|draft) (?:me )?(?:an? )?(application|letter|email|essay|poem|song|code|note|notes) (.+)$"), "content {1} {2}"),
+    # "close the door" is not an app; app names don't start with an article or possessive.
+    (re.compile(r"^(?:please )?(open|close) (?!(?:the|a|an|my|your|this|that|it)\b)(.+)$"), "{1} {2}"),
+    (re.compile(r"^(?:please )?(play) (.+)$"), "{1} {2}"),
+    (re.compile(r"^(?:what(?:'s| is) the time|what time is it|what(?:'s| is) (?:the date|today's date)|what day is (?:it|today))(?: now| today| right now)?$"), "general {0}"),
+    (re.compile(r"^(?:hi|hello|hey|thanks|thank you|good morning|good night)(?: \w+)?$"), "general {0}"),
+]
+
+# Requests whose decision needs rewriting (reminder times, content topics): always left to Cohere.
+DeferredPattern = re.compile(r"\b(?:remind|reminder|write|compose|draft)\b")
+
+# Parts starting like a command that no rule matched ("close the door", "search for cats")
+# are ambiguous and left to Cohere rather than to the question model.
+CommandPrefix = re.compile(r"^(?:please |ok(?:ay)? )?(?:open|close|exit|quit|bye|goodbye|play|google|search|youtube|mute|unmute|volume|turn|generate|create|make)\b")
+
+# Apps that may follow "open"/"close" without repeating the verb ("open chrome and firefox").
+# Other bare objects are not continued: "play tom and jerry" is one title, not two.
+ContinuedVerbs = ("open", "close")
+KnownApps = {
+    "chrome", "google chrome", "firefox", "edge", "brave", "notepad", "calculator", "paint", "explorer",
+    "file explorer", "settings", "spotify", "discord", "telegram", "whatsapp", "youtube", "instagram",
+    "facebook", "canva", "steam", "obs", "vlc", "zoom", "teams", "slack", "word", "excel", "powerpoint",
+    "vs code", "vscode", "visual studio code",
+}
+
+# Labelled examples for the local general/realtime model.
+TrainingQueries = [
+    ("general", "who was akbar"), ("general", "how can i study more effectively"),
+    ("general", "can you help me with this math problem"), ("general", "thanks i really liked it"),
+    ("general", "what is python programming language"), ("general", "who is he"),
+    ("general", "tell me more about him"), ("general", "how are you"), ("general", "do you like pizza"),
+    ("general", "chat with me"), ("general", "explain recursion in simple words"),
+    ("general", "what is the meaning of life"), ("general", "how do i make pasta"),
+    ("general", "tell me a joke"), ("general", "what is the capital of france"),
+    ("general", "how does photosynthesis work"), ("general", "give me some tips to sleep better"),
+    ("general", "what is machine learning"), ("general", "how do airplanes fly"),
+    ("general", "can you explain quantum physics"), ("general", "what should i name my dog"),
+    ("general", "how many legs does a spider have"), ("general", "who wrote romeo and juliet"),
+    ("general", "translate hello into spanish"), ("general", "what is two plus two"),
+    ("general", "define democracy"), ("general", "why is the sky blue"),
+    ("general", "how do i learn to code"), ("general", "suggest a good book"),
+    ("general", "what can you do"),
+    ("realtime", "who is indian prime minister"), ("realtime", "tell me about facebook's recent update"),
+    ("realtime", "tell me news about coronavirus"), ("realtime", "who is akshay kumar"),
+    ("realtime", "what is today's news"), ("realtime", "what is today's headline"),
+    ("realtime", "what is the weather in delhi today"), ("realtime", "latest news on the stock market"),
+    ("realtime", "what is the price of bitcoin right now"), ("realtime", "who won the match yesterday"),
+    ("realtime", "current score of the cricket match"), ("realtime", "who is the ceo of twitter now"),
+    ("realtime", "what are the latest iphone features"), ("realtime", "tell me about elon musk"),
+    ("realtime", "what is the current gold rate"), ("realtime", "latest updates on the election"),
+    ("realtime", "who is the president of the united states"), ("realtime", "what is trending on twitter today"),
+    ("realtime", "tell me about the new tesla model"), ("realtime", "what happened in the news this week"),
+    ("realtime", "current temperature in london"), ("realtime", "what is the dollar exchange rate today"),
+    ("realtime", "recent developments in artificial intelligence"), ("realtime", "who is virat kohli"),
+    ("realtime", "when is the next apple event"), ("realtime", "today's weather forecast"),
+    ("realtime", "latest movie releases this week"), ("realtime", "what is the net worth of mukesh ambani"),
+]
+
+# Held-out labelled queries (input as produced by QueryModifier -> expected decision) for the benchmark.
+BenchmarkQueries = [
+    ("Open chrome.", ["open chrome"]),
+    ("Open chrome and firefox.", ["open chrome", "open firefox"]),
+    ("Open chrome, firefox and notepad.", ["open chrome", "open firefox", "open notepad"]),
+    ("Close notepad.", ["close notepad"]),
+    ("Play let her go.", ["play let her go"]),
+    ("Volume up.", ["system volume up"]),
+    ("Mute.", ["system mute"]),
+    ("Bye eva.", ["exit"]),
+    ("Goodbye.", ["exit"]),
+    ("Quit spotify.", ["close spotify"]),
+    ("Google search python tutorials.", ["google search python tutorials"]),
+    ("Search youtube for lofi music.", ["youtube search lofi music"]),
+    ("Generate image of a lion.", ["generate image a lion"]),
+    ("Write an application for sick leave.", ["content application for sick leave"]),
+    ("What's the time?", ["general what's the time"]),
+    ("Thank you.", ["general thank you"]),
+    ("Open spotify and play lofi.", ["open spotify", "play lofi"]),
+    ("How do magnets work?", ["general how do magnets work"]),
+    ("What is the theory of relativity?", ["general what is the theory of relativity"]),
+    ("Tell me a story.", ["general tell me a story"]),
+    ("What is the latest news about india?", ["realtime what is the latest news about india"]),
+    ("What is the weather today?", ["realtime what is the weather today"]),
+    ("Who is the prime minister of the uk?", ["realtime who is the prime minister of the uk"]),
+    ("Open chrome and tell me about mahatma gandhi.", ["open chrome", "general tell me about mahatma gandhi"]),
+    ("Set a reminder at 9pm for my meeting.", ["reminder 9:00pm meeting"]),
+    ("Can you write a poem about the sea?", ["content poem about the sea"]),
+    ("Play rock and roll.", ["play rock and roll"]),
+    ("Play tom and jerry.", ["play tom and jerry"]),
+    ("Open chrome and search for cats.", ["open chrome", "google search cats"]),
+    ("Google is it going to rain tomorrow?", ["realtime is it going to rain tomorrow"]),
+    ("Close the door.", ["general close the door"]),
+]
+
+
+# Lowercase, drop punctuation that carries no meaning for the decision, collapse spaces.
+def NormalizeQuery(query):
+    query = query.lower().strip()
+    query = re.sub(r"[^\w\s'+-]", " ", query)
+    return " ".join(query.split())
+
+
+# "Open chrome, firefox and then notepad." -> its normalized parts.
+# Commas are split on before NormalizeQuery drops them.
+def SplitParts(query):
+    return [part for piece in query.split(",") for part in re.split(r"\s+and\s+|\s+then\s+", NormalizeQuery(piece)) if part]
+
+
+def Tokenize(text):
+    words = text.split()
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over word unigrams and bigrams."""
+
+    def __init__(self, examples):
+        self.counts = {}
+        self.totals = Counter()
+        self.priors = Counter()
+        vocabulary = set()
+        for label, text in examples:
+            tokens = Tokenize(NormalizeQuery(text))
+            self.counts.setdefault(label, Counter()).update(tokens)
+            self.totals[label] += len(tokens)
+            self.priors[label] += 1
+            vocabulary.update(tokens)
+        self.vocabulary_size = len(vocabulary)
+        self.examples = len(examples)
+
+    def predict(self, text):
+        """Return (label, probability) for the most likely label."""
+        tokens = Tokenize(text) or [""]
+        scores = {}
+        for label, counts in self.counts.items():
+            denominator = self.totals[label] + self.vocabulary_size
+            likelihood = sum(math.log((counts[token] + 1) / denominator) for token in tokens)
+            # Averaging per token keeps long queries from looking overconfident.
+            scores[label] = math.log(self.priors[label] / self.examples) / len(tokens) + likelihood / len(tokens)
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / total
+
+
+class IntentClassifier:
+    """Rules, then the local model, then the fallback; counts hits and time per tier."""
+
+    Tiers = ("rules", "local_model", "cohere")
+
+    def __init__(self, examples=TrainingQueries, threshold=LocalModelThreshold, assistant_name=None):
+        self.model = NaiveBayesModel(examples)
+        self.threshold = threshold
+        self.assistant_name = assistant_name.lower() if assistant_name else None
+        self._lock = threading.Lock()
+        self._stats = {tier: {"hits": 0, "seconds": 0.0} for tier in self.Tiers}
+
+    def match_rule(self, part):
+        for pattern, template in Rules:
+            match = pattern.match(part)
+            if match:
+                addressee = match.groupdict().get("addressee")
+                if addressee is not None and addressee != self.assistant_name:
+                    return None
+                return template.format(match.group(0), *match.groups())
+        return None
+
+    def split_commands(self, parts):
+        """Rule decisions for each part (from SplitParts) of a compound command, or None unless every part has one.
+
+        "open chrome and play lofi" splits; "play rock and roll" and "open chrome and
+        search for cats" don't, because a part matches no rule on its own.
+        """
+        if len(parts) < 2:
+            return None
+        decisions = [self.match_rule(part) for part in parts]
+
+        # "open chrome and firefox": a known app continues the previous open/close.
+        for index in range(1, len(parts)):
+            previous = decisions[index - 1]
+            if decisions[index] is None and previous and previous.split()[0] in ContinuedVerbs and parts[index] in KnownApps:
+                decisions[index] = f"{previous.split()[0]} {parts[index]}"
+        return decisions if all(decisions) else None
+
+    def classify_local(self, query):
+        """Return (decisions, tier) if a local tier is confident, else (None, None)."""
+        parts = SplitParts(query)
+        query = NormalizeQuery(query)
+        if not query:
+            return None, None
+        decisions = self.split_commands(parts)
+        if decisions:
+            return decisions, "rules"
+
+        if len(parts) > 1 and any(self.match_rule(part) or CommandPrefix.match(part) for part in parts):
+            # A command joined to something the rules can't place: let Cohere split it.
+            return None, None
+        decision = self.match_rule(query)
+        if decision:
+            return [decision], "rules"
+        if CommandPrefix.match(query) or DeferredPattern.search(query):
+            return None, None
+
+        # No command at all: keep the question whole ("python and java" is one topic).
+        label, probability = self.model.predict(query)
+        if probability < self.threshold:
+            return None, None
+        return [f"{label} {query}"], "local_model"
+
+    def classify(self, query, fallback):
+        """Classify query locally if possible, otherwise with fallback(query)."""
+        start = time.perf_counter()
+        decisions, tier = self.classify_local(query)
+        if decisions is None:
+            decisions, tier = fallback(query), "cohere"
+        self._record(tier, time.perf_counter() - start)
+        return decisions
+
+    def _record(self, tier, seconds):
+        with self._lock:
+            self._stats[tier]["hits"] += 1
+            self._stats[tier]["seconds"] += seconds
+
+    def stats(self):
+        """Hit rate and average latency per tier."""
+        with self._lock:
+            total = sum(tier["hits"] for tier in self._stats.values())
+            return {
+                name: {
+                    "hits": tier["hits"],
+                    "hit_rate": tier["hits"] / total if total else 0.0,
+                    "avg_ms": tier["seconds"] / tier["hits"] * 1000 if tier["hits"] else 0.0,
+                }
+                for name, tier in self._stats.items()
+            }
+
+
+# Process-wide classifier used by FirstLayerDMM.
+intent_classifier = IntentClassifier()
+
+
+# Offline benchmark: how many labelled queries the local tiers answer, and how accurately.
+def BenchmarkAccuracy(queries=BenchmarkQueries):
+    classifier = IntentClassifier(assistant_name="eva")
+    answered = correct = 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        decisions, tier = classifier.classify_local(query)
+        tier = tier or "cohere"
+        classifier._record(tier, time.perf_counter() - start)
+        if decisions is not None:
+            answered += 1
+            correct += decisions == expected
+        mark = " " if decisions is None else ("+" if decisions == expected else "x")
+        print(f"{mark} {tier:11} {query!r:50} -> {decisions}")
+
+    print(f"\nAnswered locally: {answered}/{len(queries)} ({answered / len(queries):.0%})")
+    print(f"Accuracy of local answers: {correct}/{answered} ({correct / answered if answered else 0:.0%})")
+    for name, tier in classifier.stats().items():
+        print(f"{name:12} hit rate {tier['hit_rate']:.0%}, avg {tier['avg_ms']:.3f} ms")
+
+
+# Run `python -m Backend.IntentClassifier` for the offline accuracy benchmark.
+if __name__ == "__main__":
+    BenchmarkAccuracy()
@@ -0,0 +1,131 @@
+# Cache of executables OpenApp has launched successfully, keyed on the spoken app name.
+# Loaded once, checked with a stat() before use, ranked by how often each entry is used,
+# and saved atomically under a lock so parallel "open X, open Y" commands can't corrupt it.
+import threading
+import tempfile
+import stat
+import json
+import time
+import os
+
+LaunchCachePath = r"Data\LaunchCache.json"
+LegacyCachePath = "game_paths.json"     # Imported once if present (the old name -> path map).
+LaunchCacheEntries = 200                # Least used entries are dropped above this.
+
+
+def LaunchKey(app_name):
+    return app_name.lower().replace(" ", "")
+
+
+class LaunchCache:
+    """app name -> {"path", "uses", "last_used"}; entries whose file is gone or fails to start are evicted."""
+
+    def __init__(self, path=LaunchCachePath, max_entries=LaunchCacheEntries, legacy_path=LegacyCachePath):
+        self.path = path
+        self.max_entries = max_entries
+        self.legacy_path = legacy_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        for path, legacy in ((self.path, False), (self.legacy_path, True)):
+            if not path:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if legacy:
+                # game_paths.json stored bare paths; start them with no usage history.
+                stored = {key: {"path": value, "uses": 0, "last_used": 0} for key, value in stored.items() if isinstance(value, str)}
+            self._entries = stored
+            return
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Could not save the launch cache: {e}")
+
+    @staticmethod
+    def is_launchable(path):
+        """Cheap validity check: the path still exists and is a regular file."""
+        try:
+            return stat.S_ISREG(os.stat(path).st_mode)
+        except (OSError, TypeError, ValueError):
+            return False
+
+    def get(self, app_name):
+        """The cached path for app_name if it still exists; stale entries are evicted."""
+        key = LaunchKey(app_name)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            path = entry["path"]
+        if self.is_launchable(path):
+            with self._lock:
+                self.hits += 1
+            return path
+        self.evict(app_name)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def record(self, app_name, path):
+        """Count a successful launch of path for app_name."""
+        key = LaunchKey(app_name)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or entry["path"] != path:
+                entry = self._entries[key] = {"path": path, "uses": 0, "last_used": 0}
+            entry["uses"] += 1
+            entry["last_used"] = time.time()
+            if len(self._entries) > self.max_entries:
+                # Drop the least used (then least recently used) entry, never the one just recorded.
+                victim = min((name for name in self._entries if name != key),
+                             key=lambda name: (self._entries[name]["uses"], self._entries[name]["last_used"]))
+                del self._entries[victim]
+                self.evictions += 1
+            self._save()
+
+    def evict(self, app_name):
+        """Forget app_name after its path disappeared or failed to start."""
+        with self._lock:
+            self._load()
+            if self._entries.pop(LaunchKey(app_name), None) is not None:
+                self.evictions += 1
+                self._save()
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+
+
+# Process-wide cache used by OpenApp.
+launch_cache = LaunchCache()
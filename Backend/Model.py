@@ -1,15 +1,14 @@
-import cohere # Import the Cohere library for AI services.
 from rich import print # Import the Rich library to enhance terminal outputs.
-from dotenv import dotenv_values # Import dotenv to load environment variables from a .env file.
+from Backend.Services import services # Import the lazy service registry that owns the Cohere client.
+from Backend.Settings import settings # Import the shared settings parsed once from .env.
+from Backend.IntentClassifier import intent_classifier # Import the local rule/model tiers that answer before Cohere.
+from Backend.DecisionCache import decision_cache # Import the persistent cache of previous Cohere decisions.
+from Backend.Resilience import providers, RetryableError # Import bounded retries, the circuit breaker and deadlines for Cohere.
+from Backend.Cancellation import CancelToken, Cancelled # Import the per-turn cancellation token used for barge-in.
+import math # Import math to round the remaining deadline up to whole seconds.
 
-# Load environment variables from the .env file.
-env_vars= dotenv_values(".env")
-
-# Retrieve API key.
-CohereAPIKey = env_vars.get("CohereAPIKey")
-
-# Create a Cohere client using the provided API key.
-co = cohere.Client(api_key=CohereAPIKey)
+# The exit rule accepts the assistant's name, and only that, after a goodbye ("bye eva").
+settings.on_change(lambda config: setattr(intent_classifier, "assistant_name", config.assistant_name.lower()))
 
 # Define a list of recognized function keywords for task categorization. 
 funcs = [
@@ -17,9 +16,6 @@ funcs = [
 "generate image", "system", "content", "google search", "youtube search", "reminder"
 ]
 
-# Initialize an empty list to store user messages. 
-messages = []
-
 # Define the preamble that guides the AI model on how to categorize queries. 
 preamble = """
 You are a very accurate Decision-Making Model, which decides what kind of a query is given to you.
@@ -58,27 +54,46 @@ ChatHistory = [
 ]
 
 # Define the main function for decision-making on queries.
-def FirstLayerDMM(prompt: str = "test"):
-
-    # Add the user's query to the messages list.
-    messages.append({"role": "user", "content": f"{prompt}"})
+# Trivial commands and confident questions are classified locally; only the rest reach Cohere.
+# cancel, if given, is the turn's CancelToken; a cancelled turn raises Cancelled instead of returning a decision.
+def FirstLayerDMM(prompt: str = "test", cancel=None):
+    cancel = cancel or CancelToken()
+    try:
+        decision = intent_classifier.classify(prompt, fallback=lambda query: CachedCohereDMM(query, cancel=cancel))
+        cancel.raise_if_cancelled()
+        return decision
+    except Exception as e:
+        if cancel.cancelled:
+            raise Cancelled(cancel.reason) from e
+        # Cohere is unavailable after bounded retries: treat the query as a general question.
+        print(f"Decision model unavailable ({e}); answering as a general query")
+        return [f"general {prompt}"]
+
+# Classify a query with the Cohere model, retrying failures with backoff.
+def CohereDMM(prompt: str = "test", deadline=None, cancel=None):
+    cancel = cancel or CancelToken()
+    return providers["cohere"].call(lambda deadline: AskCohere(prompt, deadline, cancel), deadline, cancel)
+
+# Make one Cohere request for the query.
+def AskCohere(prompt, deadline, cancel):
 
     # Create a streaming chat session with the Cohere model.
-    stream = co.chat_stream(
-        model='command-r-plus', # Specify the Cohere model to use.
+    stream = services.get("cohere").chat_stream(
+        model=settings.get().decision_model, # Specify the Cohere model to use.
         message= prompt, #Pass the user's query.
         temperature=0.7, # Set the creativity level of the model.
         chat_history=ChatHistory, # Provide the predefined chat history for context.
         prompt_truncation = 'OFF', # Ensure the prompt is not truncated.
         connectors=[], # No additional connectors are used.
-        preamble=preamble # Pass the detailed instruction preamble.
+        preamble=preamble, # Pass the detailed instruction preamble.
+        request_options={"timeout_in_seconds": math.ceil(deadline.remaining())} # Never wait past the deadline.
     )
 
     # Initialize an empty string to store the generated response.
     response = " "
 
-    # Iterate over events in the stream and capture text generation events.
-    for event in stream:
+    # Iterate over events in the stream and capture text generation events, stopping once cancelled.
+    for event in cancel.iterate(stream):
         if event.event_type == "text-generation":
             response += event.text  # Append generated text to the response.
 
@@ -101,17 +116,21 @@ def FirstLayerDMM(prompt: str = "test"):
     #Update the response with the filtered list of tasks.
     response = temp
 
-    # If '(query)' is in the response, recursively call the function for further clarification.
+    # If '(query)' is in the response, ask again (a bounded number of times) for a usable decision.
     if "(query)" in response:
-        newresponse = FirstLayerDMM(prompt=prompt)
-        return newresponse #Return the clarified response.
+        raise RetryableError("decision model echoed the '(query)' placeholder")
 
     else:
         return response #Return the filtered response.
 
+# Repeated queries reuse an earlier Cohere decision (realtime and reminder decisions are never cached).
+CachedCohereDMM = decision_cache.cached(CohereDMM)
+
 # Entry point for the script.
 if __name__ == "__main__":
     
     # Continuously prompt the user for input and process it.
     while True:
-        print(FirstLayerDMM(input(">>> "))) # Print the categorized response.
\ No newline at end of file
+        print(FirstLayerDMM(input(">>> "))) # Print the categorized response.
+        print(intent_classifier.stats()) # Print per-tier hit rates and latency.
+        print(decision_cache.stats()) # Print cache hit ratio and saved latency.
\ No newline at end of file
@@ -1,36 +1,18 @@
-from googlesearch import search
-from groq import Groq                      # Importing the Groq library to use its API.
-from json import load, dump                # Importing functions to read and write JSON files.
+from Backend.WebSearch import web_search  # Importing the cached, pooled Google result search.
+from Backend.ChatStore import chat_log     # Importing the shared append-only chat history store.
+from Backend.ContextWindow import BuildContext  # Importing the token-budgeted context builder.
+from Backend.Services import services      # Importing the lazy service registry that owns the Groq client.
 import datetime                            #Importing the datetime module for real-time date and time information.
-from dotenv import dotenv_values           # Importing dotenv_values to read environment variables from a new .env file.
+from Backend.Settings import settings      # Importing the shared settings parsed once from .env.
+from Backend.Resilience import providers, DegradedAnswer  # Importing bounded retries, the circuit breaker and deadlines for Groq.
+from Backend.Cancellation import CancelToken  # Importing the per-turn cancellation token used for barge-in.
 
-# load environment variables from the .env file.
-env_vars = dotenv_values (".env")
-
-# Reteive environment variables for the chatbot configuration.
-Username = env_vars.get("Username")
-Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey")
-
-# Initialize the Groq client with the provided API Key.
-client = Groq(api_key=GroqAPIKey)
-
-# Define the system instructions for the chatbot.
-System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which has real-time up-to-date information from the internet.
-*** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar.***
-*** Just answer the question from the provided data in a professional way. ***"""
-
-#Try to load the chat log from a JSON file, or create an empty one if it doean't exist.
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
+# Number of previous messages sent along with each query.
+HistoryLimit = 200
 
 # Dunction to perform a Google search and format the results.
 def GoogleSearch(query):
-    results = list(search(query, advanced = True, num_results=5))
+    results = web_search.results(query, num=5)
     Answer = f"The search results for '{query}' are:\n[start]\n"
 
     for i in results:
@@ -47,11 +29,28 @@ def AnswerModifier(Answer):
     return modified_answer
 
 # Predefined chatbot conversation system message and an initial user message.
-SystemChatBot = [
-    {"role": "system","content": System},
+# A tuple that ApplySettings replaces as a whole, so a request always sees one consistent version;
+# requests copy it into their own message list and never modify it.
+SystemChatBot = (
+    {"role": "system","content": ""},
     {"role": "user","content": "Hi"},
     {"role": "system","content": "Hello, how can I help you?"},
-]
+)
+
+# Fill in the system instructions from the current settings (called again after every reload).
+def ApplySettings(config):
+    global Username, Assistantname, System, SystemChatBot
+
+    Username = config.username
+    Assistantname = config.assistant_name
+
+    # Define the system instructions for the chatbot.
+    System = f"""Hello, I am {Username}, You are a very accurate and advanced AI chatbot named {Assistantname} which has real-time up-to-date information from the internet.
+*** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar.***
+*** Just answer the question from the provided data in a professional way. ***"""
+    SystemChatBot = ({"role": "system", "content": System},) + SystemChatBot[1:]
+
+settings.on_change(ApplySettings)
 
 # Function to get real-time information like the current date and time.
 def Information():
@@ -72,51 +71,89 @@ def Information():
     data += f"Time: {hour} hours, {minute} minutes, {second} second.\n"
     return data
 
-# Function to handle real-time search and response generation.
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-
-    # Load the chat log from the JSON file.
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
+# Stands in for the search results when the search itself fails.
+NoSearchResults = "The web search is unavailable right now. Answer from what you know and say that it may be out of date."
+
+# System messages for one request: the instructions, this prompt's search results and the current time.
+# Built fresh per call, so concurrent searches never see each other's results.
+def SystemMessages(prompt, search=GoogleSearch):
+    try:
+        results = search(prompt)
+    except Exception as e:
+        # Rate limited or offline: answer without search context rather than failing the turn.
+        print(f"Search failed: {e}")
+        results = NoSearchResults
+    return list(SystemChatBot) + [
+        {"role": "system", "content": results},
+        {"role": "system", "content": Information()},
+    ]
+
+# Streaming real-time search: yields the response piece by piece as it is generated.
+# deadline, if given, is a Resilience.Deadline shared with the caller; cancel, a CancelToken that stops the stream.
+# Reentrant: every call keeps its messages to itself, so several realtime queries can run in parallel.
+# client, search and log default to the Groq service, GoogleSearch and the shared chat log.
+def RealtimeSearchEngineStream(prompt, deadline=None, cancel=None, client=None, search=GoogleSearch, log=chat_log):
+    cancel = cancel or CancelToken()
+
+    # Read the most recent turns from the chat store.
+    messages = log.recent(HistoryLimit)
     messages.append({"role": "user", "content": f"{prompt}"})
 
-    # Add Google search results to the system chatbot messages.
-    SystemChatBot.append({"role":"system", "content": GoogleSearch(prompt)})  
-
-    # Generate a response using the Groq client.
-    completion = client.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=SystemChatBot + [{"role":"system", "content": Information()}] + messages,
-        temperature=0.7,
-        max_tokens=2048,
-        top_p=1,
-        stream=True,
-        stop=None
-    )
+    # Add Google search results to this request's own system messages.
+    Instructions = SystemMessages(prompt, search)
+
+    def Request(deadline):
+        # Generate a response using the Groq client.
+        completion = (client or services.get("groq")).chat.completions.create(
+            model=settings.get().chat_model,
+            messages=BuildContext(Instructions, messages, max_tokens=2048, summarize=True),
+            temperature=0.7,
+            max_tokens=2048,
+            top_p=1,
+            stream=True,
+            stop=None,
+            timeout=deadline.remaining()
+        )
+        cancel.on_cancel(completion.close)  # Closing the HTTP stream unblocks a pending read at once.
+
+        for chunk in cancel.iterate(completion):
+            Delta = chunk.choices[0].delta.content
+            if Delta:
+                yield Delta.replace("</s>", "")
 
     Answer = ""
 
-    # Concatenate response chunks fromt the streaming output.
-    for chunk in completion:
-        if chunk.choices[0].delta.content:
-            Answer += chunk.choices[0].delta.content
+    # Yield response chunks from the streaming output as they arrive.
+    try:
+        for Delta in providers["groq"].stream(Request, deadline, cancel):
+            if not Answer:
+                Delta = Delta.lstrip()  # Drop leading whitespace before the first word.
+            if Delta:
+                Answer += Delta
+                yield Delta
+    except Exception as e:
+        if cancel.cancelled:
+            # Barge-in: stop quietly and keep the unfinished exchange out of the chat log.
+            print(f"Answer cancelled ({cancel.reason})")
+            return
+        # Retries are exhausted or the circuit is open: degrade instead of failing the turn.
+        print(f"Error: {e}")
+        if not Answer:
+            yield DegradedAnswer
+        return
 
     # Clean up the response.
     Answer = Answer.strip().replace("</s>", "")
-    messages.append({"role": "assistant", "content": Answer})
 
-    # Save the updated chat log back to the JSON file.
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump (messages, f, indent=4)
+    # Append the query and the answer to the chat log as one exchange.
+    log.append_exchange(f"{prompt}", Answer)
 
-    # Remove the most recent system message from the chatbot conversation.
-    SystemChatBot.pop()
-    return AnswerModifier(Answer=Answer)
+# Function to handle real-time search and response generation.
+def RealtimeSearchEngine(prompt, cancel=None):
+    return AnswerModifier(Answer="".join(RealtimeSearchEngineStream(prompt, cancel=cancel)))
 
 # Main entry point of the program for interactive querying.
 if __name__ == "__main__":
     while True:
         prompt = input("Enter Your query: ")
         print(RealtimeSearchEngine(prompt))
-
@@ -0,0 +1,232 @@
+# Shared resilience layer for the Groq and Cohere call sites.
+# Every request goes through a Provider: bounded retries with exponential backoff and
+# jitter, a per-provider circuit breaker, and a deadline that caps retries and timeouts.
+# Call sites catch the final error and fall back to a degraded response.
+# A cancelled CancelToken stops retries and backoff at once.
+from Backend.Cancellation import CancelToken
+import threading
+import random
+import time
+
+ProviderRetries = 2          # Attempts after the first failure.
+ProviderBackoff = 0.5        # Base delay in seconds, doubled per attempt.
+ProviderMaxBackoff = 8.0     # Upper bound for a single delay.
+BreakerThreshold = 5         # Consecutive provider failures that open the circuit.
+BreakerResetSeconds = 30.0   # How long the circuit stays open before a trial request.
+RetryableStatus = {408, 409, 429, 500, 502, 503, 504}
+
+# Reply used when the language model cannot be reached.
+DegradedAnswer = "Sorry, I can't reach my language service right now. Please try again in a moment."
+
+
+class RetryableError(Exception):
+    """Raised by a request for an unusable but retryable response (not a provider fault)."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit is open; the request was not sent."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out."""
+
+
+def is_retryable(error):
+    """Timeouts, connection problems, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, (RetryableError, TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "status_code", None) in RetryableStatus:
+        return True
+    # SDK transport errors (APIConnectionError, APITimeoutError, ...) carry no status code.
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+class Deadline:
+    """A point in time shared by nested calls so retries never outlive the request."""
+
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial request through after a cool-down."""
+
+    def __init__(self, threshold=BreakerThreshold, reset_seconds=BreakerResetSeconds):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self._trial:
+                return False
+            self._trial = True  # Half-open: exactly one request probes the provider.
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self._trial = 0, None, False
+
+    def release_trial(self):
+        """The trial request was abandoned without an outcome; let the next one probe instead."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at, self._trial = time.monotonic(), False
+
+
+class Provider:
+    """Runs requests against one upstream service with retries, backoff and a circuit breaker.
+
+    A request is a callable taking the Deadline, so it can pass the remaining
+    time on as the SDK timeout.
+    """
+
+    def __init__(self, name, timeout=60.0, retries=ProviderRetries, backoff=ProviderBackoff,
+                 max_backoff=ProviderMaxBackoff, breaker=None):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failures": 0, "retries": 0, "rejected": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _before_attempt(self, deadline, cancel):
+        cancel.raise_if_cancelled()
+        if deadline.expired():
+            raise DeadlineExceeded(f"{self.name}: deadline exceeded")
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name}: circuit open after repeated failures")
+        self._count("calls")
+
+    def _after_failure(self, error, attempt, deadline, cancel, can_retry=True):
+        """Record the failure; wait and return True if the request should be tried again."""
+        if cancel.cancelled:
+            # Errors after cancellation come from closing the request, not from the provider.
+            self.breaker.release_trial()
+            return False
+        self._count("failures")
+        if is_retryable(error) and not isinstance(error, RetryableError):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()  # The provider answered; the request itself was the problem.
+        if not can_retry or attempt >= self.retries or not is_retryable(error) or deadline.expired():
+            return False
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt)) * (0.5 + random.random() / 2)
+        delay = min(delay, deadline.remaining())
+        print(f"{self.name} request failed ({error}); retrying in {delay:.2f}s")
+        self._count("retries")
+        return not cancel.wait(delay)
+
+    def call(self, request, deadline=None, cancel=None):
+        """Return request(deadline), retrying retryable failures; the last error is raised."""
+        deadline = deadline or Deadline(self.timeout)
+        cancel = cancel or CancelToken()
+        attempt = 0
+        while True:
+            self._before_attempt(deadline, cancel)
+            try:
+                result = request(deadline)
+            except Exception as e:
+                if not self._after_failure(e, attempt, deadline, cancel):
+                    raise
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stream(self, request, deadline=None, cancel=None):
+        """Yield from request(deadline); retries only until the first item has been yielded."""
+        deadline = deadline or Deadline(self.timeout)
+        cancel = cancel or CancelToken()
+        attempt = 0
+        while True:
+            self._before_attempt(deadline, cancel)
+            started = False
+            try:
+                for item in request(deadline):
+                    started = True
+                    yield item
+            except Exception as e:
+                # Once output has reached the caller a retry would repeat it.
+                if not self._after_failure(e, attempt, deadline, cancel, can_retry=not started):
+                    raise
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, breaker=self.breaker.state)
+
+
+# One provider per upstream service, shared by every call site.
+providers = {
+    "groq": Provider("groq"),
+    "cohere": Provider("cohere", timeout=20.0),
+}
+
+
+# Local fake provider for exercising the layer without network access.
+class FakeProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"fake provider returned {status_code}")
+        self.status_code = status_code
+
+
+class FakeProvider:
+    """Fails a fraction of requests with a status code and adds latency, reproducibly."""
+
+    def __init__(self, failure_rate=0.3, latency=0.05, status_code=503, seed=1):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.status_code = status_code
+        self.random = random.Random(seed)
+
+    def _wait(self, deadline):
+        if self.latency > deadline.remaining():
+            time.sleep(deadline.remaining())
+            raise TimeoutError("fake provider timed out")
+        time.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise FakeProviderError(self.status_code)
+
+    def complete(self, deadline):
+        self._wait(deadline)
+        return "ok"
+
+    def stream(self, deadline, chunks=5):
+        self._wait(deadline)
+        for index in range(chunks):
+            yield f"chunk{index} "
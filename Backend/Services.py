@@ -0,0 +1,171 @@
+# Lazy service registry.
+# Backends (API clients, the speech recognizer, the Speechify voice) are created on
+# first use, or warmed in the background once the GUI is on screen, instead of at import.
+from importlib import import_module
+from Backend.Settings import settings
+import threading
+import time
+
+
+class ServiceRegistry:
+    """Named factories whose results are created once, on first get() or during warm_up()."""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.timings = {}   # name -> seconds spent creating the service.
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        # Fast path once created; the per-service lock keeps creation to a single thread.
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.timings[name] = time.perf_counter() - start
+        return self._instances[name]
+
+    def is_ready(self, name):
+        return name in self._instances
+
+    def reset(self, name):
+        """Drop a created service so the next get() builds it again; closes it if it can be closed."""
+        with self._locks[name]:
+            instance = self._instances.pop(name, None)
+        if hasattr(instance, "close"):
+            try:
+                instance.close()
+            except Exception as e:
+                print(f"Closing '{name}' failed: {e}")
+
+    def warm_up(self, names=None):
+        """Create services in the background, in order; returns the worker thread."""
+        names = list(self._factories) if names is None else list(names)
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    # Leave it for get() to retry (and report) when it is really needed.
+                    print(f"Warm-up of '{name}' failed: {e}")
+
+        thread = threading.Thread(target=run, name="service-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+def _groq():
+    from groq import Groq
+    return Groq(api_key=settings.get().groq_api_key)
+
+def _cohere():
+    import cohere
+    return cohere.Client(api_key=settings.get().cohere_api_key)
+
+def _speech_recognizer():
+    from Backend.SpeechToText import SpeechBackends
+    return SpeechBackends[settings.get().speech_backend.lower()]()
+
+def _speechify():
+    from Backend.speechify_utils import get_speechify_client
+    return get_speechify_client()
+
+def _voice():
+    from Backend.TextToSpeech import ResolveVoice
+    return ResolveVoice()
+
+def _executable_index():
+    from Backend.ExecutableIndex import executable_index
+    executable_index.load()
+    executable_index.refresh_in_background()  # Picks up installs since the last run; cheap when little changed.
+    return executable_index
+
+def _module(name):
+    return lambda: import_module(name)
+
+
+# Process-wide registry used by Main and the backend modules.
+services = ServiceRegistry()
+services.register("groq", _groq)
+services.register("cohere", _cohere)
+services.register("speechify", _speechify)
+services.register("voice", _voice)
+services.register("speech_recognizer", _speech_recognizer)
+services.register("executable_index", _executable_index)
+
+# Backend modules Main imports on first use; warming them keeps the first query fast.
+BackendModules = [
+    "Backend.Model",
+    "Backend.Chatbot",
+    "Backend.RealtimeSearchEngine",
+    "Backend.SpeechToText",
+    "Backend.TextToSpeech",
+    "Backend.Automation",
+]
+for module_name in BackendModules:
+    services.register(module_name, _module(module_name))
+
+# Settings each service is built from; a change to any of them rebuilds the service on next use.
+ServiceSettings = {
+    "groq": {"groq_api_key"},
+    "cohere": {"cohere_api_key"},
+    "speechify": {"speechify_token", "speechify_timeout"},
+    "voice": {"assistant_voice"},
+    "speech_recognizer": {"speech_backend", "input_language", "vosk_model_path", "speech_end_silence_ms"},
+}
+_applied = [None]
+
+def _apply_settings(new_settings):
+    previous, _applied[0] = _applied[0], new_settings
+    if previous is None:
+        return
+    changed = new_settings.changed(previous)
+    for name, depends_on in ServiceSettings.items():
+        if changed & depends_on:
+            services.reset(name)
+
+settings.on_change(_apply_settings)
+
+# Warm-up order after the window is shown: modules first, then the network clients and the recognizer.
+WarmUpOrder = BackendModules + ["groq", "cohere", "speechify", "voice", "speech_recognizer", "executable_index"]
+
+
+# Startup benchmark: per-module import time (python -X importtime) and time-to-first-window.
+def BenchmarkStartup(top=15):
+    import subprocess
+    import sys
+    import re
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import Main"], capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            imports.append((int(match.group(2)), match.group(4)))
+    print("Slowest imports of Main (cumulative):")
+    for cumulative, module in sorted(imports, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    # Main prints a [STARTUP] line once the window is on screen, then exits.
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "Main.py", "--startup-benchmark"], stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        if line.startswith("[STARTUP]"):
+            print(f"Time to first window: {time.perf_counter() - start:.2f}s (process launch included)")
+            print(line.strip())
+            break
+    process.wait()
+
+
+# Run `python -m Backend.Services` to measure startup.
+if __name__ == "__main__":
+    BenchmarkStartup()
@@ -0,0 +1,178 @@
+# Application settings, parsed from .env once and shared by every module.
+# Settings objects are immutable; when .env changes on disk a new one is loaded,
+# validated and announced on the event bus as SettingsChanged.
+from dataclasses import dataclass, fields
+from dotenv import dotenv_values
+from Backend.EventBus import bus, SettingsChanged
+import threading
+import os
+
+SettingsPath = ".env"
+SpeechBackendNames = ("selenium", "vosk")
+
+class SettingsError(ValueError):
+    """Raised when .env is missing a required value or a value has the wrong type."""
+
+
+@dataclass(frozen=True)
+class Settings:
+    username: str
+    assistant_name: str
+    input_language: str = "en"
+    assistant_voice: str = None
+    groq_api_key: str = None
+    cohere_api_key: str = None
+    huggingface_api_key: str = None
+    speechify_token: str = None
+    chat_model: str = "llama3-70b-8192"           # Chatbot and realtime answers.
+    content_model: str = "llama3-8b-8192"         # Automation content writer.
+    decision_model: str = "command-r-plus"        # FirstLayerDMM query classifier.
+    speech_backend: str = "selenium"
+    vosk_model_path: str = r"Data\vosk-model"
+    speech_end_silence_ms: int = 700
+    barge_in: bool = False                        # Speech during playback cancels the answer (needs sounddevice).
+    speechify_timeout: float = 15.0
+    speechify_retries: int = 3
+    speechify_backoff: float = 0.5
+    file_ipc: bool = False
+
+    # .env key for each field.
+    EnvKeys = {
+        "username": "Username",
+        "assistant_name": "Assistantname",
+        "input_language": "InputLanguage",
+        "assistant_voice": "AssistantVoice",
+        "groq_api_key": "GroqAPIKey",
+        "cohere_api_key": "CohereAPIKey",
+        "huggingface_api_key": "HuggingFaceAPIKey",
+        "speechify_token": "SpeechifyToken",
+        "chat_model": "ChatModel",
+        "content_model": "ContentModel",
+        "decision_model": "DecisionModel",
+        "speech_backend": "SpeechBackend",
+        "vosk_model_path": "VoskModelPath",
+        "speech_end_silence_ms": "SpeechEndSilenceMs",
+        "barge_in": "BargeIn",
+        "speechify_timeout": "SpeechifyTimeout",
+        "speechify_retries": "SpeechifyRetries",
+        "speechify_backoff": "SpeechifyBackoff",
+        "file_ipc": "FileIPC",
+    }
+
+    @classmethod
+    def from_env(cls, path=SettingsPath):
+        values = {key: value.strip() for key, value in dotenv_values(path).items() if value and value.strip()}
+        parsed = {}
+        for field in fields(cls):
+            raw = values.get(cls.EnvKeys[field.name])
+            if raw is None:
+                continue
+            try:
+                parsed[field.name] = cls._convert(field.type, raw)
+            except ValueError:
+                raise SettingsError(f"{cls.EnvKeys[field.name]} in {path} must be {field.type.__name__}, got {raw!r}") from None
+
+        for name in ("username", "assistant_name"):
+            if not parsed.get(name):
+                raise SettingsError(f"{cls.EnvKeys[name]} is required in {path}")
+
+        settings = cls(**parsed)
+        settings.validate()
+        return settings
+
+    @staticmethod
+    def _convert(kind, raw):
+        if kind is int:
+            return int(raw)
+        if kind is float:
+            return float(raw)
+        if kind is bool:
+            if raw.lower() in ("true", "1", "yes", "on"):
+                return True
+            if raw.lower() in ("false", "0", "no", "off"):
+                return False
+            raise ValueError(raw)
+        return raw
+
+    def validate(self):
+        if self.speech_backend.lower() not in SpeechBackendNames:
+            raise SettingsError(f"SpeechBackend must be one of {', '.join(SpeechBackendNames)}, got {self.speech_backend!r}")
+        if self.speech_end_silence_ms <= 0 or self.speechify_timeout <= 0:
+            raise SettingsError("SpeechEndSilenceMs and SpeechifyTimeout must be positive")
+        if self.speechify_retries < 0 or self.speechify_backoff < 0:
+            raise SettingsError("SpeechifyRetries and SpeechifyBackoff must not be negative")
+
+    def changed(self, other):
+        """Names of the fields that differ from other."""
+        return {field.name for field in fields(self) if getattr(self, field.name) != getattr(other, field.name)}
+
+    def __repr__(self):
+        # Keep API keys out of logs.
+        shown = ", ".join(
+            f"{field.name}={'***' if field.name.endswith(('_key', '_token')) and getattr(self, field.name) else repr(getattr(self, field.name))}"
+            for field in fields(self)
+        )
+        return f"Settings({shown})"
+
+
+class SettingsStore:
+    """Holds the current Settings; reloads them when the file changes."""
+
+    def __init__(self, path=SettingsPath):
+        self.path = path
+        self._current = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def get(self):
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._load()
+        return self._current
+
+    def _load(self):
+        # Record the mtime first so a broken file is reported once, not on every check.
+        self._mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+        previous, self._current = self._current, Settings.from_env(self.path)
+        if self._current != previous:
+            bus.publish(SettingsChanged(self._current))
+
+    def reload(self):
+        """Re-read the file; on a validation error the previous settings stay in effect."""
+        with self._lock:
+            try:
+                self._load()
+            except SettingsError as e:
+                print(f"Settings not reloaded: {e}")
+        return self._current
+
+    def on_change(self, callback):
+        """Call callback(settings) now and after every successful reload."""
+        self.get()
+        return bus.subscribe(SettingsChanged, lambda event: callback(event.settings), replay=True)
+
+    def watch(self, interval=2.0):
+        """Reload in the background whenever the file's modification time changes."""
+        if self._watcher is not None:
+            return self._watcher
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    mtime = os.path.getmtime(self.path)
+                except OSError:
+                    continue
+                if mtime != self._mtime:
+                    self.reload()
+
+        self._watcher = threading.Thread(target=run, name="settings-watcher", daemon=True)
+        self._watcher.stop = stop
+        self._watcher.start()
+        return self._watcher
+
+
+# Process-wide settings used by every module.
+settings = SettingsStore()
@@ -3,16 +3,37 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from dotenv import dotenv_values
+from Backend.EventBus import bus, StatusChanged
+from Backend.VoiceActivity import Endpointer, FrameMs, WavFrames
+from Backend.Settings import settings
+from Backend.Services import services
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import namedtuple
+from abc import ABC, abstractmethod
+from itertools import takewhile
+import threading
+import queue
+import json
 import os
 import mtranslate as mt
 
-# Load environment variables from the .env file.
-env_vars = dotenv_values(".env")
-# Get the input language settings from the environment variables.
-InputLanguage = env_vars.get("InputLanguage")
+# Optional dependencies for the offline backend.
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+try:
+    import sounddevice
+except ImportError:
+    sounddevice = None
+
+# A recognition hypothesis; partial ones may still change, final ones end the utterance.
+Hypothesis = namedtuple("Hypothesis", ["text", "final"])
 
 # Define the HTML code for the speech recognition interface.
+# Every result is POSTed back to the local transcript server instead of
+# being left in the page for Python to poll.
 HtmlCode = '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -25,64 +46,49 @@ HtmlCode = '''<!DOCTYPE html>
     <script>
         const output = document.getElementById('output');
         let recognition;
+        let listening = false;
 
         function startRecognition() {
+            if (listening) return;
+            listening = true;
             recognition = new webkitSpeechRecognition() || new SpeechRecognition();
             recognition.lang = '';
             recognition.continuous = true;
+            recognition.interimResults = true;
 
             recognition.onresult = function(event) {
-                const transcript = event.results[event.results.length - 1][0].transcript;
-                output.textContent += transcript;
+                for (let i = event.resultIndex; i < event.results.length; i++) {
+                    const result = event.results[i];
+                    const transcript = result[0].transcript;
+                    if (result.isFinal) output.textContent += transcript;
+                    fetch('/transcript', {method: 'POST', body: JSON.stringify({text: transcript, final: result.isFinal})});
+                }
             };
 
             recognition.onend = function() {
-                recognition.start();
+                if (listening) recognition.start();
             };
             recognition.start();
         }
 
         function stopRecognition() {
-            recognition.stop();
+            listening = false;
+            if (recognition) recognition.stop();
             output.innerHTML = "";
         }
     </script>
 </body>
 </html>'''
 
-# Replace the language setting in the HTML code with the input language from the environment variables.
-HtmlCode = str(HtmlCode).replace("recognition.lang = '';", f"recognition.lang = '{InputLanguage}';")
-
-# Write the modified HTML code to a file.
-with open(r"Data\Voice.html","w") as f:
-    f.write(HtmlCode)
-
 # Get the current working directory.
 current_dir = os.getcwd()
-# Generate the file path for the HTML file.
-Link = f"{current_dir}/Data/Voice.html"
-
-# Set Chrome options for the Webdriver.
-chrome_options = Options()
-user_agent = "Mozilla/5.0(Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.142.86 Safari/537.36"
-chrome_options.add_argument(f'user-agent={user_agent}')
-
-chrome_options.add_argument("--log-level=3")
-
-chrome_options.add_argument("--use-fake-ui-for-media-stream")
-chrome_options.add_argument("--use-fake-device-for-media-stream")
-chrome_options.add_argument("--headless=new")
-# Initialize the Chrome Webdriver using the ChromeDriverManager.
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
 
 # Define the path for temporary files.
 TempDirPath = rf"{current_dir}/Frontend/Files"
 
-# Function to state the assistant's status by writing it to a file.
+# Function to state the assistant's status by publishing it on the event bus.
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}/Status.data',"w",encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(StatusChanged(Status))
 
 # Function to modify a query to ensure proper punctuation and formatting.
 def QueryModifier(Query):
@@ -110,35 +116,261 @@ def UniversalTranslator(Text):
     english_translation = mt.translate(Text, "en", "auto")
     return english_translation.capitalize()
 
-# Function to perform speech recognition using the webdriver.
-def SpeechRecognition():
-    # Open the HTML file in the browser.
-    driver.get("file:///" + Link)
-    # Start speech recognition by clicking the start button.
-    driver.find_element(by=By.ID, value="start").click()
 
-    while True:
+# ---------------- AUDIO SOURCES ---------------- #
+# Read 16-bit mono PCM frames from the default microphone.
+def MicrophoneFrames(sample_rate=16000, frame_ms=30):
+    if sounddevice is None:
+        raise RuntimeError("Microphone capture needs the 'sounddevice' package")
+    frames_per_chunk = int(sample_rate * frame_ms / 1000)
+    with sounddevice.RawInputStream(samplerate=sample_rate, blocksize=frames_per_chunk, channels=1, dtype="int16") as stream:
+        while True:
+            data, _ = stream.read(frames_per_chunk)
+            yield bytes(data)
+
+
+# ---------------- RECOGNIZER BACKENDS ---------------- #
+class SpeechBackendBase(ABC):
+    """A speech recognizer; listen() yields Hypothesis objects for one utterance, ending with a final one."""
+
+    @abstractmethod
+    def listen(self):
+        """Yield Hypothesis objects for the next utterance."""
+
+
+# Local HTTP endpoint that serves the recognition page and receives its results.
+class TranscriptHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # Fill in the current input language from the settings.
+        body = HtmlCode.replace("recognition.lang = '';", f"recognition.lang = '{settings.get().input_language}';").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            result = json.loads(self.rfile.read(length).decode("utf-8"))
+            text = str(result.get("text", "")).strip()
+            if text:
+                self.server.transcripts.put(Hypothesis(text, bool(result.get("final"))))
+        except ValueError:
+            pass
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet.
+
+
+class SeleniumRecognizer(SpeechBackendBase):
+    """Browser speech API in headless Chrome; results are pushed to a local endpoint."""
+
+    def __init__(self):
+        # Transcripts pushed from the page; listen() blocks on this queue.
+        self.transcripts = queue.Queue()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), TranscriptHandler)
+        self.server.transcripts = self.transcripts
+        threading.Thread(target=self.server.serve_forever, name="transcript-server", daemon=True).start()
+        # Generate the URL of the speech recognition page.
+        self.link = f"http://127.0.0.1:{self.server.server_address[1]}/Voice.html"
+
+        # Set Chrome options for the Webdriver.
+        chrome_options = Options()
+        user_agent = "Mozilla/5.0(Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.142.86 Safari/537.36"
+        chrome_options.add_argument(f'user-agent={user_agent}')
+
+        chrome_options.add_argument("--log-level=3")
+
+        chrome_options.add_argument("--use-fake-ui-for-media-stream")
+        chrome_options.add_argument("--use-fake-device-for-media-stream")
+        chrome_options.add_argument("--headless=new")
+        # Initialize the Chrome Webdriver using the ChromeDriverManager.
+        service = Service(ChromeDriverManager().install())
+        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+
+        # The page is loaded once and reused across turns.
+        self.driver.get(self.link)
+
+    def listen(self):
+        # Drop transcripts left over from a previous turn, then start recognition.
+        while not self.transcripts.empty():
+            self.transcripts.get_nowait()
+        self.driver.execute_script("startRecognition();")
+
+        try:
+            while True:
+                try:
+                    # Block until the page pushes a result (no polling of the page).
+                    hypothesis = self.transcripts.get(timeout=1)
+                except queue.Empty:
+                    continue
+                yield hypothesis
+                if hypothesis.final:
+                    return
+        finally:
+            # Stop recognition until the next turn.
+            self.driver.execute_script("stopRecognition();")
+
+    def close(self):
+        self.driver.quit()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class VoskRecognizer(SpeechBackendBase):
+    """Offline streaming recognizer (Vosk) over PCM frames from the microphone or a WAV file.
+
+    Frames pass through an Endpointer first: silence is never decoded, and the
+    utterance ends at the detected end of speech rather than the first result.
+    """
+
+    def __init__(self, model_path=None, sample_rate=16000, end_silence_ms=None):
+        if vosk is None:
+            raise RuntimeError("The offline speech backend needs the 'vosk' package")
+        config = settings.get()
+        self.model = vosk.Model(model_path or config.vosk_model_path)
+        self.sample_rate = sample_rate
+        self.end_silence_ms = end_silence_ms or config.speech_end_silence_ms
+
+    def listen(self, frames=None):
+        frames = MicrophoneFrames(self.sample_rate, FrameMs) if frames is None else frames
+        endpointer = Endpointer(self.sample_rate, FrameMs, end_silence_ms=self.end_silence_ms)
+        recognizer = None
+        pieces = []         # Results Vosk finalized on its own inside one utterance.
+        last_partial = ""
+
+        for kind, data, _ in endpointer.segments(frames):
+            if kind == "start":
+                # Speech detected: decode from the pre-roll onwards.
+                recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate)
+                data_ready = recognizer.AcceptWaveform(data)
+            elif kind == "audio":
+                data_ready = recognizer.AcceptWaveform(data)
+            else:
+                # End of speech: flush the whole utterance as one final result.
+                pieces.append(json.loads(recognizer.FinalResult()).get("text", ""))
+                text = " ".join(piece for piece in pieces if piece)
+                recognizer, pieces, last_partial = None, [], ""
+                if text:
+                    yield Hypothesis(text, True)
+                    return
+                continue
+
+            if data_ready:
+                pieces.append(json.loads(recognizer.Result()).get("text", ""))
+            else:
+                partial = " ".join(piece for piece in pieces + [json.loads(recognizer.PartialResult()).get("partial", "")] if piece)
+                if partial and partial != last_partial:
+                    last_partial = partial
+                    yield Hypothesis(partial, False)
+
+
+# ---------------- BARGE-IN ---------------- #
+# Speech frames needed to interrupt playback; longer than an utterance start so clicks
+# and the assistant's own voice leaking into the microphone are less likely to trigger it.
+BargeInStartFrames = 8
+
+def ListenForBargeIn(stop, on_speech, frames=None, sample_rate=16000):
+    """Call on_speech() once if speech starts on the microphone before stop is set."""
+    frames = MicrophoneFrames(sample_rate, FrameMs) if frames is None else frames
+    endpointer = Endpointer(sample_rate, FrameMs, start_frames=BargeInStartFrames, aggressiveness=3)
+    try:
+        for kind, _, _ in endpointer.segments(takewhile(lambda _: not stop.is_set(), frames)):
+            if kind == "start":
+                on_speech()
+                return
+    except Exception as e:
+        print(f"Barge-in listener stopped: {e}")
+    finally:
+        if hasattr(frames, "close"):
+            frames.close()  # Releases the input stream.
+
+# Watch the microphone while the assistant speaks (BargeIn = True in .env, needs sounddevice).
+# Returns an Event that stops the watcher, or None when barge-in is off.
+def StartBargeInMonitor(on_speech):
+    if not settings.get().barge_in or sounddevice is None:
+        return None
+    stop = threading.Event()
+    threading.Thread(target=ListenForBargeIn, args=(stop, on_speech), name="barge-in", daemon=True).start()
+    return stop
+
+
+SpeechBackends = {
+    "selenium": SeleniumRecognizer,
+    "vosk": VoskRecognizer,
+}
+
+# The configured backend is created on first use and rebuilt when its settings change.
+def GetRecognizer():
+    return services.get("speech_recognizer")
+
+# Stream partial and final hypotheses for the next utterance.
+def SpeechRecognitionStream():
+    yield from GetRecognizer().listen()
+
+# Function to perform speech recognition with the configured backend.
+# on_partial, if given, is called with each partial hypothesis as it arrives.
+def SpeechRecognition(on_partial=None):
+    Text = ""
+    while not Text:
+        for hypothesis in SpeechRecognitionStream():
+            if hypothesis.final:
+                Text = hypothesis.text
+            elif on_partial:
+                on_partial(hypothesis.text)
+
+    # If the input language is English, return the modified query.
+    InputLanguage = settings.get().input_language
+    if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
+        return QueryModifier(Text)
+    else:
+        # If the input language is not English, translate the text and return it.
+        SetAssistantStatus("Translating...")
+        return QueryModifier(UniversalTranslator(Text))
+
+# Benchmark: process CPU time while idle listening, old polling loop versus the queue.
+def BenchmarkIdleListening(seconds=10):
+    import time
+
+    recognizer = SeleniumRecognizer()
+    recognizer.driver.execute_script("startRecognition();")
+    start, cpu = time.time(), time.process_time()
+    while time.time() - start < seconds:
         try:
-            # Get the recognized text from the HTML output element.
-            Text = driver.find_element(by=By.ID, value="output").text
-
-            if Text:
-                # Stop recognition by clicking the stop button.
-                driver.find_element(by=By.ID, value="end").click()
-
-                # If the input language is English, return the modified query.
-                if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
-                    return QueryModifier(Text)
-                else:
-                    # If the input language is not English, translate the text and return it.
-                    SetAssistantStatus("Translating...")
-                    return QueryModifier(UniversalTranslator(Text))
-
-        except Exception as e:
+            recognizer.driver.find_element(by=By.ID, value="output").text
+        except Exception:
             pass
+    polling = time.process_time() - cpu
+
+    start, cpu = time.time(), time.process_time()
+    while time.time() - start < seconds:
+        try:
+            recognizer.transcripts.get(timeout=1)
+        except queue.Empty:
+            pass
+    blocking = time.process_time() - cpu
+    recognizer.driver.execute_script("stopRecognition();")
+
+    print(f"Polling find_element : {polling:.2f}s CPU in {seconds}s")
+    print(f"Transcript queue     : {blocking:.2f}s CPU in {seconds}s")
 
 # Main execution block.
+# Run `python -m Backend.SpeechToText benchmark` to compare idle CPU use,
+# or `python -m Backend.SpeechToText file.wav` to transcribe a WAV file offline.
 if __name__ == "__main__" :
+    import sys
+    if sys.argv[1:] == ["benchmark"]:
+        BenchmarkIdleListening()
+        sys.exit(0)
+
+    if sys.argv[1:] and sys.argv[1].lower().endswith(".wav"):
+        for hypothesis in VoskRecognizer().listen(WavFrames(sys.argv[1])):
+            print(("FINAL   " if hypothesis.final else "partial ") + hypothesis.text)
+        sys.exit(0)
+
     while True:
         # Continuously perform speech recognition and print the recognized text.
         Text = SpeechRecognition()
@@ -0,0 +1,170 @@
+# Plans and runs one turn's Decision list concurrently.
+# Automation, image generation and every general/realtime answer start together;
+# answers are generated in parallel but presented (shown and spoken) in Decision order.
+from time import perf_counter
+from Backend.Cancellation import CancelToken, Cancelled
+import asyncio
+import queue
+
+# Decision prefixes handled by Backend.Automation.
+AutomationPrefixes = ("open ", "close ", "play ", "system ", "content ", "google search ", "youtube search ")
+
+# Prefixes the decision model uses for image requests (longest first).
+ImagePrefixes = ("general generate image of ", "general generate image ", "generate image of ", "generate image ")
+
+AnswerKinds = ("general", "realtime")
+
+
+class Task:
+    """One node of a turn's plan: a kind, its argument, and the tasks it waits for."""
+
+    def __init__(self, name, kind, query, depends_on=(), source=None):
+        self.name = name
+        self.kind = kind
+        self.query = query
+        self.depends_on = tuple(depends_on)
+        self.source = source    # For "present" tasks: the answer task whose stream is shown.
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def __repr__(self):
+        return f"Task({self.name!r}, {self.kind!r}, {self.query!r}, depends_on={self.depends_on})"
+
+
+def PlanTurn(decision):
+    """Build the task graph for a Decision list.
+
+    Every answer gets a generation task with no dependencies and a presentation
+    task that waits for the previous presentation, so speech stays in order.
+    Only the first image request is run, as ImageGeneration handles one prompt
+    at a time. "exit" waits for everything else.
+    """
+    tasks = []
+    presentations = []
+    image_planned = False
+
+    for index, item in enumerate(decision):
+        lowered = item.lower().strip()
+        image = next((prefix for prefix in ImagePrefixes if lowered.startswith(prefix)), None)
+
+        if image:
+            if not image_planned:
+                tasks.append(Task(f"image-{index}", "image", item[len(image):].strip()))
+                image_planned = True
+        elif lowered.startswith(AutomationPrefixes):
+            tasks.append(Task(f"automation-{index}", "automation", item))
+        elif lowered.split(" ", 1)[0] in AnswerKinds and " " in lowered:
+            kind, query = item.split(" ", 1)
+            answer = Task(f"{kind}-{index}", kind, query)
+            present = Task(f"present-{index}", "present", query, depends_on=presentations[-1:], source=answer.name)
+            tasks += [answer, present]
+            presentations.append(present.name)
+        elif lowered != "exit":
+            print(f"No task for decision item: {item}")
+
+    if "exit" in [item.lower().strip() for item in decision]:
+        tasks.append(Task("exit", "exit", "", depends_on=[task.name for task in tasks]))
+    return tasks
+
+
+def Drain(generator, stream):
+    """Pull an answer generator to the end on the current thread, handing each delta to stream."""
+    try:
+        for delta in generator:
+            stream.put(delta)
+    finally:
+        stream.put(None)
+
+
+async def ExecutePlan(tasks, handlers, on_complete=None, cancel=None):
+    """Run tasks as soon as their dependencies finish; return them with timings filled in.
+
+    handlers maps a task kind to a callable:
+      "automation" -> coroutine function(item)
+      "image", "exit" -> blocking function(query), run in a worker thread
+      "general", "realtime" -> function(query) returning a generator of text deltas
+      "present" -> blocking function(deltas iterator), run in a worker thread
+    on_complete(task), if given, is called as each task finishes.
+    Once cancel (a CancelToken) is cancelled, tasks that have not started are skipped.
+    """
+    cancel = cancel or CancelToken()
+    start = perf_counter()
+    by_name = {task.name: task for task in tasks}
+    finished = {task.name: asyncio.Event() for task in tasks}
+    # Answer streams are created up front so presentation can start before generation ends.
+    streams = {task.name: queue.Queue() for task in tasks if task.kind in AnswerKinds}
+
+    async def Run(task):
+        for dependency in task.depends_on:
+            await finished[dependency].wait()
+        task.started = perf_counter() - start
+        try:
+            cancel.raise_if_cancelled()
+            if task.kind == "automation":
+                await handlers["automation"](task.query)
+            elif task.kind in AnswerKinds:
+                await asyncio.to_thread(Drain, handlers[task.kind](task.query), streams[task.name])
+            elif task.kind == "present":
+                await asyncio.to_thread(handlers["present"], iter(streams[task.source].get, None))
+            else:
+                await asyncio.to_thread(handlers[task.kind], task.query)
+        except Exception as e:
+            # A failed task must not block the rest of the turn.
+            task.error = e
+            if not isinstance(e, Cancelled):
+                print(f"Task {task.name} failed: {e}")
+            if task.kind in AnswerKinds:
+                streams[task.name].put(None)
+        finally:
+            task.finished = perf_counter() - start
+            finished[task.name].set()
+            if on_complete:
+                on_complete(task)
+
+    await asyncio.gather(*(Run(task) for task in by_name.values()))
+    return tasks
+
+
+def FormatTimings(tasks):
+    """One line per task: when it started and finished relative to the start of the turn."""
+    lines = []
+    for task in tasks:
+        status = f" FAILED ({task.error})" if task.error else ""
+        lines.append(f"[TIMING] {task.name:16} {task.started or 0:6.2f}s -> {task.finished or 0:6.2f}s  {task.query}{status}")
+    return "\n".join(lines)
+
+
+# Simulated turn: shows that answers and automation overlap while presentation stays ordered.
+def Demonstrate():
+    import time
+
+    def answer(seconds):
+        def generate(query):
+            for word in query.split():
+                time.sleep(seconds)
+                yield word + " "
+        return generate
+
+    async def automation(item):
+        await asyncio.sleep(0.3)
+
+    order = []
+    handlers = {
+        "automation": automation,
+        "image": lambda query: time.sleep(0.1),
+        "general": answer(0.05),
+        "realtime": answer(0.1),
+        "present": lambda deltas: order.append("".join(deltas).strip()),
+        "exit": lambda query: None,
+    }
+    decision = ["open chrome", "realtime latest news about space", "general what is a black hole",
+                "generate image of a nebula", "general tell me a joke", "exit"]
+    tasks = asyncio.run(ExecutePlan(PlanTurn(decision), handlers))
+    print(FormatTimings(tasks))
+    print("Presented in order:", order)
+
+
+# Run `python -m Backend.TaskPlanner` to see a simulated turn's timings.
+if __name__ == "__main__":
+    Demonstrate()
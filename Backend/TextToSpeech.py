@@ -1,151 +1,271 @@
-import pygame # Import pygame library for handling audio playback.
 import random # Import random for generating random choices.
-import asyncio # Import asyncio for asynchronous operations.
-import os # Import os for file path handling.
-from dotenv import dotenv_values # import dotenv for reading environment variables from a .env file.
-from speechify import Speechify
+import time # Import time for pacing the interruption checks.
+import queue # Import queue for handing synthesized sentences to playback.
+import threading # Import threading for the synthesis feeder.
+from concurrent.futures import ThreadPoolExecutor # Worker pool that synthesizes sentences ahead of playback.
 from speechify.tts import GetSpeechOptionsRequest
+from Backend.speechify_utils import get_speechify_client, call_with_retries, voice_catalog # Shared, pooled Speechify client and voice catalog.
 import base64
+import re
+from Backend.AudioCache import audio_cache
+from Backend.AudioPlayer import audio_player # Long-lived mixer that plays audio from memory.
+from Backend.Services import services # Lazy registry; resolves the voice on first use or during warm-up.
+from Backend.Settings import settings # Shared settings parsed once from .env.
 
-# load environment variables from a .env file.
-env_vars = dotenv_values(".env")
-AssistantVoice = env_vars.get("AssistantVoice")  # Get the assistant's voice from the environment variables.
-SpeechifyToken = env_vars.get("SpeechifyToken")  # Get the Speechify API token from environment variables.
+# Number of sentences synthesized in parallel ahead of playback.
+SynthesisWorkers = 2
 
-# Initialize Speechify client
-def get_speechify_client():
-    """Initialize and return Speechify client with API token."""
-    if not SpeechifyToken:
-        raise ValueError("SpeechifyToken not found in environment variables")
-    return Speechify(token=SpeechifyToken)
+# A sentence ends at . ! or ? (plus closing quotes/brackets) followed by whitespace, or at a line break.
+SentenceEnd = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
 
-# Function to convert text to an audio file using Speechify API.
-def TextToAudioFile(text) -> None:
-    file_path = r"Data\speech.mp3"   # Define the path where the speech will be saved.
+# Work out the language and model for AssistantVoice (once, via services.get("voice")).
+def ResolveVoice():
+    AssistantVoice = settings.get().assistant_voice
 
-    if os.path.exists(file_path): # Check if the file already exists.
-        os.remove(file_path)      # If it exists, remove it to avoid overwriting errors.
+    # Default to English if no specific language is detected
+    language = "en-US"
+    model = "simba-english"
+    
+    # If AssistantVoice contains language codes, extract them
+    if AssistantVoice and "-" in AssistantVoice:
+        # Extract language code from voice (e.g., "en-US-JennyNeural" -> "en-US")
+        voice_parts = AssistantVoice.split("-")
+        if len(voice_parts) >= 2:
+            language = f"{voice_parts[0]}-{voice_parts[1]}"
+    
+    # Use multilingual model for non-English languages
+    if not language.startswith("en"):
+        model = "simba-multilingual"
 
+    # Validate the voice against the catalog and prefer what it actually supports. This runs
+    # during warm-up, so on a cold first start it waits for the catalog instead of skipping the check.
     try:
-        # Get Speechify client
+        catalog = voice_catalog.load(wait=True)
+    except Exception as e:
+        print(f"Voice catalog unavailable, using AssistantVoice unchecked: {e}")
+        return language, model
+    voice = catalog.voice(AssistantVoice) if AssistantVoice else None
+    if voice is None:
+        if catalog.voices and AssistantVoice:
+            print(f"AssistantVoice '{AssistantVoice}' is not in the Speechify voice catalog")
+        return language, model
+
+    names = [name for name, locales in voice['models'].items() if language in locales]
+    if names:
+        model = model if model in names else names[0]
+    elif voice['models']:
+        model, locales = next(iter(voice['models'].items()))
+        language = locales[0] if locales else language
+    return language, model
+
+# Function to synthesize text into MP3 bytes using Speechify API.
+def SynthesizeSpeech(text) -> bytes:
+    language, model = services.get("voice")
+    AssistantVoice = settings.get().assistant_voice
+
+    voice_id = AssistantVoice if AssistantVoice else "default"
+    options = {"loudness_normalization": True, "text_normalization": True}
+
+    def synthesize():
+        # Get the shared Speechify client
         client = get_speechify_client()
-        
-        # Determine language and model based on AssistantVoice
-        # Default to English if no specific language is detected
-        language = "en-US"
-        model = "simba-english"
-        
-        # If AssistantVoice contains language codes, extract them
-        if AssistantVoice and "-" in AssistantVoice:
-            # Extract language code from voice (e.g., "en-US-JennyNeural" -> "en-US")
-            voice_parts = AssistantVoice.split("-")
-            if len(voice_parts) >= 2:
-                language = f"{voice_parts[0]}-{voice_parts[1]}"
-        
-        # Use multilingual model for non-English languages
-        if not language.startswith("en"):
-            model = "simba-multilingual"
-        
-        # Generate speech using Speechify API
-        audio_response = client.tts.audio.speech(
+
+        # Generate speech using Speechify API, retrying transient failures with backoff
+        audio_response = call_with_retries(lambda: client.tts.audio.speech(
             audio_format="mp3",
             input=text,
             language=language,
             model=model,
-            options=GetSpeechOptionsRequest(
-                loudness_normalization=True,
-                text_normalization=True
-            ),
-            voice_id=AssistantVoice if AssistantVoice else "default"
-        )
-        
-        # Decode the audio data and save to file
-        audio_bytes = base64.b64decode(audio_response.audio_data)
-        
-        with open(file_path, "wb") as f:
-            f.write(audio_bytes)
-            
-    except Exception as e:
-        print(f"Error in TextToAudioFile: {e}")
-        raise
+            options=GetSpeechOptionsRequest(**options),
+            voice_id=voice_id
+        ))
 
-# Function to manage Text-To-Speech (TTS) functionality.
-def TTS(Text, func=lambda r=None: True):
-    while True:
-        try:
-            # Convert text to an audio file.
-            TextToAudioFile(Text) 
+        # Decode the audio data
+        return base64.b64decode(audio_response.audio_data)
 
-            # Initialize pygame mixer for audio playback.
-            pygame.mixer.init()
+    # Repeated phrases are served from the audio cache without touching the network.
+    return audio_cache.get_or_create(
+        synthesize,
+        text=text, voice_id=voice_id, language=language, model=model, options=options, audio_format="mp3"
+    )
 
-            # Load the generated speech file into pygame mixer.
-            pygame.mixer.music.load(r"Data\speech.mp3")
-            pygame.mixer.music.play()  # Play the audio.
+# Synthesize sentences on a small worker pool and play them back-to-back from memory.
+# While sentence N plays, sentence N+1 is already being synthesized and is queued on
+# the shared audio player so there is no gap between them.
+def PlaySentences(sentences, func=lambda r=None: True, on_start=None, workers=SynthesisWorkers):
+    pending = queue.Queue(maxsize=workers)  # Bounds how far synthesis runs ahead of playback.
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
 
-            # Loop until the audio is done playing or the function stops.
-            while pygame.mixer.music.get_busy():
-                if func() == False:  # Check if the external function returns false.
-                    break
-                pygame.time.Clock().tick(10)   # Limit the loop for 10 ticks per second.
+    def put(item):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
-            return True  # Return True if the audio plays successfully.
-        
-        except Exception as e:  # Handle any exceptions during the process.
+    # Feed sentences to the synthesis pool in order as they become available.
+    def feed():
+        try:
+            for sentence in sentences:
+                if stop.is_set():
+                    break
+                put(executor.submit(SynthesizeSpeech, sentence))
+        except Exception as e:
             print(f"Error in TTS: {e}")
-
         finally:
+            put(None)
+
+    # Take the next synthesis job in order, honouring func-based interruption.
+    def take():
+        while True:
             try:
-                # Call the provided function with False to signal the end of TTS.
-                func(False)
-                pygame.mixer.music.stop()  # Stop the audio playback.
-                pygame.mixer.quit()      # Quit the pygame mixer.
+                return True, pending.get(timeout=0.1)
+            except queue.Empty:
+                if func() == False:
+                    return False, None
 
-            except Exception as e:  # Handle any exceptions during cleanup.
-                print(f"Error in finally block: {e}")
+    # Wait for a synthesis job while honouring func-based interruption.
+    def wait(future):
+        while not future.done():
+            if func() == False:  # Check if the external function returns false.
+                return False
+            time.sleep(0.1)
+        return True
+
+    threading.Thread(target=feed, daemon=True).start()
+
+    try:
+        started = False
+
+        while True:
+            ok, future = take()
+            if not ok or (future is not None and not wait(future)):
+                audio_player.stop()  # Interrupted: silence playback straight away.
+                return False
+            if future is None:
+                break
+
+            try:
+                audio_player.enqueue(future.result())
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+                continue
+
+            if not started:
+                started = True
+                if on_start:
+                    on_start()
+
+        # Loop until the audio is done playing or the function stops.
+        return audio_player.wait(func)
+
+    except Exception as e:  # Handle any exceptions during the process.
+        print(f"Error in TTS: {e}")
+        return False
+
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            # Call the provided function with False to signal the end of TTS.
+            func(False)
+
+        except Exception as e:  # Handle any exceptions during cleanup.
+            print(f"Error in finally block: {e}")
+
+# Function to manage Text-To-Speech (TTS) functionality.
+# on_start, if given, is called once playback of the audio begins.
+def TTS(Text, func=lambda r=None: True, on_start=None):
+    return PlaySentences(SplitSentences([str(Text)]), func, on_start)
+
+# List of predefined responses for cases where the text is too long.
+responses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out Ma'am.",
+    "The rest of the text is now on the chat screen, Ma'am, please check it.",
+    "You can see the rest of the text on the chat screen, Ma'am.",
+    "The remaining part of the text is now on the chat screen, Ma'am.",
+    "Ma'am, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, Ma'am.",
+    "Ma'am, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, Ma'am.",
+    "The next part of the text is on the chat screen, Ma'am.",
+    "Ma'am, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, Ma'am.",
+    "Ma'am, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, Ma'am.",
+    "Ma'am, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, Ma'am.",
+    "There's more to see on the chat screen, Ma'am, please look.",
+    "Ma'am, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out Ma'am.",
+    "Please review the chat screen for the rest of the text, Ma'am.",
+    "Ma'am, look at the chat screen for the complete answer."
+]
 
 # Function to manage Text-To-Speech with additional responses for long text.
-def TextToSpeech(Text, func=lambda r=None: True):
-    Data = str(Text).split(".")   # Split the text by periods into a list of sentences.
-
-    # List of predefined responses for cases where the text is too long.
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out Ma'am.",
-        "The rest of the text is now on the chat screen, Ma'am, please check it.",
-        "You can see the rest of the text on the chat screen, Ma'am.",
-        "The remaining part of the text is now on the chat screen, Ma'am.",
-        "Ma'am, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, Ma'am.",
-        "Ma'am, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, Ma'am.",
-        "The next part of the text is on the chat screen, Ma'am.",
-        "Ma'am, please check the chat screen for more information.",
-        "There's more text on the chat screen for you, Ma'am.",
-        "Ma'am, take a look at the chat screen for additional text.",
-        "You'll find more to read on the chat screen, Ma'am.",
-        "Ma'am, check the chat screen for the rest of the text.",
-        "The chat screen has the rest of the text, Ma'am.",
-        "There's more to see on the chat screen, Ma'am, please look.",
-        "Ma'am, the chat screen holds the continuation of the text.",
-        "You'll find the complete answer on the chat screen, kindly check it out Ma'am.",
-        "Please review the chat screen for the rest of the text, Ma'am.",
-        "Ma'am, look at the chat screen for the complete answer."
-    ]
-
-    # If the text is very long (more than 4 sentences and 250 characters), add a response message.
-    if len(Data) > 4 and len(Text) >= 250:
-        TTS(" ".join(Text.split(".")[0:2]) + ". " + random.choice(responses), func)
-
-    # Otherwise, just play the whole text.
+# The truncation is only a policy now that sentences are pipelined; pass truncate=False to read everything.
+def TextToSpeech(Text, func=lambda r=None: True, truncate=True):
+    return TextToSpeechStream(SplitSentences([str(Text)]), func, truncate=truncate)
+
+# Split a stream of text deltas into complete sentences as soon as each one ends.
+# Fragments shorter than min_length are merged with the following sentence.
+def SplitSentences(deltas, min_length=20):
+    buffer = ""
+    for delta in deltas:
+        buffer += delta
+        start = 0
+        for match in SentenceEnd.finditer(buffer):
+            sentence = buffer[start:match.end()].strip()
+            if len(sentence) >= min_length:
+                yield sentence
+                start = match.end()
+        buffer = buffer[start:]
+
+    if buffer.strip():
+        yield buffer.strip()
+
+# Optional policy for long answers: speak the first `keep` sentences and, if the answer
+# is long (more than 4 sentences and 250 characters), point to the chat screen instead of the rest.
+def TruncateLongAnswer(sentences, keep=2):
+    held, count, length = [], 0, 0
+    for sentence in sentences:
+        count += 1
+        length += len(sentence)
+        if count <= keep:
+            yield sentence
+        else:
+            held.append(sentence)
+
+    if count > 4 and length >= 250:
+        yield random.choice(responses)
     else:
-        TTS(Text, func)
+        yield from held
+
+# Speak sentences as they arrive while the answer is still being generated.
+def TextToSpeechStream(sentences, func=lambda r=None: True, on_start=None, truncate=True):
+    if truncate:
+        sentences = TruncateLongAnswer(sentences)
+    return PlaySentences(sentences, func, on_start)
+
+# Synthesize the fixed phrases up front so they are always served from the cache.
+def PrewarmAudioCache(phrases=None):
+    for phrase in phrases or responses + ["Okay, Bye!"]:
+        try:
+            SynthesizeSpeech(phrase)
+        except Exception as e:
+            print(f"Could not prewarm '{phrase}': {e}")
+    return audio_cache.stats()
 
 # Main execution loop
+# Run as `python -m Backend.TextToSpeech prewarm` to fill the audio cache.
 if __name__ == "__main__":
+    import sys
+    if sys.argv[1:] == ["prewarm"]:
+        print(PrewarmAudioCache())
+        sys.exit(0)
+
     while True:
         # Prompt user for input and pass it to Text-To-Speech function.
         TextToSpeech(input("Enter the text: "))
-
- 
- 
-
@@ -0,0 +1,160 @@
+# Voice activity detection and endpointing for the offline speech backend.
+# Frames are gated by energy (or WebRTC VAD when installed) so the recognizer only
+# sees speech, with a short pre-roll so the first syllable is not clipped.
+from collections import deque, namedtuple
+from array import array
+import wave
+import math
+
+# Optional: WebRTC's VAD is more robust to noise than plain energy gating.
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+FrameMs = 30              # Frame length fed to the detector.
+StartFrames = 3           # Consecutive speech frames needed to open an utterance.
+EndSilenceMs = 700        # Trailing silence that closes an utterance.
+PrerollMs = 300           # Audio kept from before the detected start.
+MaxUtteranceMs = 15000    # Hard cap on one utterance.
+MinThreshold = 300        # RMS floor (16-bit samples) below which a frame is always silence.
+NoiseRatio = 3.0          # Speech must be this many times louder than the noise floor.
+VadWarmupMs = 150         # WebRTC VAD flags the first frames of any noisy stream as speech; they only go to pre-roll.
+
+# A complete utterance: PCM bytes plus its frame range in the input stream.
+Utterance = namedtuple("Utterance", ["audio", "start_frame", "end_frame"])
+
+
+def FrameRMS(frame):
+    samples = array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+# Read 16-bit mono PCM frames from a WAV file (used for offline testing).
+# The last partial frame is padded with silence: WebRTC VAD rejects frames of any other length.
+def WavFrames(path, frame_ms=FrameMs):
+    with wave.open(path, "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path} must be 16-bit mono PCM")
+        frames_per_chunk = int(wav.getframerate() * frame_ms / 1000)
+        while True:
+            data = wav.readframes(frames_per_chunk)
+            if not data:
+                break
+            yield data.ljust(frames_per_chunk * 2, b"\0")
+
+
+class Endpointer:
+    """Streaming speech/silence segmentation over 16-bit mono PCM frames."""
+
+    def __init__(self, sample_rate=16000, frame_ms=FrameMs, start_frames=StartFrames, end_silence_ms=EndSilenceMs,
+                 preroll_ms=PrerollMs, max_utterance_ms=MaxUtteranceMs, aggressiveness=2, use_webrtc=True):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.start_frames = start_frames
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = max(1, max_utterance_ms // frame_ms)
+        self.preroll = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self.noise_floor = None
+        self.warmup = VadWarmupMs // frame_ms
+        self.vad = None
+        if use_webrtc and webrtcvad is not None and sample_rate in (8000, 16000, 32000, 48000) and frame_ms in (10, 20, 30):
+            self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        if self.vad is not None:
+            speech = self.vad.is_speech(frame, self.sample_rate)
+            if self.warmup > 0:
+                self.warmup -= 1
+                return False
+            return speech
+
+        # Energy gate against an adaptive noise floor that only learns from silence.
+        rms = FrameRMS(frame)
+        floor = self.noise_floor if self.noise_floor is not None else rms
+        speech = rms > max(MinThreshold, floor * NoiseRatio)
+        if not speech:
+            self.noise_floor = rms if self.noise_floor is None else 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+    def segments(self, frames):
+        """Yield ("start", preroll_bytes, index), ("audio", frame, index) and ("end", b"", index) events.
+
+        Silent frames outside an utterance produce no events at all.
+        """
+        in_speech = False
+        voiced = 0      # Consecutive speech frames while waiting for a start.
+        silent = 0      # Consecutive silent frames inside an utterance.
+        length = 0
+        for index, frame in enumerate(frames):
+            speech = self.is_speech(frame)
+
+            if not in_speech:
+                self.preroll.append(frame)
+                voiced = voiced + 1 if speech else 0
+                if voiced >= self.start_frames:
+                    in_speech, silent, length = True, 0, len(self.preroll)
+                    start = index - len(self.preroll) + 1
+                    yield "start", b"".join(self.preroll), start
+                    self.preroll.clear()
+                continue
+
+            length += 1
+            silent = 0 if speech else silent + 1
+            yield "audio", frame, index
+            if silent >= self.end_frames or length >= self.max_frames:
+                in_speech, voiced = False, 0
+                yield "end", b"", index
+
+        if in_speech:
+            yield "end", b"", index
+
+    def utterances(self, frames):
+        """Yield each complete Utterance, skipping silence between them."""
+        audio, start = [], 0
+        for kind, data, index in self.segments(frames):
+            if kind == "start":
+                audio, start = [data], index
+            elif kind == "audio":
+                audio.append(data)
+            else:
+                yield Utterance(b"".join(audio), start, index)
+
+
+# Offline check against a labelled WAV fixture.
+# Labels file: one "start end" pair in seconds per line for each spoken utterance.
+def EvaluateEndpoints(wav_path, labels_path, tolerance=0.3):
+    with wave.open(wav_path, "rb") as wav:
+        sample_rate = wav.getframerate()
+    with open(labels_path, "r", encoding="utf-8") as f:
+        labels = [tuple(float(value) for value in line.split()[:2]) for line in f if line.strip()]
+
+    endpointer = Endpointer(sample_rate=sample_rate)
+    found = [(u.start_frame * FrameMs / 1000, (u.end_frame + 1) * FrameMs / 1000)
+             for u in endpointer.utterances(WavFrames(wav_path, FrameMs))]
+
+    # Endpoint error: a detected segment is expected to begin one pre-roll early and
+    # to end one closing silence late; what remains is the detector's error.
+    matched, errors = 0, []
+    for start, end in labels:
+        candidates = [(abs(s + PrerollMs / 1000 - start), abs(e - EndSilenceMs / 1000 - end)) for s, e in found]
+        best = min(candidates, key=max, default=None)
+        if best is not None and max(best) <= tolerance:
+            matched += 1
+            errors.append(best)
+    return {
+        "labelled": len(labels),
+        "detected": len(found),
+        "matched": matched,
+        "max_start_error": max((error[0] for error in errors), default=None),
+        "max_end_error": max((error[1] for error in errors), default=None),
+        "segments": found,
+    }
+
+
+# Run `python -m Backend.VoiceActivity fixture.wav fixture.txt` to score endpoints.
+if __name__ == "__main__":
+    import sys
+    print(EvaluateEndpoints(sys.argv[1], sys.argv[2]))
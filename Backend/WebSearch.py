@@ -0,0 +1,340 @@
+# Shared Google result search for OpenApp and RealtimeSearchEngine.
+# One service instead of a page fetch per call: pooled HTTP sessions (one per thread),
+# a TTL cache keyed on the normalized query, coalescing of identical concurrent
+# searches, and the fastest available HTML parser (selectolax, lxml, or the stdlib).
+from concurrent.futures import Future
+from collections import namedtuple, OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlparse
+from requests.adapters import HTTPAdapter
+import threading
+import requests
+import time
+
+# Optional faster parsers.
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser   # selectolax < 1.0
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Fallback when our own parse finds nothing (e.g. Google changed its markup).
+try:
+    from googlesearch import search as googlesearch
+except ImportError:
+    googlesearch = None
+
+SearchUrl = "https://www.google.com/search"
+# Google serves its plain HTML results page to text browsers; it is small and stable to parse.
+SearchUserAgent = "Lynx/2.8.9rel.1 libwww-FM/2.14 SSL-MM/1.4.1 OpenSSL/1.1.1d"
+SearchTimeout = 8.0         # Seconds per page request.
+SearchCacheTTL = 10 * 60    # Seconds a query's results are reused.
+SearchCacheEntries = 256    # Least recently used queries are dropped above this.
+DescriptionLength = 300     # Characters of snippet kept per result.
+
+SearchResult = namedtuple("SearchResult", ["url", "title", "description"])
+
+
+def NormalizeSearch(query):
+    return " ".join(query.lower().split())
+
+
+def ResultUrl(href):
+    """The target of a Google "/url?q=" redirect, or None for other and Google-internal links."""
+    if not href or not href.startswith("/url?q="):
+        return None
+    url = unquote(href[len("/url?q="):].split("&")[0])
+    host = urlparse(url).netloc
+    if not url.startswith("http") or host == "google.com" or host.endswith(".google.com"):
+        return None
+    return url
+
+
+def Describe(block_text, title):
+    """A block's text minus the result title, whitespace collapsed and cut to DescriptionLength."""
+    text = " ".join(block_text.replace(title, " ", 1).split())
+    return text[:DescriptionLength]
+
+
+# ---------------- parsers ---------------- #
+# Each returns [SearchResult]; the description is the text of the nearest enclosing
+# <div> that holds more than the title itself.
+
+class _StdlibResultParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.results = []
+        self._blocks = []       # Open <div>s: [text pieces, indexes of results still without a description]
+        self._anchor = None     # [url, title pieces] while inside a result link
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div":
+            self._blocks.append([[], []])
+        elif tag == "a" and self._anchor is None:
+            url = ResultUrl(dict(attrs).get("href"))
+            if url:
+                self._anchor = [url, []]
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._anchor is not None:
+            url, pieces = self._anchor
+            self._anchor = None
+            self.results.append(SearchResult(url, " ".join("".join(pieces).split()), ""))
+            if self._blocks:
+                self._blocks[-1][1].append(len(self.results) - 1)
+        elif tag == "div" and self._blocks:
+            pieces, waiting = self._blocks.pop()
+            text = "".join(pieces)
+            undescribed = []
+            for index in waiting:
+                description = Describe(text, self.results[index].title)
+                if description:
+                    self.results[index] = self.results[index]._replace(description=description)
+                else:
+                    undescribed.append(index)
+            if self._blocks:
+                # Text and results that still lack a description move to the enclosing block.
+                self._blocks[-1][0].append(text)
+                self._blocks[-1][1].extend(undescribed)
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._anchor[1].append(data)
+        if self._blocks:
+            self._blocks[-1][0].append(data)
+
+
+def ParseStdlib(html):
+    parser = _StdlibResultParser()
+    parser.feed(html)
+    parser.close()
+    return parser.results
+
+
+def ParseLxml(html):
+    results = []
+    for anchor in lxml.html.fromstring(html).iter("a"):
+        url = ResultUrl(anchor.get("href"))
+        if not url:
+            continue
+        title = " ".join(anchor.text_content().split())
+        description = ""
+        for block in anchor.iterancestors("div"):
+            description = Describe(block.text_content(), title)
+            if description:
+                break
+        results.append(SearchResult(url, title, description))
+    return results
+
+
+def ParseSelectolax(html):
+    results = []
+    for anchor in SelectolaxParser(html).css('a[href^="/url?q="]'):
+        url = ResultUrl(anchor.attributes.get("href"))
+        if not url:
+            continue
+        title = " ".join(anchor.text(separator=" ").split())
+        description = ""
+        block = anchor.parent
+        while block is not None and not description:
+            if block.tag == "div":
+                description = Describe(block.text(separator=" "), title)
+            block = block.parent
+        results.append(SearchResult(url, title, description))
+    return results
+
+
+Parsers = {"selectolax": ParseSelectolax, "lxml": ParseLxml, "stdlib": ParseStdlib}
+DefaultParser = "selectolax" if SelectolaxParser else "lxml" if lxml else "stdlib"
+
+
+class WebSearch:
+    """Cached, coalesced Google result search over pooled per-thread HTTP sessions."""
+
+    def __init__(self, url=SearchUrl, ttl=SearchCacheTTL, max_entries=SearchCacheEntries,
+                 parser=DefaultParser, timeout=SearchTimeout):
+        self.url = url
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.parse = Parsers[parser]
+        self.parser = parser
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()     # (query, num) -> (fetched at, [SearchResult])
+        self._inflight = {}             # (query, num) -> Future shared by identical concurrent searches
+        self._stats = {"hits": 0, "fetches": 0, "coalesced": 0, "failures": 0, "fetch_seconds": 0.0, "parse_seconds": 0.0}
+
+    @property
+    def session(self):
+        # requests.Session isn't safe to share between threads; each worker keeps its own pooled one.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = SearchUserAgent
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def results(self, query, num=10):
+        """Up to num results for query, from the cache if fetched within the TTL."""
+        key = (NormalizeSearch(query), num)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+                return list(cached[1])
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self._stats["coalesced"] += 1
+
+        if owner:
+            try:
+                found = self._search(key[0], num)
+                with self._lock:
+                    self._cache[key] = (time.monotonic(), found)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                future.set_result(found)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return list(future.result())
+
+    def links(self, query):
+        """Result URLs for query, best first."""
+        return [result.url for result in self.results(query)]
+
+    def _search(self, query, num):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params={"q": query, "num": num + 2, "hl": "en"}, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # Rate limited (429), a 5xx or no connection: try the googlesearch package instead.
+            with self._lock:
+                self._stats["failures"] += 1
+            if googlesearch is None:
+                raise
+            print(f"Search request failed ({e}); falling back to googlesearch")
+            found = self._fallback(query, num)
+            if not found:
+                raise   # Don't cache an empty answer for a failed fetch.
+            return found
+
+        fetched = time.perf_counter()
+        found = self.parse(response.text)[:num]
+        with self._lock:
+            self._stats["fetches"] += 1
+            self._stats["fetch_seconds"] += fetched - start
+            self._stats["parse_seconds"] += time.perf_counter() - fetched
+
+        if not found and googlesearch is not None:
+            found = self._fallback(query, num)
+        return found
+
+    @staticmethod
+    def _fallback(query, num):
+        return [SearchResult(result.url, result.title, result.description)
+                for result in googlesearch(query, advanced=True, num_results=num)]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            fetches = stats["fetches"] or 1
+            stats.update(
+                parser=self.parser,
+                entries=len(self._cache),
+                avg_fetch_ms=stats.pop("fetch_seconds") / fetches * 1000,
+                avg_parse_ms=stats.pop("parse_seconds") / fetches * 1000,
+            )
+            return stats
+
+
+# Process-wide service used by OpenApp and RealtimeSearchEngine.
+web_search = WebSearch()
+
+
+# Canned results page in the shape of Google's plain HTML results.
+def CannedResultsPage(query, results=10):
+    blocks = "".join(
+        f'<div class="ezO2md"><div><a href="/url?q=https://example.com/{index}/{query.replace(" ", "-")}&amp;sa=U">'
+        f'<span class="CVA68e">Result {index} for {query}</span></a></div>'
+        f'<div><span class="FrIlee">Snippet {index} about {query}, with enough words to be a description.</span></div></div>'
+        for index in range(results)
+    )
+    return (f'<html><body><div><a href="/url?q=https://accounts.google.com/&amp;sa=U">Sign in</a></div>'
+            f'<div id="main">{blocks}</div></body></html>')
+
+
+# Runs the service against a local HTTP stand-in that serves canned pages with a delay.
+def Demonstrate(delay=0.2, clients=8):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs
+    from concurrent.futures import ThreadPoolExecutor
+
+    served = []
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)["q"][0]
+            served.append(query)
+            time.sleep(delay)
+            body = CannedResultsPage(query).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = WebSearch(url=f"http://127.0.0.1:{server.server_port}/search")
+
+    with ThreadPoolExecutor(clients) as pool:
+        start = time.perf_counter()
+        answers = list(pool.map(lambda _: service.results("Latest Space News", 5), range(clients)))
+        print(f"{clients} identical concurrent searches: {len(served)} request(s), {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    service.results("latest   space news", 5)
+    print(f"repeat (normalized) query: {(time.perf_counter() - start) * 1000:.2f} ms, requests still {len(served)}")
+    print(f"first result: {answers[0][0]}")
+
+    page = CannedResultsPage("parser benchmark", 50)
+    for name, parse in Parsers.items():
+        if name == "selectolax" and SelectolaxParser is None or name == "lxml" and lxml is None:
+            continue
+        start = time.perf_counter()
+        for _ in range(100):
+            parse(page)
+        print(f"{name:10} parser: {(time.perf_counter() - start) * 10:.2f} ms per page")
+    print(service.stats())
+    server.shutdown()
+
+
+# Run `python -m Backend.WebSearch` to exercise the cache, coalescing and parsers offline.
+if __name__ == "__main__":
+    Demonstrate()
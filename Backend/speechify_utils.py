@@ -5,17 +5,91 @@ This module provides helper functions for voice selection and testing.
 
 from speechify import Speechify
 from speechify.tts import GetSpeechOptionsRequest
+import threading
+import random
 import base64
+import json
+import httpx
+import time
 import os
-from dotenv import dotenv_values
+from Backend.Settings import settings
 
-def filter_voice_models(voices, *, gender=None, locale=None, tags=None):
+# Timeout, retries and backoff come from settings (SpeechifyTimeout/Retries/Backoff in .env).
+RetryableStatus = {408, 409, 429, 500, 502, 503, 504}
+
+# On-disk voice catalog and how long it is trusted before a background refresh.
+VoiceCatalogPath = r"Data\VoiceCatalog.json"
+VoiceCatalogTTL = 24 * 60 * 60
+
+_client = None
+_client_key = None  # (token, timeout) the current client was built with.
+_client_lock = threading.Lock()
+
+def get_speechify_client():
+    """
+    Return the process-wide Speechify client, creating it on first use.
+
+    The client wraps one httpx.Client, so TLS sessions and keep-alive
+    connections are reused by every TTS request and voice utility call.
+    It is rebuilt if the token or timeout changes in the settings.
+
+    Returns:
+        Speechify: shared client instance.
+    """
+    global _client, _client_key
+    config = settings.get()
+    key = (config.speechify_token, config.speechify_timeout)
+    if _client is None or _client_key != key:
+        with _client_lock:
+            if _client is None or _client_key != key:
+                token, timeout = key
+                if not token:
+                    raise ValueError("SpeechifyToken not found in environment variables")
+                http_client = httpx.Client(
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+                    limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60),
+                )
+                _client, _client_key = Speechify(token=token, timeout=timeout, httpx_client=http_client), key
+    return _client
+
+def is_retryable(error):
+    """Transport failures, timeouts, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, (httpx.TransportError, httpx.TimeoutException)):
+        return True
+    return getattr(error, "status_code", None) in RetryableStatus
+
+def call_with_retries(call, retries=None, backoff=None):
+    """
+    Run call(), retrying retryable failures with exponential backoff and jitter.
+
+    Args:
+        call (callable): zero-argument function performing the API request.
+        retries (int, optional): attempts after the first; defaults to settings.speechify_retries.
+        backoff (float, optional): base delay in seconds; defaults to settings.speechify_backoff.
+
+    Returns:
+        The result of call(). The last error is raised once retries run out.
+    """
+    config = settings.get()
+    retries = config.speechify_retries if retries is None else retries
+    backoff = config.speechify_backoff if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            print(f"Speechify request failed ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+def filter_voice_models(voices=None, *, gender=None, locale=None, tags=None):
     """
     Filter Speechify voices by gender, locale, and/or tags,
     and return the list of model IDs for matching voices.
 
     Args:
-        voices (list): List of GetVoice objects.
+        voices (list, optional): List of GetVoice objects; defaults to the shared voice catalog.
         gender (str, optional): e.g. 'male', 'female'.
         locale (str, optional): e.g. 'en-US'.
         tags (list, optional): list of tags, e.g. ['timbre:deep', 'use-case:advertisement'].
@@ -23,50 +97,26 @@ def filter_voice_models(voices, *, gender=None, locale=None, tags=None):
     Returns:
         list[str]: IDs of matching voice models.
     """
-    results = []
-
-    for voice in voices:
-        # gender filter
-        if gender and voice.gender.lower() != gender.lower():
-            continue
-
-        # locale filter (check across models and languages)
-        if locale:
-            if not any(
-                any(lang.locale == locale for lang in model.languages)
-                for model in voice.models
-            ):
-                continue
-
-        # tags filter
-        if tags:
-            if not all(tag in voice.tags for tag in tags):
-                continue
-
-        # If we got here, the voice matches -> collect model ids
-        for model in voice.models:
-            results.append(model.name)
-
-    return results
+    if voices is None:
+        catalog = voice_catalog.load(wait=True)
+    else:
+        catalog = VoiceCatalog.from_voices(voices)
+    return catalog.model_names(gender=gender, locale=locale, tags=tags)
 
 def get_available_voices(client=None):
     """
     Get all available voices from Speechify API.
     
     Args:
-        client: Speechify client instance. If None, creates one using env token.
+        client: Speechify client instance. If None, uses the shared client.
     
     Returns:
         list: List of available voice objects
     """
     if client is None:
-        env_vars = dotenv_values(".env")
-        token = env_vars.get("SpeechifyToken")
-        if not token:
-            raise ValueError("SpeechifyToken not found in environment variables")
-        client = Speechify(token=token)
+        client = get_speechify_client()
     
-    return client.tts.voices.list()
+    return call_with_retries(client.tts.voices.list)
 
 def list_voices_by_language(language_code="en-US"):
     """
@@ -78,33 +128,16 @@ def list_voices_by_language(language_code="en-US"):
     Returns:
         list: List of voice IDs for the specified language
     """
-    client = None
     try:
-        env_vars = dotenv_values(".env")
-        token = env_vars.get("SpeechifyToken")
-        if not token:
-            print("SpeechifyToken not found in environment variables")
-            return []
-        
-        client = Speechify(token=token)
-        voices = get_available_voices(client)
-        
-        matching_voices = []
-        for voice in voices:
-            for model in voice.models:
-                for lang in model.languages:
-                    if lang.locale == language_code:
-                        matching_voices.append({
-                            'voice_id': voice.voice_id,
-                            'name': voice.name,
-                            'gender': voice.gender,
-                            'tags': voice.tags
-                        })
-                        break
-                if any(lang.locale == language_code for lang in model.languages):
-                    break
-        
-        return matching_voices
+        return [
+            {
+                'voice_id': voice['voice_id'],
+                'name': voice['name'],
+                'gender': voice['gender'],
+                'tags': voice['tags']
+            }
+            for voice in voice_catalog.load(wait=True).find(locale=language_code)
+        ]
     
     except Exception as e:
         print(f"Error listing voices: {e}")
@@ -123,13 +156,7 @@ def test_voice(voice_id, text="Hello, this is a test of the Speechify API.", out
         bool: True if successful, False otherwise
     """
     try:
-        env_vars = dotenv_values(".env")
-        token = env_vars.get("SpeechifyToken")
-        if not token:
-            print("SpeechifyToken not found in environment variables")
-            return False
-        
-        client = Speechify(token=token)
+        client = get_speechify_client()
         
         # Determine language from voice_id
         language = "en-US"
@@ -146,7 +173,7 @@ def test_voice(voice_id, text="Hello, this is a test of the Speechify API.", out
         print(f"Model: {model}")
         
         # Generate speech
-        audio_response = client.tts.audio.speech(
+        audio_response = call_with_retries(lambda: client.tts.audio.speech(
             audio_format="mp3",
             input=text,
             language=language,
@@ -156,7 +183,7 @@ def test_voice(voice_id, text="Hello, this is a test of the Speechify API.", out
                 text_normalization=True
             ),
             voice_id=voice_id
-        )
+        ))
         
         # Save audio file
         audio_bytes = base64.b64decode(audio_response.audio_data)
@@ -171,6 +198,155 @@ def test_voice(voice_id, text="Hello, this is a test of the Speechify API.", out
         print(f"Error testing voice: {e}")
         return False
 
+class VoiceCatalog:
+    """
+    Voice list cached on disk with a TTL and indexed for dictionary lookups.
+
+    Voices are stored as plain dicts ({voice_id, name, gender, tags, models})
+    where models maps each model name to its supported locales. A stale
+    catalog keeps serving queries while a background thread refreshes it.
+    """
+
+    def __init__(self, path=VoiceCatalogPath, ttl=VoiceCatalogTTL, fetch=None):
+        self.path = path
+        self.ttl = ttl
+        self.fetch = fetch or get_available_voices
+        self.fetched_at = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._refreshing = False
+        self._first_fetch = threading.Lock()
+        self._index([], 0)
+
+    @classmethod
+    def from_voices(cls, voices):
+        """An in-memory catalog indexing the given GetVoice objects."""
+        catalog = cls(path=None, fetch=lambda: voices)
+        catalog._loaded = True
+        catalog._index([cls._to_record(voice) for voice in voices], time.time())
+        return catalog
+
+    @staticmethod
+    def _to_record(voice):
+        return {
+            'voice_id': voice.voice_id,
+            'name': voice.name,
+            'gender': voice.gender,
+            'tags': list(voice.tags or []),
+            'models': {model.name: [lang.locale for lang in model.languages] for model in voice.models},
+        }
+
+    def _index(self, records, fetched_at):
+        # Build every index up front, then swap them in together.
+        voices, by_locale, by_gender, by_tag, by_model = {}, {}, {}, {}, {}
+        for record in records:
+            voice_id = record['voice_id']
+            voices[voice_id] = record
+            by_gender.setdefault((record['gender'] or "").lower(), set()).add(voice_id)
+            for tag in record['tags']:
+                by_tag.setdefault(tag, set()).add(voice_id)
+            for model, locales in record['models'].items():
+                by_model.setdefault(model, set()).add(voice_id)
+                for locale in locales:
+                    by_locale.setdefault(locale, set()).add(voice_id)
+
+        self.voices, self.by_locale, self.by_gender, self.by_tag, self.by_model = voices, by_locale, by_gender, by_tag, by_model
+        self._order = {voice_id: i for i, voice_id in enumerate(voices)}
+        self.fetched_at = fetched_at
+
+    def load(self, wait=False):
+        """Load the catalog from disk once; refresh in the background if missing or stale.
+
+        With wait=True and nothing cached yet, block on the first fetch instead, so a
+        cold catalog doesn't look as if it had no voices.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    self._index(data['voices'], data['fetched_at'])
+                except (OSError, ValueError, KeyError):
+                    pass
+        if wait and not self.fetched_at:
+            with self._first_fetch:
+                if not self.fetched_at:
+                    self.refresh()
+        elif self.is_stale():
+            self.refresh_in_background()
+        return self
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def refresh(self):
+        """Fetch the voice list from the API, rebuild the indexes and persist them."""
+        records = [self._to_record(voice) for voice in self.fetch()]
+        fetched_at = time.time()
+        with self._lock:
+            self._index(records, fetched_at)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({'fetched_at': fetched_at, 'voices': records}, f)
+        os.replace(temp_path, self.path)
+        return self
+
+    def refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing voice catalog: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="voice-catalog", daemon=True).start()
+
+    def voice(self, voice_id):
+        return self.voices.get(voice_id)
+
+    def find(self, *, gender=None, locale=None, tags=None, model=None):
+        """Return voices matching every given filter, in API order."""
+        with self._lock:
+            return self._find(gender, locale, tags, model)
+
+    def _find(self, gender, locale, tags, model):
+        candidates = None
+        lookups = []
+        if gender:
+            lookups.append(self.by_gender.get(gender.lower(), set()))
+        if locale:
+            lookups.append(self.by_locale.get(locale, set()))
+        if model:
+            lookups.append(self.by_model.get(model, set()))
+        for tag in tags or []:
+            lookups.append(self.by_tag.get(tag, set()))
+
+        for ids in sorted(lookups, key=len):
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            return list(self.voices.values())
+        return [self.voices[voice_id] for voice_id in sorted(candidates, key=self._order.get)]
+
+    def model_names(self, *, gender=None, locale=None, tags=None):
+        """Indexed equivalent of filter_voice_models()."""
+        return [model for voice in self.find(gender=gender, locale=locale, tags=tags) for model in voice['models']]
+
+# Shared catalog; call voice_catalog.load() before querying it.
+voice_catalog = VoiceCatalog()
+
 def get_supported_languages():
     """
     Get list of supported languages with their codes.
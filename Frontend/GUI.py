@@ -1,29 +1,24 @@
 
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel
-from PyQt5.QtGui import QIcon, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat
-from PyQt5.QtCore import Qt, QSize, QTimer
-from dotenv import dotenv_values  # For loading environment variables
+from PyQt5.QtGui import QIcon, QMovie, QColor, QTextCharFormat, QFont, QPixmap, QTextBlockFormat, QTextCursor
+from PyQt5.QtCore import Qt, QSize, QObject, QTimer, pyqtSignal
+from Backend.EventBus import bus, StatusChanged, MicToggled, ResponseAppended, ResponseDelta, BargeIn
+from Backend.Settings import settings  # Shared settings parsed once from .env
 import sys
 import os
 
-# Load environment variables from .env file
-env_vars = dotenv_values(".env")
-Assistantname = env_vars.get("Assistantname")
-
 # Define paths to resource directories
 current_dir = os.getcwd()
 TempDirPath = rf"{current_dir}\Frontend\Files"
 GraphicsDirPath = rf"{current_dir}\Frontend\Graphics"
 
-# Write 'False' to Mic.data file - indicates mic is OFF initially
+# Mic is OFF initially
 def MicButtonInitialed():
-    with open(rf'{TempDirPath}\Mic.data', "w", encoding='utf-8') as file:
-        file.write("False")
+    SetMicrophoneStatus("False")
 
-# Write 'True' to Mic.data file - indicates mic is ON
+# Mic is ON
 def MicButtonClosed():
-    with open(rf'{TempDirPath}\Mic.data', "w", encoding='utf-8') as file:
-        file.write("True")
+    SetMicrophoneStatus("True")
 
 # Returns full path of a graphics file
 def GraphicsDirectoryPath(Filename):
@@ -33,32 +28,56 @@ def GraphicsDirectoryPath(Filename):
 def TempDirectoryPath(Filename):
     return rf'{TempDirPath}\{Filename}'
 
-# Writes a message to the Responses.data file for display
+# Publishes a message for the chat panel
 def ShowTextToScreen(Text):
-    with open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8') as file:
-        file.write(Text)
+    bus.publish(ResponseAppended(Text))
 
-# Set microphone status by writing to Mic.data
+# Set microphone status ("True" / "False") on the event bus
 def SetMicrophoneStatus(Command):
-    with open(rf'{TempDirPath}\Mic.data', "w", encoding='utf-8') as file:
-        file.write(Command)
+    bus.publish(MicToggled(str(Command) == "True"))
 
-# Get microphone status by reading from Mic.data
+# Get microphone status from the latest MicToggled event
 def GetMicrophoneStatus():
-    with open(rf'{TempDirPath}\Mic.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    event = bus.latest(MicToggled)
+    return "True" if event is not None and event.active else "False"
 
-# Set assistant status by writing to Status.data
+# Set assistant status on the event bus
 def SetAssistantStatus(Status):
-    with open(rf'{TempDirPath}\Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    bus.publish(StatusChanged(Status))
 
-# Get assistant status by reading from Status.data
+# Get assistant status from the latest StatusChanged event
 def GetAssistantStatus():
-    with open(rf'{TempDirPath}\Status.data', "r", encoding='utf-8') as file:
-        Status = file.read()
-    return Status
+    event = bus.latest(StatusChanged)
+    return event.status if event is not None else ""
+
+
+# Bridges bus events (published from worker threads) into the Qt GUI thread.
+class BusSignals(QObject):
+    statusChanged = pyqtSignal(str)
+    responseAppended = pyqtSignal(str)
+    responseDelta = pyqtSignal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._callbacks = [
+            (StatusChanged, bus.subscribe(StatusChanged, lambda event: self.statusChanged.emit(event.status))),
+            (ResponseAppended, bus.subscribe(ResponseAppended, lambda event: self.responseAppended.emit(event.text))),
+            (ResponseDelta, bus.subscribe(ResponseDelta, lambda event: self.responseDelta.emit(event.text, event.done))),
+        ]
+        self.destroyed.connect(self._unsubscribe)
+
+    def _unsubscribe(self, *args):
+        for event_type, callback in self._callbacks:
+            bus.unsubscribe(event_type, callback)
+
+    # Re-deliver the current state to freshly connected widgets.
+    def replay(self):
+        status = bus.latest(StatusChanged)
+        if status is not None:
+            self.statusChanged.emit(status.status)
+        response = bus.latest(ResponseAppended)
+        if response is not None:
+            self.responseAppended.emit(response.text)
 
 
 # ---------------- CHAT SECTION WIDGET ---------------- #
@@ -94,36 +113,40 @@ class ChatSection(QWidget):
         layout.addWidget(self.label)
         layout.addWidget(self.gif_label)
 
-        self.old_chat_message = ""  # Keeps track of previously shown messages
-
-        # Timer triggers loading and updating messages every 100ms
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(100)
-
-    # Reads from Responses.data and displays new messages
-    def loadMessages(self):
-        try:
-            with open(TempDirectoryPath('Responses.data'), "r", encoding='utf-8') as file:
-                messages = file.read()
-                if messages and messages != self.old_chat_message:
-                    print("Displaying message:", messages)
-                    self.addMessages(messages, color="black")
-                    self.old_chat_message = messages
-        except Exception as e:
-            print("Error reading Responses.data:", e)
-
-    # Reads speech recognition status and updates label
-    def SpeechRecogText(self):
-        try:
-            with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-                self.label.setText(file.read())
-        except Exception as e:
-            print("Error reading Status.data:", e)
+        # Bus events are delivered through queued signals so widgets update on the GUI thread
+        self.signals = BusSignals(self)
+        self.signals.responseAppended.connect(self.loadMessages, Qt.QueuedConnection)
+        self.signals.responseDelta.connect(self.appendDelta, Qt.QueuedConnection)
+        self.signals.statusChanged.connect(self.SpeechRecogText, Qt.QueuedConnection)
+        self.streaming = False  # True while a streamed message is being appended
+        self.signals.replay()
+
+    # Displays a newly published message
+    def loadMessages(self, messages):
+        if messages:
+            print("Displaying message:", messages)
+            self.addMessages(messages, color="black")
+
+    # Updates the live speech status label
+    def SpeechRecogText(self, status):
+        self.label.setText(status)
+
+    # Appends a streamed piece of the current message; done closes the message
+    def appendDelta(self, text, done):
+        if not self.streaming:
+            self.addMessages(text, color="black", end="")
+            self.streaming = True
+        else:
+            cursor = self.chat_text_edit.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+            self.chat_text_edit.setTextCursor(cursor)
+        if done:
+            self.addMessages("", color="black", end="\n")
+            self.streaming = False
 
     # Adds new chat messages with formatting
-    def addMessages(self, messages, color):
+    def addMessages(self, messages, color, end='\n'):
         cursor = self.chat_text_edit.textCursor()
         format = QTextCharFormat()
         formatm = QTextBlockFormat()
@@ -132,7 +155,7 @@ class ChatSection(QWidget):
         format.setForeground(QColor(color))
         cursor.setCharFormat(format)
         cursor.setBlockFormat(formatm)
-        cursor.insertText(messages + '\n')
+        cursor.insertText(messages + end)
         self.chat_text_edit.setTextCursor(cursor)
 
 # ---------------- INITIAL HOME SCREEN ---------------- #
@@ -184,18 +207,14 @@ class InitialScreen(QWidget):
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: white;")
 
-        # Periodically update speech status
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(100)
+        # Update speech status whenever it is published
+        self.signals = BusSignals(self)
+        self.signals.statusChanged.connect(self.SpeechRecogText, Qt.QueuedConnection)
+        self.signals.replay()
 
     # Display live speech recognition text
-    def SpeechRecogText(self):
-        try:
-            with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-                self.label.setText(file.read())
-        except Exception as e:
-            print("Error reading Status.data:", e)
+    def SpeechRecogText(self, status):
+        self.label.setText(status)
 
     # Load and scale icon image
     def load_icon(self, path, width=60, height=60):
@@ -203,8 +222,10 @@ class InitialScreen(QWidget):
         new_pixmap = pixmap.scaled(width, height)
         self.icon_label.setPixmap(new_pixmap)
 
-    # Toggle mic on/off icon and update Mic.data
+    # Toggle mic on/off icon and publish the new mic state
     def toggle_icon(self, event=None):
+        if event is not None:
+            bus.publish(BargeIn("mic"))  # A click interrupts the answer in flight, if any
         if self.toggled:
             self.load_icon(GraphicsDirectoryPath('Mic_on.png'), 60, 60)
             MicButtonInitialed()
@@ -237,7 +258,7 @@ class CustomTopBar(QWidget):
 
         # Left: App title
         left_layout = QHBoxLayout()
-        title_label = QLabel(f"{str(Assistantname).capitalize()} AI")
+        title_label = QLabel(f"{str(settings.get().assistant_name).capitalize()} AI")
         title_label.setStyleSheet("color: #3D74B6; font-weight: bolder; font-size: 35px; font-family:'Segoe UI'; background-color:white")
         left_layout.addWidget(title_label)
 
@@ -335,11 +356,14 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(stacked_widget)
 
 # ---------------- RUN THE APP ---------------- #
-def GraphicalUserInterface():
+# on_shown, if given, runs on the GUI thread once the event loop has painted the window.
+def GraphicalUserInterface(on_shown=None):
     app = QApplication(sys.argv)
     app.setFont(QFont("Segoe UI", 11))
     window = MainWindow()
     window.show()
+    if on_shown is not None:
+        QTimer.singleShot(0, on_shown)
     sys.exit(app.exec_())
 
 # Entry point
@@ -1,3 +1,6 @@
+from time import perf_counter
+StartTime = perf_counter()  # Reference point for the time-to-first-window report.
+
 from Frontend.GUI import (
     GraphicalUserInterface,
     ShowTextToScreen,
@@ -7,54 +10,56 @@ from Frontend.GUI import (
     GetMicrophoneStatus,
     SetMicrophoneStatus
 )
-from Backend.SpeechToText import (
-    SetAssistantStatus,
-    QueryModifier
-)
-from Backend.Model import FirstLayerDMM
-from Backend.RealtimeSearchEngine import (
-    RealtimeSearchEngine,
-    AnswerModifier
-)
-from Backend.Automation import Automation
-from Backend.SpeechToText import SpeechRecognition
-from Backend.Chatbot import ChatBot
-from Backend.TextToSpeech import TextToSpeech
-from dotenv import dotenv_values
-from asyncio import run
-from time import sleep
+from Backend.ChatStore import chat_log
+from Backend.EventBus import bus, FileAdapter, ImageRequested, MicToggled, ResponseDelta, BargeIn
+from Backend.Cancellation import turns, Cancelled
+from Backend.Services import services, WarmUpOrder
+from Backend.Settings import settings
+from Backend.EventLoop import assistant_loop
 import subprocess
 import threading
-import json
+import queue
+import re
 import os
 import sys
 
-env_vars = dotenv_values(".env")
-Username = env_vars.get("Username")
-Assistantname = env_vars.get("Assistantname")
-DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
+def ApplySettings(config):
+    global Username, Assistantname, DefaultMessage
+    Username = config.username
+    Assistantname = config.assistant_name
+    DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
 {Assistantname} : Welcome {Username}. I am doing well. How may I help you?'''
+
+settings.on_change(ApplySettings)
+
+# A mic click or speech during playback cancels the turn in flight.
+bus.subscribe(BargeIn, lambda event: turns.cancel(event.source))
+
 subprocess_list = []  # renamed to avoid conflict with subprocess module
-Functions = ["open", "close", "play", "system", "content", "google search", "youtube search"]
+
+# ImageGeneration.py runs in its own process and still watches ImageGeneration.data.
+# Set FileIPC = True in .env to mirror every bus event to Frontend/Files/*.data as before (read at startup).
+if settings.get().file_ipc:
+    FileAdapter(bus)
+else:
+    FileAdapter(bus, event_types=[ImageRequested])
 
 
 def ShowDefaultChatIfNoChats():
-    File = open(r'Data\ChatLog.json', "r", encoding='utf-8')
-    if len(File.read()) < 5:
+    if len(chat_log) == 0:
         with open(TempDirectoryPath('Database.data'), "w", encoding='utf-8') as file:
             file.write("")
 
-        with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-            file.write(DefaultMessage)
+        ShowTextToScreen(DefaultMessage)
 
 
 def ReadChatLogJson():
-    with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
-        chatlog_data = json.load(file)
-    return chatlog_data
+    return chat_log.all()
 
 
 def ChatLogIntegration():
+    from Backend.RealtimeSearchEngine import AnswerModifier
+
     json_data = ReadChatLogJson()
     formatted_chatlog = ""
     for entry in json_data:
@@ -76,9 +81,7 @@ def ShowChatsOnGUI():
         lines = Data.split('\n')
         result = '\n'.join(lines)
         File.close()
-        File = open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8')
-        File.write(result)
-        File.close()
+        ShowTextToScreen(result)
 
 
 def InitialExecution():
@@ -89,130 +92,175 @@ def InitialExecution():
     ShowChatsOnGUI()
 
 
-InitialExecution()
+def StreamAnswer(Deltas, Cancel=None):
+    """Show the answer in the chat panel and speak it sentence by sentence while it streams.
+
+    Cancel, if given, is the turn's CancelToken: speech stops as soon as it is cancelled.
+    """
+    from Backend.TextToSpeech import TextToSpeechStream, SplitSentences
+    from Backend.AudioPlayer import audio_player
+    from Backend.SpeechToText import StartBargeInMonitor
+    from Backend.Cancellation import CancelToken
+
+    Cancel = Cancel or CancelToken()
+
+    Start = perf_counter()
+    Timings = {}
+    Sentences = queue.Queue()
+
+    def FirstAudio():
+        Timings["first_audio"] = perf_counter() - Start
+
+    # Speech runs on its own thread so synthesis never stalls the LLM stream.
+    Speaker = threading.Thread(
+        target=TextToSpeechStream,
+        args=(iter(Sentences.get, None),),
+        kwargs={"on_start": FirstAudio, "func": Cancel.keep_going},
+        daemon=True
+    )
+    Speaker.start()
+    # Optionally listen for the user talking over the answer.
+    StopMonitor = StartBargeInMonitor(lambda: bus.publish(BargeIn("speech")))
+
+    def Publish():
+        Previous = ""
+        bus.publish(ResponseDelta(f"{Assistantname} : ", False))
+        for Delta in Deltas:
+            if Cancel.cancelled:
+                break
+            if "first_token" not in Timings:
+                Timings["first_token"] = perf_counter() - Start
+            # Collapse blank lines the same way AnswerModifier does.
+            Delta = re.sub(r"\n{2,}", "\n", Previous[-1:] + Delta)[len(Previous[-1:]):]
+            if not Delta:
+                continue
+            Previous += Delta
+            bus.publish(ResponseDelta(Delta, False))
+            yield Delta
+        bus.publish(ResponseDelta("", True))
+
+    try:
+        for Sentence in SplitSentences(Publish()):
+            Sentences.put(Sentence)
+    finally:
+        Sentences.put(None)
+    Timings["generation"] = perf_counter() - Start
+    Speaker.join()
+    if StopMonitor:
+        StopMonitor.set()
+
+    print(f"[TIMING] first token: {Timings.get('first_token', 0):.2f}s, "
+          f"first audio: {Timings.get('first_audio', 0):.2f}s, "
+          f"playback start: {audio_player.latency().get('last', 0) * 1000:.0f}ms, "
+          f"generation: {Timings['generation']:.2f}s")
+    return True
+
+
+def StartImageGeneration(ImageGenerationQuery):
+    print(f"[DEBUG] Final image query: '{ImageGenerationQuery}'")
+
+    # Publish the request; the file adapter hands it to ImageGeneration.py
+    bus.publish(ImageRequested(ImageGenerationQuery))
+
+    SetAssistantStatus("Generating images...")
+    # Start backend as a module with the same Python interpreter, so it can import Backend.Settings
+    try:
+        print("[DEBUG] Starting ImageGeneration.py...")
+        p1 = subprocess.Popen(
+            [sys.executable, "-m", "Backend.ImageGeneration"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            shell=False
+        )
+        subprocess_list.append(p1)
+        print("[DEBUG] Backend started successfully")
+    except Exception as e:
+        print(f"Error starting ImageGeneration.py: {e}")
+
+
+def PresentAnswer(Deltas, Cancel):
+    SetAssistantStatus("Answering...")
+    StreamAnswer(Deltas, Cancel)
+
+
+def ExitAssistant(_):
+    from Backend.SpeechToText import QueryModifier
+    from Backend.Chatbot import ChatBot
+    from Backend.TextToSpeech import TextToSpeech
+
+    QueryFinal = "Okay, Bye!"
+    Answer = ChatBot(QueryModifier(QueryFinal))
+    ShowTextToScreen(f"{Assistantname} : {Answer}")
+    SetAssistantStatus("Answering...")
+    TextToSpeech(Answer)
+    SetAssistantStatus("Answering...")
+    os._exit(1)
+
+
+def TaskCompleted(Task):
+    # Answers report through the chat panel; other tasks report on the status line.
+    if Task.kind in ("automation", "image"):
+        SetAssistantStatus(f"{'Failed' if Task.error else 'Done'}: {Task.query}")
 
 
 def MainExecution():
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
+    # Backends are imported on first use (or already warmed after the window was shown).
+    from Backend.SpeechToText import SpeechRecognition, QueryModifier
+    from Backend.Model import FirstLayerDMM
+    from Backend.IntentClassifier import intent_classifier
+    from Backend.DecisionCache import decision_cache
+    from Backend.RealtimeSearchEngine import RealtimeSearchEngineStream
+    from Backend.Chatbot import ChatBotStream
+    from Backend.Automation import Automation
+    from Backend.TaskPlanner import PlanTurn, ExecutePlan, FormatTimings
+    from Backend.AudioPlayer import audio_player
 
     SetAssistantStatus("Listening...")
-    Query = SpeechRecognition()
+    Query = SpeechRecognition(on_partial=lambda Partial: SetAssistantStatus(f"Listening... {Partial}"))
     ShowTextToScreen(f"{Username} : {Query}")
     SetAssistantStatus("Thinking...")
-    Decision = FirstLayerDMM(Query)
 
-    print("")
-    print(f"Decision : {Decision}")
-    print("")
+    # Every step of the turn shares one token; a barge-in cancels it and silences audio at once.
+    Turn = turns.begin()
+    Turn.on_cancel(lambda: (audio_player.stop(), turns.record(Turn, "audio_stopped")))
+    try:
+        DecisionStart = perf_counter()
+        Decision = FirstLayerDMM(Query, cancel=Turn)
+
+        print("")
+        print(f"Decision : {Decision}")
+        print(f"Decision tiers : {intent_classifier.stats()}")
+        print(f"Decision cache : {decision_cache.stats()}")
+        print("")
+
+        # Automation, image generation and every answer run concurrently; answers are spoken in order.
+        Handlers = {
+            "automation": lambda Item: Automation([Item], cancel=Turn),
+            "image": StartImageGeneration,
+            "general": lambda Query: ChatBotStream(QueryModifier(Query), cancel=Turn),
+            "realtime": lambda Query: RealtimeSearchEngineStream(QueryModifier(Query), cancel=Turn),
+            "present": lambda Deltas: PresentAnswer(Deltas, Turn),
+            "exit": ExitAssistant,
+        }
+        Plan = PlanTurn(Decision)
+        if any(Task.kind == "realtime" for Task in Plan):
+            SetAssistantStatus("Searching...")
 
-    G = any([i for i in Decision if i.startswith("general")])
-    R = any([i for i in Decision if i.startswith("realtime")])
+        PlanStart = perf_counter()
+        assistant_loop.run(ExecutePlan(Plan, Handlers, on_complete=TaskCompleted, cancel=Turn))
+        print(f"[TIMING] decision: {PlanStart - DecisionStart:.2f}s, tasks: {perf_counter() - PlanStart:.2f}s")
+        print(FormatTimings(Plan))
+        print(f"Event loop : {assistant_loop.stats()}")
+    except Cancelled:
+        pass
+    finally:
+        turns.finish(Turn)
 
-    Mearged_query = " and ".join(
-        [" ".join(i.split()[1:]) for i in Decision if i.startswith("general") or i.startswith("realtime")]
-    )
-
-    # Perform automation if command matches
-    for queries in Decision:
-        if any(queries.startswith(func) for func in Functions):
-            run(Automation(Decision))
-            TaskExecution = True
-            break
-
-    # Start image generation if any general query
-    ImageExecution = False
-    ImageGenerationQuery = None
-
-    # Possible prefixes the model might return
-    prefixes = [
-        "generate image of ",
-        "general generate image of ",
-        "generate image ",
-        "general generate image "
-    ]
-
-    for queries in Decision:
-        print(f"[DEBUG] Checking query: '{queries}'")
-        q_lower = queries.lower().strip()
-        for p in prefixes:
-            if q_lower.startswith(p):
-                print(f"[DEBUG] Matched prefix: '{p}'")
-                ImageGenerationQuery = queries[len(p):].strip()
-                ImageExecution = True
-                break
-        if ImageExecution:
-            break
-
-    if ImageExecution and ImageGenerationQuery:
-        print(f"[DEBUG] Final image query: '{ImageGenerationQuery}'")
-
-        # Write to file
-        image_file_path = os.path.abspath(r"Frontend\Files\ImageGeneration.data")
-        os.makedirs(os.path.dirname(image_file_path), exist_ok=True)
-        with open(image_file_path, "w", encoding="utf-8") as file:
-            file.write(f"{ImageGenerationQuery},True")
-
-        # Build full backend script path
-        backend_script = os.path.abspath(r"Backend\ImageGeneration.py")
-        SetAssistantStatus("Generating images...")
-        # Start backend using same Python interpreter
-        try:
-            print("[DEBUG] Starting ImageGeneration.py...")
-            p1 = subprocess.Popen(
-                [sys.executable, backend_script],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                shell=False
-            )
-            subprocess_list = []
-            subprocess_list.append(p1)
-            print("[DEBUG] Backend started successfully")
-        except Exception as e:
-            print(f"Error starting ImageGeneration.py: {e}")
-    else:
-        print("[DEBUG] No matching prefix found — backend not started")
-
-
-    # Realtime + General combined or only Realtime
-    if (G and R) or R:
-        SetAssistantStatus("Searching...")
-        Answer = RealtimeSearchEngine(QueryModifier(Mearged_query))
-        ShowTextToScreen(f"{Assistantname} : {Answer}")
-        SetAssistantStatus("Answering...")
-        TextToSpeech(Answer)
-        return True
-
-    # Handle general, realtime, or exit queries
-    for Queries in Decision:
-        if Queries.startswith("general "):
-            SetAssistantStatus("Thinking...")
-            QueryFinal = Queries.replace("general ", "")
-            Answer = ChatBot(QueryModifier(QueryFinal))
-            ShowTextToScreen(f"{Assistantname} : {Answer}")
-            SetAssistantStatus("Answering...")
-            TextToSpeech(Answer)
-            return True
-
-        elif Queries.startswith("realtime "):
-            SetAssistantStatus("Searching...")
-            QueryFinal = Queries.replace("realtime ", "")
-            Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-            ShowTextToScreen(f"{Assistantname} : {Answer}")
-            SetAssistantStatus("Answering...")
-            TextToSpeech(Answer)
-            return True
-
-        elif Queries == "exit":
-            QueryFinal = "Okay, Bye!"
-            Answer = ChatBot(QueryModifier(QueryFinal))
-            ShowTextToScreen(f"{Assistantname} : {Answer}")
-            SetAssistantStatus("Answering...")
-            TextToSpeech(Answer)
-            SetAssistantStatus("Answering...")
-            os._exit(1)
+    if Turn.cancelled:
+        SetAssistantStatus("Stopped.")
+        print(f"[TIMING] cancelled by {Turn.reason}: {turns.stats()}")
+    return True
 
 
 def FirstThread():
@@ -223,14 +271,29 @@ def FirstThread():
             MainExecution()
         else:
             AIStatus = GetAssistantStatus()
-            if "Available..." in AIStatus:
-                sleep(0.1)
-            else:
+            if "Available..." not in AIStatus:
                 SetAssistantStatus("Available...")
+            # Sleep until the mic is switched on instead of polling Mic.data.
+            bus.wait_for(MicToggled, lambda event: event.active)
+
+
+def OnWindowShown():
+    print(f"[STARTUP] window shown {perf_counter() - StartTime:.2f}s after Main started", flush=True)
+    if "--startup-benchmark" in sys.argv:
+        os._exit(0)
+
+    # Load the chat history into the GUI, then warm the backends while the user reads it.
+    def Startup():
+        InitialExecution()
+        assistant_loop.start()
+        settings.watch()  # Pick up .env edits without a restart.
+        services.warm_up(WarmUpOrder)
+
+    threading.Thread(target=Startup, name="startup", daemon=True).start()
 
 
 def SecondThread():
-    GraphicalUserInterface()
+    GraphicalUserInterface(on_shown=OnWindowShown)
 
 
 if __name__ == "__main__":
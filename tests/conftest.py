@@ -0,0 +1,14 @@
+# The tests import Backend.* from the repository root and run from it, as Main does,
+# so .env and Data\ resolve wherever pytest is started.
+import os
+import sys
+
+import pytest
+
+Root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, Root)
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    monkeypatch.chdir(Root)
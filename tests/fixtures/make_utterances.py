@@ -0,0 +1,42 @@
+# Regenerates utterances.wav and utterances.txt: two voiced, speech-like bursts
+# (a harmonic source shaped by three formants, with a syllable-rate envelope) in low noise.
+import random
+import wave
+import math
+import os
+
+SampleRate = 16000
+Duration = 6.01  # Not a whole number of 30 ms frames, so the last frame is partial.
+Utterances = [(0.8, 2.0), (3.2, 4.4)]
+Formants = [(500, 80), (1500, 120), (2500, 160)]   # (centre Hz, bandwidth Hz)
+
+
+def Sample(t, rng):
+    for start, end in Utterances:
+        if start <= t < end:
+            f0 = 120 + 15 * math.sin(2 * math.pi * 0.7 * t)
+            envelope = 0.55 + 0.45 * math.sin(2 * math.pi * 4 * (t - start)) ** 2
+            envelope *= min(1.0, (t - start) / 0.03, (end - t) / 0.03)
+            voiced = 0.0
+            for harmonic in range(1, int(3500 / f0)):
+                frequency = harmonic * f0
+                gain = sum(1 / (1 + ((frequency - centre) / width) ** 2) for centre, width in Formants)
+                voiced += gain / harmonic ** 0.5 * math.sin(2 * math.pi * frequency * t)
+            return 2500 * envelope * voiced + rng.gauss(0, 10)
+    return rng.gauss(0, 10)
+
+
+def Generate(folder=os.path.dirname(os.path.abspath(__file__))):
+    rng = random.Random(7)
+    samples = [max(-32768, min(32767, int(Sample(index / SampleRate, rng)))) for index in range(int(SampleRate * Duration))]
+    with wave.open(os.path.join(folder, "utterances.wav"), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SampleRate)
+        wav.writeframes(b"".join(sample.to_bytes(2, "little", signed=True) for sample in samples))
+    with open(os.path.join(folder, "utterances.txt"), "w", encoding="utf-8") as f:
+        f.writelines(f"{start:.2f} {end:.2f}\n" for start, end in Utterances)
+
+
+if __name__ == "__main__":
+    Generate()
@@ -0,0 +1,47 @@
+import threading
+import time
+
+from Backend.AppResolver import AppResolver, Launch
+
+
+def slow_scan(release):
+    def resolve(app):
+        release.wait(30)
+        return Launch("scanned_exe", f"C:\\{app}.exe", lambda: None)
+    return resolve
+
+
+def quick_search(app):
+    time.sleep(0.2)
+    return Launch("search_result", f"https://{app}.example", lambda: None)
+
+
+def test_first_answer_wins_over_a_slow_scan():
+    release = threading.Event()
+    resolver = AppResolver(cheap=[], slow=[("scanned_exe", slow_scan(release)), ("search_result", quick_search)])
+    try:
+        start = time.perf_counter()
+        launch = resolver.resolve("steam")
+        assert launch.strategy == "search_result"
+        assert time.perf_counter() - start < 1.0
+    finally:
+        release.set()
+
+
+def test_blocked_scans_do_not_starve_the_search():
+    release = threading.Event()
+    resolver = AppResolver(cheap=[], slow=[("scanned_exe", slow_scan(release)), ("search_result", quick_search)],
+                           deadline=1.0, workers=2)
+    try:
+        for app in ["steam", "discord", "obs", "blender", "steam", "discord"]:
+            start = time.perf_counter()
+            launch = resolver.resolve(app)
+            assert launch is not None and launch.strategy == "search_result", app
+            assert time.perf_counter() - start < 1.0
+    finally:
+        release.set()
+
+
+def test_nothing_found_returns_none_at_the_deadline():
+    resolver = AppResolver(cheap=[], slow=[("search_result", lambda app: None)], deadline=0.5)
+    assert resolver.resolve("nothing") is None
@@ -0,0 +1,36 @@
+import json
+
+from Backend.ChatStore import ChatStore
+
+
+def make_store(tmp_path, tail_size=200):
+    return ChatStore(path=str(tmp_path / "ChatLog.jsonl"), legacy_path=None, tail_size=tail_size)
+
+
+def test_short_log_is_served_from_memory(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    for index in range(5):
+        store.append_exchange(f"question {index}", f"answer {index}")
+
+    def no_disk(index):
+        raise AssertionError("recent() read the log from disk")
+    monkeypatch.setattr(store, "_read_from", no_disk)
+    assert [message["content"] for message in store.recent(200)][-2:] == ["question 4", "answer 4"]
+    assert len(store.recent(200)) == 10
+
+
+def test_window_beyond_the_tail_reads_from_disk(tmp_path):
+    store = make_store(tmp_path, tail_size=4)
+    for index in range(10):
+        store.append("user", f"message {index}")
+    assert [message["content"] for message in store.recent(6)] == [f"message {index}" for index in range(4, 10)]
+    assert len(store.recent(4)) == 4
+
+
+def test_reopened_log_keeps_its_history(tmp_path):
+    store = make_store(tmp_path)
+    store.append_exchange("hello", "hi there")
+    reopened = make_store(tmp_path)
+    assert reopened.recent(200) == [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi there"}]
+    with open(tmp_path / "ChatLog.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["role"] for line in f] == ["user", "assistant"]
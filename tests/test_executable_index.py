@@ -0,0 +1,45 @@
+import os
+import time
+
+from Backend import ExecutableIndex as module
+from Backend.ExecutableIndex import ExecutableIndex
+
+
+def make_index(tmp_path):
+    root = tmp_path / "drive"
+    (root / "Games" / "Hollow Knight").mkdir(parents=True)
+    (root / "Games" / "Hollow Knight" / "HollowKnight.exe").write_text("")
+    index = ExecutableIndex(path=str(tmp_path / "index.json.gz"), roots=[str(root)])
+    index.refresh()
+    return index, root
+
+
+def test_find_hits_the_index(tmp_path):
+    index, _ = make_index(tmp_path)
+    assert index.find("hollow knight")[0].endswith("HollowKnight.exe")
+
+
+def test_miss_returns_at_once_and_refreshes_in_the_background(tmp_path, monkeypatch):
+    index, root = make_index(tmp_path)
+    scans = []
+    refresh = index.refresh
+    monkeypatch.setattr(index, "refresh", lambda: scans.append(1) or refresh())
+
+    (root / "Steam").mkdir()
+    (root / "Steam" / "steam.exe").write_text("")
+    assert index.find("steam") == []
+    deadline = time.monotonic() + 5
+    while not index.lookup("steam") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.lookup("steam")[0].endswith(os.path.join("Steam", "steam.exe"))
+
+    # Further misses within the interval don't start another walk.
+    for _ in range(5):
+        assert index.find("not installed") == []
+    assert len(scans) == 1
+
+
+def test_miss_refresh_runs_again_after_the_interval(tmp_path, monkeypatch):
+    index, _ = make_index(tmp_path)
+    monkeypatch.setattr(module, "MissRefreshInterval", 0.0)
+    assert index.refresh_after_miss() is not None
@@ -0,0 +1,48 @@
+import pytest
+
+from Backend.IntentClassifier import IntentClassifier
+
+classifier = IntentClassifier(assistant_name="eva")
+
+
+@pytest.mark.parametrize("query", [
+    "Play rock and roll.",
+    "Play tom and jerry.",
+    "Open chrome and search for cats.",
+    "Google is it going to rain tomorrow?",
+    "Close the door.",
+    "Open chrome and tell me about mahatma gandhi.",
+    "Quit spotify.",
+    "Exit notepad.",
+    "Exit chrome.",
+    "Goodbye my friend.",
+])
+def test_ambiguous_queries_go_to_cohere(query):
+    assert classifier.classify_local(query) == (None, None)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Open chrome.", ["open chrome"]),
+    ("Open chrome and firefox.", ["open chrome", "open firefox"]),
+    ("Open chrome, firefox and notepad.", ["open chrome", "open firefox", "open notepad"]),
+    ("Open chrome, firefox.", ["open chrome", "open firefox"]),
+    ("Bye eva.", ["exit"]),
+    ("Quit.", ["exit"]),
+    ("Open spotify and play lofi.", ["open spotify", "play lofi"]),
+    ("Play let her go.", ["play let her go"]),
+    ("Google search python tutorials.", ["google search python tutorials"]),
+    ("Google python tutorials.", ["google search python tutorials"]),
+    ("Volume up.", ["system volume up"]),
+])
+def test_commands_stay_on_the_rules_tier(query, expected):
+    assert classifier.classify_local(query) == (expected, "rules")
+
+
+def test_fallback_answers_what_the_local_tiers_leave():
+    assert classifier.classify("Close the door.", fallback=lambda query: ["general close the door"]) == ["general close the door"]
+    assert classifier.stats()["cohere"]["hits"] == 1
+
+
+def test_exit_accepts_only_the_assistants_name():
+    assert IntentClassifier(assistant_name="jarvis").classify_local("Bye jarvis.") == (["exit"], "rules")
+    assert IntentClassifier(assistant_name="jarvis").classify_local("Bye eva.") == (None, None)
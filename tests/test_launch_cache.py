@@ -0,0 +1,70 @@
+import json
+import threading
+
+from Backend.LaunchCache import LaunchCache, LaunchKey
+
+
+def executables(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"app{index}.exe"
+        path.write_text("")
+        paths.append(str(path))
+    return paths
+
+
+def test_concurrent_record_and_evict_keep_the_file_valid(tmp_path):
+    cache_path = str(tmp_path / "LaunchCache.json")
+    cache = LaunchCache(path=cache_path, legacy_path=None)
+    paths = executables(tmp_path, 16)
+    start = threading.Barrier(8)
+
+    def worker(index):
+        start.wait()
+        for _ in range(25):
+            # Apps 0-7 are recorded by one worker each; apps 8-15 are recorded and then evicted.
+            cache.record(f"App {index}", paths[index])
+            cache.record(f"App {index + 8}", paths[index + 8])
+            cache.evict(f"App {index + 8}")
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(cache_path, encoding="utf-8") as f:
+        stored = json.load(f)
+    assert set(stored) == {LaunchKey(f"App {index}") for index in range(8)}
+    for index in range(8):
+        assert stored[LaunchKey(f"App {index}")]["path"] == paths[index]
+        assert stored[LaunchKey(f"App {index}")]["uses"] == 25
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    reloaded = LaunchCache(path=cache_path, legacy_path=None)
+    assert reloaded.get("app 3") == paths[3]
+
+
+def test_missing_path_is_evicted_on_get(tmp_path):
+    cache_path = str(tmp_path / "LaunchCache.json")
+    cache = LaunchCache(path=cache_path, legacy_path=None)
+    path = executables(tmp_path, 1)[0]
+    cache.record("Hollow Knight", path)
+    assert cache.get("hollow knight") == path
+
+    (tmp_path / "app0.exe").unlink()
+    assert cache.get("hollow knight") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["entries"] == 0
+    with open(cache_path, encoding="utf-8") as f:
+        assert json.load(f) == {}
+
+
+def test_least_used_entry_is_dropped_above_the_limit(tmp_path):
+    cache = LaunchCache(path=str(tmp_path / "LaunchCache.json"), max_entries=2, legacy_path=None)
+    paths = executables(tmp_path, 3)
+    cache.record("often", paths[0])
+    cache.record("often", paths[0])
+    cache.record("rarely", paths[1])
+    cache.record("new", paths[2])
+    assert cache.get("rarely") is None
+    assert cache.get("often") == paths[0] and cache.get("new") == paths[2]
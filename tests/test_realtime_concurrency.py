@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from Backend.ChatStore import ChatStore
+from Backend.Resilience import DegradedAnswer, FakeProviderError
+
+
+class FakeGroq:
+    """Streams back the search-result tags it was given, pausing between chunks so requests overlap.
+
+    Prompts containing "fail" get a 400.
+    """
+
+    def __init__(self, chunk_seconds=0.002):
+        self.chunk_seconds = chunk_seconds
+        self.chat = self.completions = self
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def create(self, messages, **kwargs):
+        if "fail" in messages[-1]["content"]:
+            raise FakeProviderError(400)
+        seen = [tag for message in messages if message["role"] == "system"
+                for tag in re.findall(r"result-\d+", message["content"])]
+        fake = self
+
+        class Stream:
+            def __iter__(self):
+                with fake._lock:
+                    fake.active += 1
+                    fake.peak = max(fake.peak, fake.active)
+                try:
+                    for word in ["Found"] + seen + ["</s>"]:
+                        time.sleep(fake.chunk_seconds)
+                        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f" {word}"))])
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+
+            def close(self):
+                pass
+
+        return Stream()
+
+
+def search(prompt):
+    time.sleep(0.001)
+    return f"[start]\nTitle: result-{prompt.split()[-1]}\n[end]"
+
+
+# Imported once the autouse fixture has moved to the repository root, where its settings load .env.
+@pytest.fixture
+def engine():
+    from Backend import RealtimeSearchEngine
+    return RealtimeSearchEngine
+
+
+@pytest.fixture
+def log(tmp_path):
+    return ChatStore(path=str(tmp_path / "ChatLog.jsonl"), legacy_path=str(tmp_path / "none.json"))
+
+
+def test_concurrent_queries_see_only_their_own_results(engine, log):
+    client = FakeGroq()
+    before = engine.SystemChatBot
+    prompts = [f"{'fail ' if index % 10 == 9 else ''}news number {index}" for index in range(200)]
+
+    def ask(prompt):
+        return prompt, "".join(engine.RealtimeSearchEngineStream(prompt, client=client, search=search, log=log))
+
+    with ThreadPoolExecutor(32) as pool:
+        answers = list(pool.map(ask, prompts))
+
+    assert client.peak > 1, "requests never overlapped"
+    for prompt, answer in answers:
+        if "fail" in prompt:
+            assert answer == DegradedAnswer
+        else:
+            assert re.findall(r"result-\d+", answer) == [f"result-{prompt.split()[-1]}"], prompt
+    assert engine.SystemChatBot is before and len(engine.SystemChatBot) == 3
+
+
+def test_chat_log_keeps_each_exchange_together(engine, log):
+    client = FakeGroq()
+    prompts = [f"news number {index}" for index in range(100)]
+
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda prompt: "".join(
+            engine.RealtimeSearchEngineStream(prompt, client=client, search=search, log=log)), prompts))
+
+    history = log.all()
+    assert len(history) == 2 * len(prompts)
+    for question, reply in zip(history[::2], history[1::2]):
+        assert question["role"] == "user" and reply["role"] == "assistant"
+        assert reply["content"].endswith(f"result-{question['content'].split()[-1]}")
+
+
+def test_failed_request_leaves_no_search_results_behind(engine, log):
+    client = FakeGroq()
+    assert "".join(engine.RealtimeSearchEngineStream("fail number 1", client=client, search=search, log=log)) == DegradedAnswer
+    answer = "".join(engine.RealtimeSearchEngineStream("news number 2", client=client, search=search, log=log))
+    assert re.findall(r"result-\d+", answer) == ["result-2"]
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from Backend.Cancellation import CancelToken
+from Backend.Resilience import (CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, FakeProvider,
+                                FakeProviderError, Provider)
+
+
+def failing(status_code=503):
+    def request(deadline):
+        raise FakeProviderError(status_code)
+    return request
+
+
+def test_retryable_failures_are_retried_then_succeed():
+    attempts = []
+
+    def request(deadline):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeProviderError(503)
+        return "ok"
+
+    provider = Provider("test", retries=2, backoff=0.001)
+    assert provider.call(request) == "ok"
+    assert len(attempts) == 3
+    assert provider.stats()["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    provider = Provider("test", retries=3, backoff=0.001)
+    with pytest.raises(FakeProviderError):
+        provider.call(failing(400))
+    assert provider.stats()["calls"] == 1
+    assert provider.breaker.state == "closed"
+
+
+def test_breaker_opens_after_threshold_failures():
+    provider = Provider("test", retries=0, breaker=CircuitBreaker(threshold=3, reset_seconds=60))
+    for _ in range(2):
+        with pytest.raises(FakeProviderError):
+            provider.call(failing())
+        assert provider.breaker.state == "closed"
+    with pytest.raises(FakeProviderError):
+        provider.call(failing())
+    assert provider.breaker.state == "open"
+
+    sent = []
+    with pytest.raises(CircuitOpenError):
+        provider.call(lambda deadline: sent.append(1))
+    assert not sent
+    assert provider.stats()["rejected"] == 1
+
+
+def test_breaker_half_opens_after_cooldown_with_a_single_trial():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow(), "only one trial request while half-open"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_abandoned_trial_lets_the_next_request_probe():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release_trial()
+    assert breaker.allow()
+
+
+def test_retries_never_outlive_the_deadline():
+    provider = Provider("test", retries=50, backoff=0.05, max_backoff=0.05, breaker=CircuitBreaker(threshold=100))
+    start = time.monotonic()
+    with pytest.raises((FakeProviderError, DeadlineExceeded)):
+        provider.call(failing(), deadline=Deadline(0.3))
+    assert time.monotonic() - start < 0.4
+
+
+def test_slow_provider_is_cut_off_at_the_deadline():
+    slow = FakeProvider(failure_rate=0.0, latency=1.0)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        Provider("slow", backoff=0.01).call(slow.complete, deadline=Deadline(0.2))
+    assert time.monotonic() - start < 0.4
+
+
+def test_stream_does_not_retry_after_output_was_yielded():
+    attempts = []
+
+    def request(deadline):
+        attempts.append(1)
+        yield "partial"
+        raise FakeProviderError(503)
+
+    received = []
+    with pytest.raises(FakeProviderError):
+        for item in Provider("test", backoff=0.001).stream(request):
+            received.append(item)
+    assert received == ["partial"] and len(attempts) == 1
+
+
+def test_cancel_stops_backoff_at_once():
+    cancel = CancelToken()
+    provider = Provider("test", retries=5, backoff=10.0, max_backoff=10.0)
+    threading.Timer(0.1, cancel.cancel).start()
+    start = time.monotonic()
+    with pytest.raises(FakeProviderError):
+        provider.call(failing(), cancel=cancel)
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,29 @@
+from Backend.Settings import Settings
+
+
+class Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_changed_settings_rebuild_only_the_services_built_from_them(monkeypatch):
+    # Imported here, after the autouse fixture has moved to the repository root: Services loads .env on import.
+    from Backend import Services as module
+    from Backend.Services import ServiceRegistry, ServiceSettings
+
+    registry = ServiceRegistry()
+    for name in ServiceSettings:
+        registry.register(name, Client)
+    monkeypatch.setattr(module, "services", registry)
+    monkeypatch.setattr(module, "_applied", [Settings("user", "eva", speechify_token="old-token")])
+
+    before = {name: registry.get(name) for name in ServiceSettings}
+    module._apply_settings(Settings("user", "eva", speechify_token="new-token"))
+
+    assert before["speechify"].closed and registry.get("speechify") is not before["speechify"]
+    for name in ServiceSettings:
+        if name != "speechify":
+            assert registry.get(name) is before[name]
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from Backend.VoiceActivity import FrameMs, WavFrames
+
+Wav = os.path.join(os.path.dirname(__file__), "fixtures", "utterances.wav")
+FrameBytes = 16000 * FrameMs // 1000 * 2
+WordFrames = 10     # The stub recognizer "hears" one more word every 10 frames of audio.
+
+
+class StubRecognizer:
+    """Plays one scripted utterance back as Vosk would, from the amount of audio it was fed.
+
+    After `finalize_at` words, AcceptWaveform returns True once, as Vosk does when it finalizes
+    a result in the middle of an utterance, so listen() has to join pieces.
+    """
+
+    def __init__(self, words, finalize_at):
+        self.words = words
+        self.finalize_at = finalize_at
+        self.received = 0
+        self.finalized = 0      # Words already returned by Result().
+
+    def heard(self):
+        return self.words[:min(len(self.words), self.received // (FrameBytes * WordFrames))]
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+        return len(self.heard()) == self.finalize_at > self.finalized
+
+    def Result(self):
+        text = " ".join(self.heard()[self.finalized:])
+        self.finalized = len(self.heard())
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.heard()[self.finalized:])})
+
+    def FinalResult(self):
+        return self.Result()
+
+
+class StubVosk:
+    """Stands in for the vosk module: each KaldiRecognizer gets the next scripted utterance."""
+
+    def __init__(self, scripts, finalize_at=2):
+        self.scripts = list(scripts)
+        self.finalize_at = finalize_at
+        self.recognizers = []
+
+    def Model(self, path):
+        return path
+
+    def KaldiRecognizer(self, model, sample_rate):
+        recognizer = StubRecognizer(self.scripts.pop(0), self.finalize_at)
+        self.recognizers.append(recognizer)
+        return recognizer
+
+
+# Imported here rather than at the top: SpeechToText loads .env, which the autouse fixture makes reachable.
+@pytest.fixture
+def stub_vosk(monkeypatch):
+    from Backend import SpeechToText
+    stub = StubVosk([["open", "chrome", "and", "notepad"], ["what's", "the", "time"]])
+    monkeypatch.setattr(SpeechToText, "vosk", stub)
+    return stub
+
+
+@pytest.fixture
+def recognizer(stub_vosk):
+    from Backend.SpeechToText import VoskRecognizer
+    return VoskRecognizer(model_path="stub-model", end_silence_ms=700)
+
+
+def test_listen_streams_partials_and_ends_with_the_joined_final_query(stub_vosk, recognizer):
+    from Backend.SpeechToText import Hypothesis
+
+    frames = WavFrames(Wav)
+    first = list(recognizer.listen(frames))
+    second = list(recognizer.listen(frames))    # The same stream picks up at the next utterance.
+
+    # Partials keep the piece finalized mid-utterance in front of the words heard since.
+    assert first == [
+        Hypothesis("open", False),
+        Hypothesis("open chrome", False),
+        Hypothesis("open chrome and", False),
+        Hypothesis("open chrome and notepad", False),
+        Hypothesis("open chrome and notepad", True),
+    ]
+    assert second == [
+        Hypothesis("what's", False),
+        Hypothesis("what's the", False),
+        Hypothesis("what's the time", False),
+        Hypothesis("what's the time", True),
+    ]
+    assert len(stub_vosk.recognizers) == 2
+
+
+def test_listen_never_decodes_the_silence_between_utterances(stub_vosk, recognizer):
+    total = sum(len(frame) for frame in WavFrames(Wav))
+    frames = WavFrames(Wav)
+    list(recognizer.listen(frames))
+    list(recognizer.listen(frames))
+
+    # Each utterance is about 1.2 s of speech plus 0.3 s of pre-roll and 0.7 s of closing silence.
+    decoded = [stub.received for stub in stub_vosk.recognizers]
+    for received in decoded:
+        assert 1.8 <= received / (FrameBytes * 1000 / FrameMs) <= 2.6
+    assert sum(decoded) < total * 0.8
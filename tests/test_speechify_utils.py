@@ -0,0 +1,50 @@
+import threading
+from types import SimpleNamespace
+
+from Backend.speechify_utils import VoiceCatalog, filter_voice_models
+
+
+def voice(voice_id, gender, tags, models):
+    return SimpleNamespace(
+        voice_id=voice_id, name=voice_id.title(), gender=gender, tags=tags,
+        models=[SimpleNamespace(name=name, languages=[SimpleNamespace(locale=locale) for locale in locales])
+                for name, locales in models.items()],
+    )
+
+
+Voices = [
+    voice("george", "male", ["timbre:deep"], {"simba-english": ["en-US", "en-GB"], "simba-multilingual": ["fr-FR"]}),
+    voice("henry", "male", [], {"simba-english": ["en-US"]}),
+    voice("lisa", "female", ["timbre:deep", "use-case:advertisement"], {"simba-multilingual": ["de-DE", "en-US"]}),
+]
+
+
+def test_filter_voice_models_matches_every_filter():
+    assert filter_voice_models(Voices, gender="male", locale="en-US") == ["simba-english", "simba-multilingual", "simba-english"]
+    assert filter_voice_models(Voices, gender="FEMALE") == ["simba-multilingual"]
+    assert filter_voice_models(Voices, locale="fr-FR") == ["simba-english", "simba-multilingual"]
+    assert filter_voice_models(Voices, tags=["timbre:deep", "use-case:advertisement"]) == ["simba-multilingual"]
+    assert filter_voice_models(Voices, locale="ja-JP") == []
+
+
+def test_cold_catalog_blocks_on_the_first_fetch(tmp_path):
+    fetches = []
+    catalog = VoiceCatalog(path=str(tmp_path / "catalog.json"), fetch=lambda: fetches.append(1) or Voices)
+    assert [record["voice_id"] for record in catalog.load(wait=True).find(locale="en-US")] == ["george", "henry", "lisa"]
+
+    # The saved catalog is fresh, so a new instance answers from disk without fetching.
+    reloaded = VoiceCatalog(path=str(tmp_path / "catalog.json"), fetch=lambda: fetches.append(1) or Voices)
+    assert len(reloaded.load(wait=True).find(gender="male")) == 2
+    assert len(fetches) == 1
+
+
+def test_concurrent_cold_loads_fetch_once(tmp_path):
+    fetches = []
+    catalog = VoiceCatalog(path=str(tmp_path / "catalog.json"), fetch=lambda: fetches.append(1) or Voices)
+    threads = [threading.Thread(target=catalog.load, kwargs={"wait": True}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fetches) == 1
+    assert len(catalog.voices) == 3
@@ -0,0 +1,38 @@
+import os
+import wave
+
+import pytest
+
+from Backend import VoiceActivity as module
+from Backend.VoiceActivity import Endpointer, EvaluateEndpoints, FrameMs, WavFrames
+
+Fixtures = os.path.join(os.path.dirname(__file__), "fixtures")
+Wav = os.path.join(Fixtures, "utterances.wav")
+Labels = os.path.join(Fixtures, "utterances.txt")
+Tolerance = 0.15    # Seconds of endpoint error allowed beyond the pre-roll and closing silence.
+
+
+def test_wav_frames_pads_the_last_partial_frame():
+    with wave.open(Wav, "rb") as wav:
+        samples, rate = wav.getnframes(), wav.getframerate()
+    frame_samples = rate * FrameMs // 1000
+    assert samples % frame_samples, "the fixture should end in a partial frame"
+    frames = list(WavFrames(Wav))
+    assert len(frames) == -(-samples // frame_samples)
+    assert {len(frame) for frame in frames} == {frame_samples * 2}
+
+
+@pytest.mark.parametrize("webrtc", [False, True])
+def test_endpoints_match_the_labels(webrtc, monkeypatch):
+    if webrtc and module.webrtcvad is None:
+        pytest.skip("webrtcvad is not installed")
+    if not webrtc:
+        monkeypatch.setattr(module, "webrtcvad", None)
+    result = EvaluateEndpoints(Wav, Labels, tolerance=Tolerance)
+    assert result["detected"] == result["labelled"] == result["matched"] == 2, result
+    assert result["max_start_error"] <= Tolerance and result["max_end_error"] <= Tolerance
+
+
+def test_silence_produces_no_utterance():
+    silence = [b"\0" * (16000 * FrameMs // 1000 * 2)] * 100
+    assert list(Endpointer(use_webrtc=False).utterances(silence)) == []
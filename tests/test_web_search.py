@@ -0,0 +1,68 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from Backend import WebSearch as module
+from Backend.WebSearch import CannedResultsPage, SearchResult, WebSearch
+
+
+@pytest.fixture
+def server():
+    state = {"status": 200, "requests": 0}
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            body = CannedResultsPage("space news", 3).encode("utf-8")
+            self.send_response(state["status"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_port}/search"
+    yield state
+    httpd.shutdown()
+
+
+def test_results_are_parsed_and_cached(server):
+    service = WebSearch(url=server["url"], parser="stdlib")
+    first = service.results("Space News", 3)
+    assert [result.url for result in first] == [f"https://example.com/{index}/space-news" for index in range(3)]
+    assert service.results("space   news", 3) == first
+    assert server["requests"] == 1
+
+
+def test_failed_fetch_falls_back_to_googlesearch(server, monkeypatch):
+    server["status"] = 429
+    fallback = [SearchResult("https://fallback.example", "Fallback", "from googlesearch")]
+    monkeypatch.setattr(module, "googlesearch", lambda query, **kwargs: fallback)
+    service = WebSearch(url=server["url"], parser="stdlib")
+    assert service.results("space news", 3) == fallback
+    assert service.stats()["failures"] == 1
+
+
+def test_failed_fetch_without_fallback_raises_and_is_not_cached(server, monkeypatch):
+    server["status"] = 503
+    monkeypatch.setattr(module, "googlesearch", None)
+    service = WebSearch(url=server["url"], parser="stdlib")
+    with pytest.raises(requests.HTTPError):
+        service.results("space news", 3)
+    server["status"] = 200
+    assert len(service.results("space news", 3)) == 3
+
+
+def test_realtime_answers_without_search_context_when_the_search_fails():
+    from Backend.RealtimeSearchEngine import NoSearchResults, SystemMessages
+
+    def search(prompt):
+        raise requests.HTTPError("429 Too Many Requests")
+
+    contents = [message["content"] for message in SystemMessages("latest space news", search)]
+    assert NoSearchResults in contents